@@ -0,0 +1,117 @@
+"""
+Yapay Zeka Öğretmen - Rota/Plan Bazlı Rate Limit
+------------------------------------------------
+Pahalı uç noktalar (AI) için kullanıcı planına göre limit uygular.
+Kimlik JWT'den veritabanına gitmeden okunur; plan bilgisi L1 önbellekte
+tutulur. Limit kararı RateLimiter'ın yerel kovası veya tek bir atomik
+Redis script'iyle verilir.
+"""
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from jose import JWTError, jwt
+from loguru import logger
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.cache_service import RateLimiter, cache
+from app.services.user_service import get_user_by_id
+
+PLAN_CACHE_TTL = 300  # saniye
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def get_limiter(route: str, plan: str) -> RateLimiter:
+    """(rota, plan) için limiter; tanımsız plan 'default' limitini kullanır"""
+    key = (route, plan)
+    if key not in _limiters:
+        limits = settings.RATE_LIMIT_ROUTES.get(route, {})
+        max_requests = limits.get(plan, limits.get("default", settings.RATE_LIMIT_REQUESTS))
+        _limiters[key] = RateLimiter(
+            max_requests=max_requests,
+            window_seconds=settings.RATE_LIMIT_WINDOW,
+            local_lease=settings.RATE_LIMIT_LOCAL_LEASE,
+            sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL,
+            name=f"{route}:{plan}",
+        )
+    return _limiters[key]
+
+
+def get_limiter_stats() -> Dict:
+    return {f"{route}:{plan}": limiter.get_stats() for (route, plan), limiter in _limiters.items()}
+
+
+def _user_id_from_request(request: Request) -> Optional[str]:
+    """Bearer token'dan kullanıcı ID'si (doğrulanamazsa None)"""
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        return payload.get("sub")
+    except JWTError:
+        return None
+
+
+def _plan_for(user: Optional[User]) -> str:
+    if user is None:
+        return "anonymous"
+    subscription = user.subscription
+    if subscription.status == "trial" and user.check_subscription():
+        return "trial"
+    if subscription.plan_id and user.check_subscription():
+        return subscription.plan_id
+    return "free"
+
+
+async def _resolve_plan(user_id: str) -> str:
+    cache_key = f"rate_plan:{user_id}"
+    plan = await cache.get(cache_key, namespace="user")
+    if plan:
+        return plan
+
+    try:
+        plan = _plan_for(await get_user_by_id(user_id))
+    except Exception as e:
+        logger.warning(f"Rate limit plan bilgisi alınamadı: {e}")
+        return "free"
+    await cache.set(cache_key, plan, ttl=PLAN_CACHE_TTL, namespace="user")
+    return plan
+
+
+def rate_limit(route: str):
+    """
+    Rota bazlı rate limit dependency'si
+
+    Kullanım:
+    ```python
+    @router.post("/teach", dependencies=[Depends(rate_limit("ai"))])
+    ```
+    """
+
+    async def limiter_dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        user_id = _user_id_from_request(request)
+        if user_id:
+            identifier, plan = f"user:{user_id}", await _resolve_plan(user_id)
+        else:
+            client_host = request.client.host if request.client else "unknown"
+            identifier, plan = f"ip:{client_host}", "anonymous"
+
+        allowed, remaining, retry_after = await get_limiter(route, plan).acquire(identifier)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Çok fazla istek. Lütfen biraz sonra tekrar deneyin.",
+                headers={
+                    "Retry-After": str(max(1, round(retry_after))),
+                    "X-RateLimit-Remaining": "0",
+                },
+            )
+        request.state.rate_limit_remaining = remaining
+
+    return limiter_dependency
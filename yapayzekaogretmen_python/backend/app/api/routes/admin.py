@@ -5,6 +5,7 @@ Kapsamlı admin yönetim sistemi.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import PlainTextResponse
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
@@ -18,6 +19,9 @@ from app.services.ai_service import ai_service
 from app.services.auto_learning_service import auto_learning_service
 from app.services.ab_test_service import ab_test_service
 from app.services.auto_training_scheduler import auto_training_scheduler
+from app.services.cache_service import cache
+from app.services.system_metrics import system_metrics
+from app.api.middlewares.rate_limit import get_limiter_stats
 
 
 router = APIRouter(
@@ -107,14 +111,14 @@ async def get_dashboard_stats(
         # AI metrikleri
         ai_performance = await auto_learning_service.analyze_performance()
         
-        # Sistem sağlığı
-        import psutil
+        # Sistem sağlığı (arka plan örnekleyicisinin son ölçümü)
+        host = await system_metrics.snapshot()
         system_health = SystemHealthResponse(
             status="healthy",
-            uptime_hours=round((datetime.utcnow() - datetime(2024, 1, 1)).total_seconds() / 3600, 2),
-            cpu_usage=psutil.cpu_percent(interval=1),
-            memory_usage=psutil.virtual_memory().percent,
-            disk_usage=psutil.disk_usage('/').percent,
+            uptime_hours=system_metrics.uptime_hours,
+            cpu_usage=host.get("cpu_percent", 0.0),
+            memory_usage=host.get("memory_percent", 0.0),
+            disk_usage=host.get("disk_percent", 0.0),
             database_status="connected" if db else "disconnected",
             ai_service_status="active",
             active_users=active_users,
@@ -517,6 +521,48 @@ async def get_api_usage_stats(
         )
 
 
+@router.get("/cache/metrics")
+async def get_cache_metrics(
+    top: int = Query(20, ge=1, le=200, description="Listelenecek top key sayısı"),
+    current_user: User = Depends(check_role([RoleEnum.ADMIN]))
+):
+    """
+    Cache gözlemlenebilirliği: namespace başına hit oranı, hata, bayt,
+    get/set gecikme histogramları, L1/L2 katmanları ve top key'ler
+    """
+    return {
+        **cache.get_metrics(top),
+        "redis_memory": await cache.get_memory_info(),
+        "rate_limiters": get_limiter_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/cache/metrics/prometheus", response_class=PlainTextResponse)
+async def get_cache_metrics_prometheus(
+    current_user: User = Depends(check_role([RoleEnum.ADMIN]))
+):
+    """Cache metrikleri (Prometheus exposition formatı)"""
+    return PlainTextResponse(
+        cache.metrics.prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.get("/system/metrics")
+async def get_system_metrics(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Son N örnek"),
+    current_user: User = Depends(check_role([RoleEnum.ADMIN]))
+):
+    """Dashboard grafikleri için host metrikleri zaman serisi"""
+    return {
+        "latest": await system_metrics.snapshot(),
+        "series": system_metrics.series(limit),
+        "interval": system_metrics.interval,
+        "uptime_hours": system_metrics.uptime_hours
+    }
+
+
 @router.post("/actions/clear-cache")
 async def clear_system_cache(
     current_user: User = Depends(check_role([RoleEnum.ADMIN]))
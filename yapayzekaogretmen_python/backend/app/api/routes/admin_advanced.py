@@ -20,6 +20,7 @@ from app.services.ai_service import ai_service
 from app.services.auto_learning_service import auto_learning_service
 from app.services.ab_test_service import ab_test_service
 from app.services.auto_training_scheduler import auto_training_scheduler
+from app.services.system_metrics import system_metrics
 
 
 router = APIRouter(
@@ -88,18 +89,16 @@ async def realtime_dashboard_stream(
                             "timestamp": {"$gte": one_minute_ago}
                         })
                 
-                # Sistem sağlığı
-                try:
-                    import psutil
+                # Sistem sağlığı (arka plan örnekleyicisinin son ölçümü)
+                host = await system_metrics.snapshot()
+                if host:
                     metrics["system_health"] = {
-                        "cpu": psutil.cpu_percent(interval=0.1),
-                        "memory": psutil.virtual_memory().percent,
-                        "disk": psutil.disk_usage('/').percent,
-                        "network_sent_mb": round(psutil.net_io_counters().bytes_sent / 1024 / 1024, 2),
-                        "network_recv_mb": round(psutil.net_io_counters().bytes_recv / 1024 / 1024, 2)
+                        "cpu": host["cpu_percent"],
+                        "memory": host["memory_percent"],
+                        "disk": host["disk_percent"],
+                        "network_sent_mb": host["network_sent_mb"],
+                        "network_recv_mb": host["network_recv_mb"]
                     }
-                except:
-                    pass
                 
                 # SSE formatında gönder
                 event_data = json.dumps(metrics)
@@ -442,20 +441,16 @@ async def get_ai_recommendations(
             })
         
         # Sistem kaynakları
-        try:
-            import psutil
-            cpu_usage = psutil.cpu_percent(interval=1)
-            if cpu_usage > 80:
-                recommendations.append({
-                    "type": "system",
-                    "severity": "warning",
-                    "title": "Yüksek CPU Kullanımı",
-                    "description": f"CPU kullanımı %{cpu_usage} seviyesinde",
-                    "action": "Kaynak optimizasyonu yapın veya ölçeklendirin",
-                    "impact": "Sistem yanıt sürelerini iyileştirebilir"
-                })
-        except:
-            pass
+        cpu_usage = (await system_metrics.snapshot()).get("cpu_percent", 0.0)
+        if cpu_usage > 80:
+            recommendations.append({
+                "type": "system",
+                "severity": "warning",
+                "title": "Yüksek CPU Kullanımı",
+                "description": f"CPU kullanımı %{cpu_usage} seviyesinde",
+                "action": "Kaynak optimizasyonu yapın veya ölçeklendirin",
+                "impact": "Sistem yanıt sürelerini iyileştirebilir"
+            })
         
         # A/B test önerisi
         db = get_database()
@@ -3,18 +3,22 @@ AI Öğretmen API Routes
 DeepSeek entegrasyonu ile güçlü AI öğretmen
 """
 
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 from loguru import logger
 
-from app.services.ai_service import AIService
+from app.services.ai_service import ai_service
+from app.services.ai_response_cache import ai_response_cache
 from app.services.auto_learning_service import auto_learning_service
 from app.api.middlewares.auth import get_current_user
+from app.api.middlewares.rate_limit import rate_limit
 from app.models.user import User
 
 router = APIRouter()
-ai_service = AIService()
 
 class AITeacherRequest(BaseModel):
     message: str
@@ -23,6 +27,7 @@ class AITeacherRequest(BaseModel):
     context: Optional[str] = None
     conversation_history: Optional[List[Dict]] = None
     user_name: Optional[str] = None
+    session_id: Optional[str] = None  # Uzun oturumlarda geçmiş özeti için
 
 class AITeacherResponse(BaseModel):
     response: str
@@ -30,7 +35,7 @@ class AITeacherResponse(BaseModel):
     provider: str
     confidence: float = 0.9
 
-@router.post("/teach", response_model=AITeacherResponse)
+@router.post("/teach", response_model=AITeacherResponse, dependencies=[Depends(rate_limit("ai"))])
 async def ai_teacher_lesson(
     request: AITeacherRequest
     # current_user: User = Depends(get_current_user)  # Geçici olarak kaldırıldı
@@ -46,12 +51,13 @@ async def ai_teacher_lesson(
             subject=request.subject,
             context=request.context,
             conversation_history=request.conversation_history,
-            user_name=request.user_name
+            user_name=request.user_name,
+            session_id=request.session_id
         )
         
         return AITeacherResponse(
             response=response,
-            model_used=metadata.get("model", "deepseek-chat"),
+            model_used=metadata.get("model_used", "deepseek-chat"),
             provider=metadata.get("provider", "deepseek"),
             confidence=metadata.get("confidence", 0.9)
         )
@@ -63,6 +69,46 @@ async def ai_teacher_lesson(
             detail=f"AI öğretmen yanıt verirken hata oluştu: {str(e)}"
         )
 
+@router.post("/teach/stream", dependencies=[Depends(rate_limit("ai"))])
+async def ai_teacher_lesson_stream(
+    request: AITeacherRequest
+    # current_user: User = Depends(get_current_user)  # Geçici olarak kaldırıldı
+):
+    """
+    AI öğretmen yanıtını Server-Sent Events olarak akıt
+    
+    - `token` olayları: sağlayıcıdan gelen yanıt parçaları
+    - `done` olayı: tam yanıt ve metadata (time_to_first_token dahil)
+    """
+    logger.info(f"AI öğretmen streaming isteği: {request.grade_level}. sınıf {request.subject}")
+    
+    async def event_stream():
+        async for event in ai_service.stream_ai_response(
+            prompt=request.message,
+            grade_level=request.grade_level,
+            subject=request.subject,
+            context=request.context,
+            conversation_history=request.conversation_history,
+            user_name=request.user_name,
+            session_id=request.session_id
+        ):
+            yield _format_sse(event["type"], event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # nginx buffering'i kapat
+        }
+    )
+
+
+def _format_sse(event: str, data: Dict) -> str:
+    """Server-Sent Events formatında mesaj oluştur"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.get("/models")
 async def get_available_models():
     """Kullanılabilir AI modellerini listele"""
@@ -72,6 +118,7 @@ async def get_available_models():
             "current_model": model_info.get("current_model"),
             "current_provider": model_info.get("current_provider"),
             "available_models": model_info.get("available_models", []),
+            "request_coalescing": model_info.get("request_coalescing", {}),
             "status": "active"
         }
     except Exception as e:
@@ -81,6 +128,11 @@ async def get_available_models():
             detail="Model bilgisi alınamadı"
         )
 
+@router.get("/cache/stats")
+async def get_response_cache_stats():
+    """AI yanıt önbelleği istatistikleri (isabet oranı dahil)"""
+    return ai_response_cache.get_stats()
+
 @router.post("/analyze")
 async def analyze_student_question(
     request: AITeacherRequest
@@ -11,6 +11,7 @@ from pydantic import BaseModel, Field
 
 from app.core.logger import logger
 from app.services.auto_learning_service import auto_learning_service
+from app.services.ai_metrics import ai_metrics
 from app.models.user import User, RoleEnum
 from app.utils.auth import get_current_user, check_role
 
@@ -45,6 +46,7 @@ class DashboardResponse(BaseModel):
     model_performances: List[ModelPerformance]
     improvement_areas: List[Dict]
     learning_status: Dict
+    latency_histograms: Dict = {}
 
 
 @router.get("/dashboard", response_model=DashboardResponse)
@@ -106,7 +108,13 @@ async def get_performance_dashboard(
             ),
             model_performances=model_performances,
             improvement_areas=performance["overall"]["improvement_areas"],
-            learning_status=learning_status
+            learning_status=learning_status,
+            latency_histograms={
+                # Periyot boyunca DB'deki kayıtlar (saniye kovaları)
+                "period": performance["overall"].get("latency_histogram", {}),
+                # Bu süreçteki canlı istekler, sağlayıcı/model başına
+                "live": ai_metrics.snapshot()
+            }
         )
         
         return dashboard
@@ -155,6 +163,7 @@ async def get_realtime_metrics(
                 "positive_feedback_rate": sum(1 for i in recent_interactions if i.get("user_feedback") == "positive") / len(recent_interactions) if recent_interactions else 0,
                 "active_models": list(set(i.get("model_used", "unknown") for i in recent_interactions))
             },
+            "latency_histograms": ai_metrics.snapshot(),
             "recent_interactions": [
                 {
                     "timestamp": i["timestamp"].isoformat(),
@@ -162,7 +171,12 @@ async def get_realtime_metrics(
                     "grade_level": i.get("grade_level"),
                     "model": i.get("model_used"),
                     "feedback": i.get("user_feedback"),
-                    "response_time": i.get("response_time")
+                    "response_time": i.get("response_time"),
+                    "time_to_first_token": i.get("time_to_first_token"),
+                    "queue_wait": i.get("queue_wait"),
+                    "prompt_tokens": i.get("prompt_tokens"),
+                    "completion_tokens": i.get("completion_tokens"),
+                    "provider": i.get("provider")
                 }
                 for i in recent_interactions[:10]  # Son 10 etkileşim
             ]
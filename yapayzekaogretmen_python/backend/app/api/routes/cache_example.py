@@ -54,7 +54,7 @@ async def basic_cache_example():
 
 
 @router.get("/cached-function/{user_id}")
-@cached(namespace="user", ttl=300, key_prefix="user_profile")
+@cached(namespace="user", ttl=300, key_prefix="user_profile", tags=["user:{user_id}"])
 async def get_user_profile_cached(user_id: str):
     """
     Cache decorator kullanımı
@@ -12,6 +12,7 @@ from pathlib import Path
 from app.services.pdf_service import PDFService
 from app.services.vector_db_service import VectorDBService
 from app.services.rag_service import RAGService
+from app.services.collection_registry import collection_registry
 from app.api.middlewares.auth import get_current_user
 from app.models.user import User
 from app.core.logger import logger
@@ -54,8 +55,8 @@ async def upload_curriculum_pdf(
         with open(temp_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
-        # PDF'i işle
-        result = rag_service.process_curriculum_pdf(
+        # PDF'i işle (ayrıştırma 'pdf' süreç havuzunda, embedding/yazma 'io' havuzunda)
+        result = await rag_service.process_curriculum_pdf(
             pdf_path=str(temp_path),
             grade=grade,
             subject=subject
@@ -102,8 +103,8 @@ async def process_multiple_pdfs(
             with open(temp_path, "wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
             
-            # PDF'i işle
-            result = rag_service.process_curriculum_pdf(
+            # PDF'i işle (ayrıştırma 'pdf' süreç havuzunda, embedding/yazma 'io' havuzunda)
+            result = await rag_service.process_curriculum_pdf(
                 pdf_path=str(temp_path),
                 grade=grade,
                 subject=subject
@@ -138,17 +139,19 @@ async def list_collections(
 ):
     """Mevcut PDF koleksiyonlarını listele"""
     try:
-        collections = vector_service.list_collections()
+        collections = await vector_service.alist_collections()
         
         # Her koleksiyon için detay bilgi al
         collection_details = []
         for col_name in collections:
-            info = vector_service.get_collection_info(col_name)
+            info = await vector_service.aget_collection_info(col_name)
             collection_details.append(info)
         
         return {
             "count": len(collections),
-            "collections": collection_details
+            "collections": collection_details,
+            "embedding_cache": vector_service.get_embedding_stats(),
+            "registry": collection_registry.get_stats()
         }
         
     except Exception as e:
@@ -166,7 +169,7 @@ async def delete_collection(
 ):
     """Koleksiyonu sil"""
     try:
-        success = vector_service.delete_collection(collection_name)
+        success = await vector_service.adelete_collection(collection_name)
         
         if success:
             return {"message": f"{collection_name} koleksiyonu silindi"}
@@ -197,11 +200,9 @@ async def search_documents(
     try:
         # Koleksiyon belirtilmemişse, uygun olanı bul
         if not collection_name and grade and subject:
-            collections = vector_service.list_collections()
-            for col in collections:
-                if f"grade_{grade}_{subject}" in col:
-                    collection_name = col
-                    break
+            collections = await vector_service.afind_collections(grade, subject)
+            if collections:
+                collection_name = collections[0]
         
         if not collection_name:
             raise HTTPException(
@@ -210,7 +211,7 @@ async def search_documents(
             )
         
         # Arama yap
-        results = vector_service.search_similar_documents(
+        results = await vector_service.asearch_similar_documents(
             collection_name=collection_name,
             query=query,
             k=limit
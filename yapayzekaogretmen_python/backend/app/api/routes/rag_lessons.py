@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict
 
 from app.services.rag_service import RAGService
+from app.services.executor_service import executor
 from app.api.middlewares.auth import get_current_user
 from app.models.user import User
 from app.core.logger import logger
@@ -60,7 +61,10 @@ async def teach_lesson(
     - **collection_name**: Kullanılacak koleksiyon (opsiyonel)
     """
     try:
-        result = rag_service.teach_lesson(
+        # Arama + senkron LLM çağrısı: event loop dışında
+        result = await executor.run(
+            "io",
+            rag_service.teach_lesson,
             student_id=str(current_user.id),
             grade=request.grade,
             subject=request.subject,
@@ -106,7 +110,7 @@ async def ask_question(
     - **use_history**: Konuşma geçmişini kullan
     """
     try:
-        result = rag_service.answer_question(
+        result = await rag_service.answer_question(
             student_id=str(current_user.id),
             question=request.question,
             grade=request.grade,
@@ -148,7 +152,10 @@ async def generate_summary(
     - **collection_name**: Kullanılacak koleksiyon (opsiyonel)
     """
     try:
-        result = rag_service.generate_topic_summary(
+        # Arama + senkron LLM çağrısı: event loop dışında
+        result = await executor.run(
+            "io",
+            rag_service.generate_topic_summary,
             grade=request.grade,
             subject=request.subject,
             topic=request.topic,
@@ -185,14 +192,7 @@ async def get_available_topics(
     """Belirli sınıf ve ders için mevcut konuları listele"""
     try:
         # İlgili koleksiyonları bul
-        from app.services.vector_db_service import VectorDBService
-        vector_service = VectorDBService()
-        
-        collections = vector_service.list_collections()
-        matching_collections = [
-            col for col in collections 
-            if f"grade_{grade}_{subject}" in col
-        ]
+        matching_collections = await rag_service.vector_service.afind_collections(grade, subject)
         
         if not matching_collections:
             return {
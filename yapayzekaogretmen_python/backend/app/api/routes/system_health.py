@@ -14,6 +14,9 @@ from app.services.ai_service import ai_service
 from app.services.auto_learning_service import auto_learning_service
 # from app.services.rag_service import rag_service  # Temporarily disabled
 from app.services.adaptive_learning_service import adaptive_learning_service
+from app.services.executor_service import executor
+from app.services.loop_monitor import loop_monitor
+from app.services.system_metrics import system_metrics
 from app.db.mongodb import get_database
 from app.db.postgres import engine as postgres_engine
 from app.core.config import settings
@@ -151,6 +154,31 @@ async def health_check() -> Dict:
             "error": str(e)
         }
     
+    # Engelleyici iş havuzları (kuyruk derinliği)
+    health_status["services"]["executor"] = {
+        "status": "active",
+        "pools": executor.get_stats()
+    }
+    
+    # Host kaynakları (arka plan örnekleyicisinin son ölçümü)
+    health_status["host"] = {
+        **(system_metrics.latest() or {}),
+        "uptime_hours": system_metrics.uptime_hours,
+        "sampler_running": system_metrics.running
+    }
+    
+    # Event loop gecikmesi ve yavaş callback'ler
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_stats = loop_monitor.get_stats()
+        if not loop_stats["running"]:
+            loop_status = "inactive"
+        elif loop_monitor.last_lag >= loop_monitor.slow_threshold:
+            loop_status = "lagging"
+            health_status["status"] = "degraded"
+        else:
+            loop_status = "active"
+        health_status["services"]["event_loop"] = {"status": loop_status, **loop_stats}
+    
     # Genel durum belirleme
     inactive_services = [
         service for service, status in health_status["services"].items()
@@ -184,7 +212,9 @@ async def get_ai_models() -> Dict:
                 "status": "active"
             }
         },
-        "model_config": ai_service.model_config
+        "model_config": ai_service.model_config,
+        "provider_health": ai_service.provider_health.snapshot(),
+        "hedging": ai_service.hedging.snapshot()
     }
 
 @router.get("/learning-stats")
@@ -5,7 +5,7 @@ import asyncio
 import json
 from datetime import datetime
 
-from app.services.ai_service import AIService
+from app.services.ai_service import ai_service
 from app.services.voice_service import voice_service
 from app.models.user import User
 from app.api.middlewares.auth import get_current_user
@@ -120,7 +120,6 @@ async def ask_ai_voice(
     AI'ya sesli soru sorar
     """
     try:
-        ai_service = AIService()
         response = await ai_service.process_voice_query(
             request.command, 
             current_user.id,
@@ -211,37 +211,26 @@ async def _handle_ai_streaming(websocket: WebSocket, user_id: str, question: str
             "message": "Yanıt hazırlanıyor..."
         })
         
-        # AI yanıtı al (gerçek uygulamada streaming API kullanılmalı)
-        response, metadata = await ai_service.get_ai_response(
+        # Yanıtı sağlayıcıdan geldiği anda parça parça gönder
+        async for event in ai_service.stream_ai_response(
             prompt=question,
             grade_level=context.get("grade_level", 5),
             subject=context.get("subject", "genel"),
             user_name=user_id
-        )
-        
-        # Yanıtı parçalara böl ve gönder (streaming simülasyonu)
-        words = response.split()
-        chunk_size = 5
-        
-        for i in range(0, len(words), chunk_size):
-            chunk = " ".join(words[i:i+chunk_size])
-            
-            await websocket.send_json({
-                "type": "ai_stream_chunk",
-                "chunk": chunk + " ",
-                "is_final": i + chunk_size >= len(words)
-            })
-            
-            # Gerçekçi olması için küçük gecikme
-            import asyncio
-            await asyncio.sleep(0.1)
-        
-        # Tamamlandı bildirimi
-        await websocket.send_json({
-            "type": "ai_stream_complete",
-            "full_response": response,
-            "metadata": metadata
-        })
+        ):
+            if event["type"] == "token":
+                await websocket.send_json({
+                    "type": "ai_stream_chunk",
+                    "chunk": event["content"],
+                    "is_final": False
+                })
+            else:
+                # Tamamlandı bildirimi
+                await websocket.send_json({
+                    "type": "ai_stream_complete",
+                    "full_response": event["response"],
+                    "metadata": event["metadata"]
+                })
         
     except Exception as e:
         logger.error(f"AI streaming hatası: {e}")
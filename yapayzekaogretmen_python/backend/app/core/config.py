@@ -105,6 +105,13 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = 100  # requests per minute
     RATE_LIMIT_WINDOW: int = 60  # seconds
+    # Süreç içi kova: Redis'ten tek seferde kiralanan istek hakkı (0: kapalı)
+    RATE_LIMIT_LOCAL_LEASE: int = 5
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0  # saniye
+    # Rota ve plan bazlı limitler (RATE_LIMIT_WINDOW başına istek)
+    RATE_LIMIT_ROUTES: Dict[str, Dict[str, int]] = {
+        "ai": {"anonymous": 10, "free": 20, "trial": 30, "default": 60, "premium": 120},
+    }
     
     # OpenAI API ayarları
     OPENAI_API_KEY: str = ""
@@ -120,9 +127,75 @@ class Settings(BaseSettings):
     HUGGINGFACE_API_KEY: str = ""  # Opsiyonel, ücretsiz modeller için gerekli değil
     HUGGINGFACE_MODEL_NAME: str = "microsoft/DialoGPT-medium"  # Türkçe için: "dbmdz/bert-base-turkish-cased"
     HUGGINGFACE_ENDPOINT: str = "https://api-inference.huggingface.co/models/"
-  
-  
-    
+
+    # LLM sağlayıcı bağlantı havuzu (keep-alive)
+    DEEPSEEK_BASE_URL: str = "https://api.deepseek.com/v1"
+    LLM_REQUEST_TIMEOUT: float = 60.0  # saniye
+    LLM_CONNECT_TIMEOUT: float = 5.0  # saniye
+    LLM_MAX_CONNECTIONS: int = 200  # Sağlayıcı başına havuz limiti
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    LLM_KEEPALIVE_EXPIRY: float = 30.0  # saniye
+    # Sağlayıcı başına eşzamanlı istek limiti
+    DEEPSEEK_MAX_CONCURRENCY: int = 128
+    OPENAI_MAX_CONCURRENCY: int = 64
+    HUGGINGFACE_MAX_CONCURRENCY: int = 8
+
+    # AI yanıt önbelleği (tekrarlayan müfredat soruları)
+    AI_RESPONSE_CACHE_ENABLED: bool = True
+    AI_RESPONSE_CACHE_TTL: int = 24 * 3600  # saniye
+    AI_RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    AI_RESPONSE_CACHE_SEMANTIC_ENABLED: bool = True
+    AI_RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.92  # Kosinüs benzerliği
+    AI_RESPONSE_CACHE_SEMANTIC_COOLDOWN: float = 30.0  # Geçici embedding hatasından sonra bekleme (saniye)
+
+    # Özdeş eşzamanlı AI isteklerini birleştir (single-flight)
+    AI_REQUEST_COALESCING_ENABLED: bool = True
+
+    # Sağlayıcı circuit breaker ve gecikme tabanlı yönlendirme
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Ardışık hata sayısı
+    AI_CIRCUIT_RECOVERY_TIMEOUT: float = 30.0  # saniye (half-open yoklamaya kadar)
+    AI_LATENCY_WINDOW: int = 200  # Model başına son örnek sayısı
+    AI_LATENCY_MIN_SAMPLES: int = 20
+    AI_SLOW_P95_THRESHOLD: float = 20.0  # saniye
+
+    # Hedged istekler (kuyruk gecikmesini azaltmak için ikinci sağlayıcı)
+    AI_HEDGING_ENABLED: bool = False
+    AI_HEDGE_PERCENTILE: float = 95.0  # Birincil modelin gecikme yüzdeliği
+    AI_HEDGE_MIN_DELAY: float = 0.5  # saniye
+    AI_HEDGE_BUDGET_RATIO: float = 0.05  # Birincil isteklerin en fazla %5'i
+
+    # Konuşma geçmişi token bütçesi
+    AI_HISTORY_MAX_TOKENS: int = 3000
+    AI_HISTORY_SUMMARY_MAX_TOKENS: int = 400
+    AI_HISTORY_SUMMARY_TTL: int = 24 * 3600  # 24 saat
+
+    # Analitik kayıtları için toplu yazma (auto-learning, A/B test)
+    ANALYTICS_BATCH_SIZE: int = 200
+    ANALYTICS_FLUSH_INTERVAL: float = 2.0  # saniye
+    ANALYTICS_BUFFER_MAX: int = 10000
+
+    # Engelleyici işler için adlandırılmış havuzlar (kind: process = CPU, thread = I/O)
+    EXECUTOR_POOLS: Dict[str, Dict[str, Any]] = {
+        "ocr": {"kind": "process", "workers": 2, "max_queue": 32},  # Tesseract, denoise
+        "pdf": {"kind": "process", "workers": 1, "max_queue": 8},  # PDF ayrıştırma
+        "vision": {"kind": "thread", "workers": 2, "max_queue": 32},  # OpenCV (GIL'i bırakır)
+        "vector": {"kind": "thread", "workers": 4, "max_queue": 64},  # Chroma/FAISS araması
+        "io": {"kind": "thread", "workers": 8, "max_queue": 128},  # Genel engelleyici I/O
+    }
+    EXECUTOR_QUEUE_TIMEOUT: float = 30.0  # saniye; havuzda yer bekleme üst sınırı
+    EXECUTOR_PROCESS_START_METHOD: str = "spawn"  # thread'li süreçte fork güvenli değil
+
+    # Doküman embedding önbelleği (model + içerik hash'i, float16)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_BATCH_SIZE: int = 64  # modele tek seferde gönderilen parça sayısı
+    # RAG çoklu koleksiyon araması
+    RAG_MAX_COLLECTIONS: int = 8  # paralel aranan en fazla koleksiyon
+    RAG_PER_COLLECTION_K: int = 4
+    RAG_RRF_K: int = 60  # Reciprocal Rank Fusion sabiti
+    RAG_CONTEXT_MAX_TOKENS: int = 2000  # LLM'e verilen bağlamın token bütçesi
+    COLLECTION_REGISTRY_REFRESH_INTERVAL: float = 300.0  # saniye; başka worker'ların ingest'leri için tam tarama
+    COLLECTION_REGISTRY_MIN_FORCED_REFRESH_INTERVAL: float = 5.0  # bilinmeyen ad için taramalar arası en az süre
+
     # Dosya yolları
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     LOGS_DIR: Path = BASE_DIR / "logs"
@@ -159,6 +232,27 @@ class Settings(BaseSettings):
     CACHE_TTL: int = 300  # 5 minutes
     CACHE_MAX_SIZE: int = 10000  # Maximum cache entries
     CACHE_KEY_PREFIX: str = "yzogretmen:"
+    CACHE_BACKEND: str = "auto"  # auto (Redis yoksa tek worker'da bellek, çok worker'da yeniden dene), redis veya memory
+    CACHE_RECONNECT_INTERVAL: float = 2.0  # saniye; Redis'e ilk yeniden bağlanma denemesi
+    CACHE_RECONNECT_MAX_INTERVAL: float = 60.0
+    WEB_CONCURRENCY: int = 1  # uvicorn worker sayısı (run.py ayarlar)
+    CACHE_MEMORY_SWEEP_INTERVAL: float = 30.0  # saniye; süresi dolan key temizliği
+    # L1 süreç içi önbellek (Redis önünde, pub/sub ile invalidation)
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_NAMESPACES: List[str] = ["user", "lesson", "gamification", "translations", "search"]
+    CACHE_L1_MAX_ENTRIES: int = 1000  # namespace başına
+    CACHE_L1_TTL: int = 30  # saniye (kaçan invalidation için üst sınır)
+    CACHE_CODEC: str = "msgpack"  # msgpack veya json
+    CACHE_COMPRESSION_THRESHOLD: int = 1024  # bayt; üstü zstd ile sıkıştırılır
+    CACHE_COMPRESSION_LEVEL: int = 3
+    # @cached stampede koruması
+    CACHE_STALE_TTL: int = 60  # saniye; süresi dolan değer yenilenirken sunulur
+    CACHE_EARLY_EXPIRATION_BETA: float = 1.0  # 0 ise olasılıksal erken yenileme kapalı
+    CACHE_NEGATIVE_TTL: int = 30  # None sonuçların saklanma süresi
+    CACHE_LOCK_TTL: int = 10  # worker'lar arası yeniden hesaplama kilidi
+    # Cache metrikleri
+    CACHE_METRICS_KEY_SAMPLE_RATE: float = 0.1  # top key tablosu için örnekleme oranı
+    CACHE_METRICS_TOP_KEYS_CAPACITY: int = 2000
     
     # Elasticsearch ayarları
     ELASTICSEARCH_URL: str = "http://localhost:9200"
@@ -187,7 +281,16 @@ class Settings(BaseSettings):
     
     # Monitoring
     SENTRY_DSN: str = ""
-    
+    # Event loop gecikme izleyici
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.5  # saniye; gecikme örnekleme aralığı
+    LOOP_SLOW_CALLBACK_THRESHOLD: float = 0.1  # saniye; üstü stack ile loglanır
+    LOOP_SLOW_CALLBACK_HISTORY: int = 20  # /system/health'te tutulan son olay sayısı
+    # Arka plan host metrikleri (CPU, bellek, disk, ağ)
+    SYSTEM_METRICS_INTERVAL: float = 5.0  # saniye
+    SYSTEM_METRICS_HISTORY: int = 120  # halka tampon boyutu (5 sn ile 10 dakika)
+    SYSTEM_METRICS_DISK_PATH: str = "/"
+
     # Loglama ayarları
     LOG_LEVEL: str = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
     LOG_FORMAT: str = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}"
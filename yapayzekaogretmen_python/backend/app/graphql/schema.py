@@ -651,18 +651,27 @@ class Subscription:
     @strawberry.subscription
     async def ai_stream(self, input: AIQuestionInput) -> AIStreamResponse:
         """AI yanıtını streaming olarak al"""
-        # AI yanıtını parçalar halinde gönder
-        full_response = "Bu bir örnek AI yanıtıdır. Streaming olarak gönderiliyor."
-        words = full_response.split()
+        token_count = 0
         
-        for i, word in enumerate(words):
-            await asyncio.sleep(0.1)  # Simülasyon
-            
-            yield AIStreamResponse(
-                chunk=word + " ",
-                is_final=(i == len(words) - 1),
-                token_count=i + 1
-            )
+        async for event in ai_service.stream_ai_response(
+            prompt=input.question,
+            grade_level=input.grade_level,
+            subject=input.subject,
+            context=input.context
+        ):
+            if event["type"] == "token":
+                token_count += 1
+                yield AIStreamResponse(
+                    chunk=event["content"],
+                    is_final=False,
+                    token_count=token_count
+                )
+            else:
+                yield AIStreamResponse(
+                    chunk="",
+                    is_final=True,
+                    token_count=token_count
+                )
 
 
 # Schema
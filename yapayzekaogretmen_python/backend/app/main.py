@@ -54,6 +54,15 @@ async def lifespan(app: FastAPI):
     
     # Veritabanı bağlantıları
     await connect_to_db()
+
+    # Event loop gecikme / yavaş callback izleyici
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.services.loop_monitor import loop_monitor
+        loop_monitor.start()
+
+    # Host metrikleri (CPU, bellek, disk) arka plan örnekleyicisi
+    from app.services.system_metrics import system_metrics
+    system_metrics.start()
     
     logger.info(f"✅ {settings.PROJECT_NAME} başlatıldı - Sürüm: {settings.VERSION}")
     logger.info(f"📖 API Docs: http://{settings.HOST}:{settings.PORT}/api/docs")
@@ -62,6 +71,44 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info(f"🛑 {settings.PROJECT_NAME} kapatılıyor...")
+
+    # Arka plan izleme görevlerini durdur
+    from app.services.system_metrics import system_metrics
+    await system_metrics.stop()
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.services.loop_monitor import loop_monitor
+        await loop_monitor.stop()
+
+    # AI sağlayıcı bağlantı havuzlarını kapat
+    try:
+        from app.services.ai_service import ai_service
+        await ai_service.aclose()
+    except Exception as e:
+        logger.warning(f"⚠️ AI sağlayıcı havuzları kapatılamadı: {e}")
+
+    # Tamponlanmış analitik kayıtlarını DB kapanmadan yaz
+    try:
+        from app.services.auto_learning_service import auto_learning_service
+        from app.services.ab_test_service import ab_test_service
+        await auto_learning_service.aclose()
+        await ab_test_service.aclose()
+    except Exception as e:
+        logger.warning(f"⚠️ Analitik tamponları boşaltılamadı: {e}")
+
+    # Redis cache bağlantısını ve invalidation dinleyicisini kapat
+    try:
+        from app.services.cache_service import cache
+        await cache.disconnect()
+    except Exception as e:
+        logger.warning(f"⚠️ Redis cache bağlantısı kapatılamadı: {e}")
+
+    # Engelleyici iş havuzlarını (thread/süreç) kapat
+    try:
+        from app.services.executor_service import executor
+        executor.shutdown()
+    except Exception as e:
+        logger.warning(f"⚠️ Executor havuzları kapatılamadı: {e}")
+
     await close_db_connections()
     logger.info("👋 Güle güle!")
 
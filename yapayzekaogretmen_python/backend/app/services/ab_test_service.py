@@ -12,6 +12,7 @@ from loguru import logger
 
 from app.core.config import settings
 from app.db.mongodb import get_database
+from app.services.batch_writer import BatchWriter
 
 
 class ABTestService:
@@ -28,6 +29,13 @@ class ABTestService:
         self._cache_ttl = 300  # 5 dakika
         self._last_cache_update = None
         
+        # Olaylar tek tek değil toplu yazılır
+        self.event_writer = BatchWriter(
+            "ab_test_events",
+            lambda: self.results_collection,
+            on_flush=self._on_events_flush
+        )
+        
         logger.info("A/B Test Service başlatıldı")
     
     async def create_experiment(self, experiment_config: Dict) -> Dict:
@@ -172,15 +180,8 @@ class ABTestService:
                 "metadata": event_data.get("metadata", {})
             }
             
-            if self.results_collection:
-                await self.results_collection.insert_one(event)
-                
-            # Gerçek zamanlı metrik güncelleme
-            await self._update_experiment_metrics(
-                event_data["experiment_id"],
-                event_data["variant_id"],
-                event_data.get("metrics", {})
-            )
+            # Toplu yazma tamponuna ekle; metrikler flush sırasında birleştirilir
+            self.event_writer.add(event)
             
         except Exception as e:
             logger.error(f"Olay kaydetme hatası: {e}")
@@ -407,6 +408,22 @@ class ABTestService:
         except Exception as e:
             logger.error(f"Metrik güncelleme hatası: {e}")
     
+    async def _on_events_flush(self, events: List[Dict]) -> None:
+        """Toplu yazılan olayların metriklerini deney başına tek güncellemede topla"""
+        totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+        for event in events:
+            metrics = totals.setdefault((event["experiment_id"], event["variant_id"]), {})
+            for metric_name, metric_value in event["metrics"].items():
+                if isinstance(metric_value, (int, float)):
+                    metrics[metric_name] = metrics.get(metric_name, 0) + metric_value
+        
+        for (experiment_id, variant_id), metrics in totals.items():
+            await self._update_experiment_metrics(experiment_id, variant_id, metrics)
+    
+    async def aclose(self) -> None:
+        """Bekleyen olay kayıtlarını yaz"""
+        await self.event_writer.aclose()
+    
     def _perform_statistical_analysis(self, results: Dict) -> Dict:
         """İstatistiksel analiz yap"""
         try:
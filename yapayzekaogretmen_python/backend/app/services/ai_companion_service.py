@@ -32,6 +32,7 @@ except ImportError:
 from app.core.config import settings
 from app.db.mongodb import get_database
 from app.services.ai_service import ai_service
+from app.services.prompt_templates import prompt_templates
 from app.services.cache_service import cache, cached
 from app.services.notification_service import notification_service
 from app.services.gamification_service import gamification_service
@@ -341,7 +342,8 @@ class AICompanionService:
                     {"role": "human" if isinstance(m, HumanMessage) else "assistant", "content": m.content}
                     for m in messages
                 ],
-                user_name=profile.name
+                user_name=profile.name,
+                session_id=f"companion:{user_id}"
             )
             
             # Memory'ye ekle
@@ -384,9 +386,15 @@ class AICompanionService:
         lesson_context: Optional[Dict]
     ) -> str:
         """AI arkadaş sistem promptu oluştur"""
-        prompt = f"""Sen {companion.name}, bir AI öğrenme arkadaşısın.
+        # Karakter ve konu başına bir kez derlenen sabit önek
+        prompt = prompt_templates.get_or_compile(
+            ("companion", companion.id, subject),
+            lambda: self._compile_companion_prompt(companion, subject)
+        )
+        
+        # Öğrenciye özel kısım sona eklenir
+        prompt += f"""
 
-Kişiliğin: {companion.personality}
 Öğrenci Bilgileri:
 - İsim: {profile.name}
 - Yaş: {profile.age}
@@ -394,7 +402,31 @@ Kişiliğin: {companion.personality}
 - Öğrenme Stili: {profile.learning_style}
 - İlgi Alanları: {', '.join(profile.interests)}
 
-Öğrencinin Şu Anki Duygu Durumu: {emotion}
+Öğrencinin Şu Anki Duygu Durumu: {emotion}"""
+        
+        if emotion in self.EMOTION_GUIDELINES:
+            prompt += f"\n\nÖzel Dikkat: {self.EMOTION_GUIDELINES[emotion]}"
+        
+        # Ders bağlamı
+        if lesson_context:
+            prompt += f"\n\nDers Bilgisi: {json.dumps(lesson_context, ensure_ascii=False, sort_keys=True)}"
+        
+        return prompt
+    
+    # Duygu durumuna göre ek yönergeler
+    EMOTION_GUIDELINES = {
+        EmotionalState.CONFUSED: "Sabırlı ol, adım adım açıkla, örnekler ver",
+        EmotionalState.FRUSTRATED: "Sakinleştir, başarılı olduğu noktaları hatırlat",
+        EmotionalState.BORED: "Eğlenceli örnekler kullan, oyunlaştır",
+        EmotionalState.STRESSED: "Rahatlatıcı ol, derin nefes almayı öner",
+        EmotionalState.HAPPY: "Enerjisini koru, başarılarını kutla"
+    }
+    
+    def _compile_companion_prompt(self, companion: CompanionCharacter, subject: Optional[str]) -> str:
+        """Öğrenciden bağımsız AI arkadaş prompt gövdesi"""
+        prompt = f"""Sen {companion.name}, bir AI öğrenme arkadaşısın.
+
+Kişiliğin: {companion.personality}
 
 Davranış Kuralları:
 1. Yaşına uygun, samimi ve destekleyici bir dil kullan
@@ -405,18 +437,6 @@ Davranış Kuralları:
 6. Hataları öğrenme fırsatı olarak göster
 7. Merak uyandıracak sorular sor
 """
-
-        # Duygu durumuna göre ek yönergeler
-        emotion_guidelines = {
-            EmotionalState.CONFUSED: "Sabırlı ol, adım adım açıkla, örnekler ver",
-            EmotionalState.FRUSTRATED: "Sakinleştir, başarılı olduğu noktaları hatırlat",
-            EmotionalState.BORED: "Eğlenceli örnekler kullan, oyunlaştır",
-            EmotionalState.STRESSED: "Rahatlatıcı ol, derin nefes almayı öner",
-            EmotionalState.HAPPY: "Enerjisini koru, başarılarını kutla"
-        }
-        
-        if emotion in emotion_guidelines:
-            prompt += f"\n\nÖzel Dikkat: {emotion_guidelines[emotion]}"
         
         # Konu bağlamı
         if subject:
@@ -424,10 +444,6 @@ Davranış Kuralları:
             if subject in companion.specialty_subjects:
                 prompt += f"\nBu senin uzmanlık alanın! Bilgini ve tutkunla öğrenciyi etkile."
         
-        # Ders bağlamı
-        if lesson_context:
-            prompt += f"\n\nDers Bilgisi: {json.dumps(lesson_context, ensure_ascii=False)}"
-        
         # Catchphrase kullan
         prompt += f"\n\nSık kullandığın sözler: {', '.join(companion.catchphrases)}"
         
@@ -0,0 +1,106 @@
+"""
+AI İstek Metrikleri - Gecikme Histogramları
+-------------------------------------------
+Her AI isteği için kuyruk bekleme, ilk token süresi, üretim süresi, toplam süre ve token
+kullanımını (sağlayıcı, model) başına histogram kovalarında toplar.
+Ortalamalar kuyruk gecikmesini gizlediği için izleme ekranı kovaları kullanır.
+"""
+
+import bisect
+from typing import Dict, Optional, Sequence, Tuple
+
+# Saniye cinsinden kova üst sınırları (son kova +Inf)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Sabit kovalı histogram (Prometheus tarzı üst sınırlar)"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Kova üst sınırına göre yaklaşık yüzdelik"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class AIRequestMetrics:
+    """(sağlayıcı, model) başına gecikme histogramları ve token sayaçları"""
+
+    STAGES = ("queue_wait", "time_to_first_token", "generation_time", "total_time")
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Dict[str, Histogram]] = {}
+        self._tokens: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def observe(
+        self,
+        provider: str,
+        model: str,
+        queue_wait: float,
+        time_to_first_token: float,
+        total_time: float,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        generation_time: Optional[float] = None,
+    ):
+        key = (provider, model)
+        histograms = self._histograms.setdefault(
+            key, {stage: Histogram() for stage in self.STAGES}
+        )
+        histograms["queue_wait"].observe(queue_wait)
+        histograms["time_to_first_token"].observe(time_to_first_token)
+        histograms["total_time"].observe(total_time)
+        if generation_time is not None:
+            histograms["generation_time"].observe(generation_time)
+
+        tokens = self._tokens.setdefault(
+            key, {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        )
+        tokens["requests"] += 1
+        tokens["prompt_tokens"] += prompt_tokens or 0
+        tokens["completion_tokens"] += completion_tokens or 0
+
+    def snapshot(self) -> Dict:
+        return {
+            f"{provider}/{model}": {
+                **{stage: histogram.snapshot() for stage, histogram in histograms.items()},
+                "tokens": self._tokens[(provider, model)],
+            }
+            for (provider, model), histograms in self._histograms.items()
+        }
+
+    def reset(self):
+        self._histograms.clear()
+        self._tokens.clear()
+
+
+# Global instance
+ai_metrics = AIRequestMetrics()
@@ -0,0 +1,286 @@
+"""
+AI Yanıt Önbelleği - Semantik Cache
+-----------------------------------
+Aynı sınıf ve dersteki tekrarlayan sorular ("kesir nedir?") için ücretli
+sağlayıcıya gitmeden önce önbellekten yanıt döndürür.
+
+İki aşamalı arama:
+1. Birebir eşleşme: (sınıf, ders, normalize edilmiş soru) anahtarı
+2. Semantik eşleşme: VectorDBService embedding'leri ile kosinüs benzerliği
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import settings
+from app.services.cache_service import cache
+from app.services.executor_service import PoolSaturatedError, executor
+
+
+class EmbeddingModelUnavailable(Exception):
+    """Embedding modeli içe aktarılamadı veya yüklenemedi (kalıcı hata)"""
+
+
+@dataclass
+class CacheEntry:
+    """Önbellekteki tek bir yanıt"""
+    response: str
+    metadata: Dict
+    bucket: Tuple[int, str]
+    expires_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+@dataclass
+class CacheLookup:
+    """Önbellek arama sonucu (miss durumunda set için anahtar ve embedding taşır)"""
+    key: str
+    bucket: Tuple[int, str]
+    prompt: str
+    response: Optional[str] = None
+    metadata: Dict = field(default_factory=dict)
+    embedding: Optional[np.ndarray] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.response is not None
+
+
+class AIResponseCache:
+    """Süreç içi LRU + TTL yanıt önbelleği, Redis ile paylaşılan birebir katman"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.AI_RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.AI_RESPONSE_CACHE_TTL,
+        similarity_threshold: float = settings.AI_RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+        semantic_enabled: bool = settings.AI_RESPONSE_CACHE_SEMANTIC_ENABLED,
+        embeddings=None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.semantic_enabled = semantic_enabled
+        self._embeddings = embeddings
+        # Geçici embedding hatasından sonra semantik aramanın yeniden deneneceği an
+        self._semantic_retry_at = 0.0
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # (sınıf, ders) -> {anahtar: embedding}
+        self._buckets: Dict[Tuple[int, str], Dict[str, np.ndarray]] = {}
+
+        self.stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Anahtar üretimi
+    # ------------------------------------------------------------------
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Soruyu karşılaştırma için normalize et (Türkçe küçük harf, noktalama yok)"""
+        text = prompt.replace("I", "ı").replace("İ", "i").lower()
+        text = re.sub(r"[^\w\s]", " ", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    @staticmethod
+    def _bucket(grade_level: int, subject: str) -> Tuple[int, str]:
+        return int(grade_level), subject.strip().lower()
+
+    def make_key(self, prompt: str, grade_level: int, subject: str) -> str:
+        grade, subject_key = self._bucket(grade_level, subject)
+        raw = f"{grade}|{subject_key}|{self.normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Arama / kayıt
+    # ------------------------------------------------------------------
+    def record_bypass(self):
+        self.stats["bypassed"] += 1
+
+    async def get(self, prompt: str, grade_level: int, subject: str) -> CacheLookup:
+        """Önce birebir, sonra semantik eşleşme ara"""
+        key = self.make_key(prompt, grade_level, subject)
+        bucket = self._bucket(grade_level, subject)
+        lookup = CacheLookup(key=key, bucket=bucket, prompt=prompt)
+
+        # 1) Süreç içi birebir eşleşme
+        entry = self._get_entry(key)
+        if entry:
+            self.stats["exact_hits"] += 1
+            lookup.response = entry.response
+            lookup.metadata = {**entry.metadata, "cache_hit": "exact"}
+            return lookup
+
+        # 2) Diğer worker'ların Redis'e yazdığı birebir eşleşme
+        shared = await cache.get(key, namespace="ai")
+        if isinstance(shared, dict) and "response" in shared:
+            self.stats["exact_hits"] += 1
+            # L1 kopyası Redis kaydından uzun yaşamasın: kalan süre korunur
+            remaining = await cache.get_ttl(key, namespace="ai")
+            self._store(
+                key, bucket, shared["response"], shared.get("metadata", {}), None,
+                ttl=remaining if remaining is not None else self.ttl_seconds,
+            )
+            lookup.response = shared["response"]
+            lookup.metadata = {**shared.get("metadata", {}), "cache_hit": "exact"}
+            return lookup
+
+        # 3) Semantik eşleşme
+        if self.semantic_enabled and self._buckets.get(bucket):
+            lookup.embedding = await self._embed(prompt)
+            match = self._find_similar(bucket, lookup.embedding)
+            if match:
+                match_key, similarity = match
+                entry = self._get_entry(match_key)
+                if entry:
+                    self.stats["semantic_hits"] += 1
+                    lookup.response = entry.response
+                    lookup.metadata = {
+                        **entry.metadata,
+                        "cache_hit": "semantic",
+                        "similarity": round(similarity, 4)
+                    }
+                    return lookup
+
+        self.stats["misses"] += 1
+        return lookup
+
+    async def set(self, lookup: CacheLookup, response: str, metadata: Dict):
+        """Miss sonrası üretilen yanıtı önbelleğe al"""
+        embedding = lookup.embedding
+        if self.semantic_enabled and embedding is None:
+            embedding = await self._embed(lookup.prompt)
+
+        self._store(lookup.key, lookup.bucket, response, metadata, embedding)
+        await cache.set(
+            lookup.key,
+            {"response": response, "metadata": metadata},
+            ttl=self.ttl_seconds,
+            namespace="ai"
+        )
+
+    def clear(self):
+        self._entries.clear()
+        self._buckets.clear()
+
+    def get_stats(self) -> Dict:
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "similarity_threshold": self.similarity_threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "semantic_enabled": self.semantic_enabled,
+        }
+
+    # ------------------------------------------------------------------
+    # İç yardımcılar
+    # ------------------------------------------------------------------
+    def _get_entry(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, bucket, response, metadata, embedding, ttl: Optional[float] = None):
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(
+            response=response,
+            metadata=metadata,
+            bucket=bucket,
+            expires_at=time.monotonic() + (self.ttl_seconds if ttl is None else ttl),
+            embedding=embedding,
+        )
+        if embedding is not None:
+            self._buckets.setdefault(bucket, {})[key] = embedding
+
+        # LRU tahliyesi
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry.bucket)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[entry.bucket]
+
+    def _find_similar(self, bucket, embedding) -> Optional[Tuple[str, float]]:
+        if embedding is None:
+            return None
+        candidates = self._buckets.get(bucket)
+        if not candidates:
+            return None
+
+        keys = list(candidates.keys())
+        matrix = np.stack([candidates[k] for k in keys])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return keys[best], float(scores[best])
+        return None
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Soruyu VectorDBService embedding modeliyle vektörleştir (event loop dışında)"""
+        if time.monotonic() < self._semantic_retry_at:
+            return None
+        try:
+            vector = await executor.run("vector", self._embed_sync, text)
+        except PoolSaturatedError:
+            # Geçici yoğunluk: bu istek için semantik aramayı atla
+            return None
+        except EmbeddingModelUnavailable as e:
+            # Embedding modeli yüklenemiyorsa sadece birebir eşleşme ile devam et
+            logger.warning(f"Semantik önbellek devre dışı: {e}")
+            self.semantic_enabled = False
+            return None
+        except Exception as e:
+            # Geçici hata (ağ, zaman aşımı): bir süre semantik aramayı atla
+            logger.warning(f"Semantik önbellek geçici olarak atlanıyor: {e}")
+            self._semantic_retry_at = time.monotonic() + settings.AI_RESPONSE_CACHE_SEMANTIC_COOLDOWN
+            return None
+
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed_sync(self, text: str):
+        if self._embeddings is None:
+            try:
+                from app.services.vector_db_service import get_embeddings
+                self._embeddings = get_embeddings()
+            except Exception as e:
+                raise EmbeddingModelUnavailable(str(e)) from e
+        return self._embeddings.embed_query(self.normalize_prompt(text))
+
+
+# Global instance
+ai_response_cache = AIResponseCache()
@@ -5,19 +5,28 @@ MEB müfredatına uygun fine-tuned model entegrasyonu
 
 import os
 import json
-from typing import Dict, List, Optional, Tuple
+import time
+import hashlib
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
-import openai
-from openai import OpenAI
-import logging
-import requests
 
 from app.core.config import settings
 from app.core.logger import logger
+from app.services.llm_providers import LLMResponse, ProviderError, create_default_providers
+from app.services.ai_response_cache import ai_response_cache
+from app.services.provider_health import HedgingPolicy, ProviderHealthRegistry
+from app.services.prompt_templates import prompt_templates
+from app.services import token_counter
+from app.services.conversation_history import history_manager
+from app.services.ai_metrics import ai_metrics
 # Circular import fix - moved to end of file
 from app.services.ab_test_service import ab_test_service
 from app.services.auto_learning_service import auto_learning_service
 
+# Paylaşılan (birleştirilen) yanıtlarda öğrenci adının yerini tutar
+STUDENT_NAME_PLACEHOLDER = "{ogrenci_adi}"
+
 
 class AIService:
     """Fine-tuned model ve DeepSeek destekli AI servisi"""
@@ -32,14 +41,16 @@ class AIService:
         if not any([self.openai_api_key, self.deepseek_api_key, True]):  # HF her zaman kullanılabilir
             raise ValueError("En az bir API anahtarı gerekli!")
         
-        # OpenAI client
-        self.openai_client = OpenAI(api_key=self.openai_api_key) if self.openai_api_key else None
+        # Async sağlayıcılar (keep-alive havuzu + eşzamanlılık limiti)
+        self.providers = create_default_providers(
+            openai_api_key=self.openai_api_key,
+            deepseek_api_key=self.deepseek_api_key,
+            huggingface_api_key=self.huggingface_api_key
+        )
         
-        # DeepSeek client (OpenAI uyumlu)
-        self.deepseek_client = OpenAI(
-            api_key=self.deepseek_api_key,
-            base_url="https://api.deepseek.com/v1"
-        ) if self.deepseek_api_key else None
+        # OpenAI / DeepSeek async client'ları (OpenAI uyumlu)
+        self.openai_client = self.providers["openai"].client if "openai" in self.providers else None
+        self.deepseek_client = self.providers["deepseek"].client if "deepseek" in self.providers else None
         
         # Hugging Face endpoint
         self.huggingface_endpoint = getattr(settings, 'HUGGINGFACE_ENDPOINT', 'https://api-inference.huggingface.co/models/')
@@ -49,6 +60,14 @@ class AIService:
         self.model_config = self._load_model_config()
         self.current_model, self.current_provider = self._select_best_model()
         
+        # Sağlayıcı circuit breaker'ları ve model gecikme takibi
+        self.provider_health = ProviderHealthRegistry()
+        self.hedging = HedgingPolicy()
+        
+        # Aynı anda gelen özdeş istekleri tek upstream çağrısında birleştir
+        self._inflight_requests: Dict[str, asyncio.Task] = {}
+        self.coalescing_stats = {"upstream_calls": 0, "collapsed_calls": 0}
+        
         logger.info(f"AI Service başlatıldı. Model: {self.current_model} (Provider: {self.current_provider})")
     
     def _load_model_config(self) -> Dict:
@@ -122,125 +141,75 @@ class AIService:
         context: Optional[str] = None,
         conversation_history: Optional[List[Dict]] = None,
         user_name: Optional[str] = None,
-        experiment_id: Optional[str] = None  # A/B test desteği
+        experiment_id: Optional[str] = None,  # A/B test desteği
+        session_id: Optional[str] = None
     ) -> Tuple[str, Dict]:
         """AI yanıtı al"""
+        started_at = time.perf_counter()
         
         try:
-            # A/B test varyant seçimi
-            variant_id = None
-            selected_model = self.current_model
-            selected_provider = self.current_provider
-            
-            if experiment_id and user_name:  # A/B test aktifse
-                try:
-                    # Varyant ata
-                    variant_id = await ab_test_service.assign_variant(user_name, experiment_id)
-                    
-                    # Varyanta göre model seç
-                    if variant_id and variant_id != "control":
-                        # A/B test modelini kullan
-                        variant_models = {
-                            "variant_a": ("deepseek-chat", "deepseek"),
-                            "variant_b": ("deepseek-reasoner", "deepseek"),
-                            "variant_c": ("gpt-3.5-turbo", "openai")
-                        }
-                        
-                        if variant_id in variant_models:
-                            selected_model, selected_provider = variant_models[variant_id]
-                            logger.info(f"A/B test variant seçildi: {variant_id} -> {selected_model}")
-                
-                except Exception as e:
-                    logger.warning(f"A/B test varyant seçimi başarısız: {e}")
-            
-            # Sistem promptu oluştur
-            system_prompt = self._create_system_prompt(grade_level, subject, user_name)
-            
-            # Mesajları hazırla
-            messages = [{"role": "system", "content": system_prompt}]
+            # Tekrarlayan sorular için yanıt önbelleği
+            cache_lookup = await self._lookup_cache(
+                prompt, grade_level, subject, context, conversation_history, experiment_id
+            )
+            if cache_lookup and cache_lookup.hit:
+                return cache_lookup.response, {
+                    **cache_lookup.metadata,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
             
-            # Konuşma geçmişi varsa ekle
-            if conversation_history:
-                messages.extend(conversation_history[-6:])  # Son 6 mesaj
+            # A/B test varyant seçimi
+            variant_id, selected_model, selected_provider = await self._select_variant(
+                experiment_id, user_name
+            )
             
-            # Kullanıcı mesajı
-            user_message = prompt
-            if context:
-                user_message = f"Bağlam: {context}\n\nSoru: {prompt}"
+            # Ad prompt'a girmez: aynı soruyu soran öğrenciler tek çağrıda birleşir
+            messages = await self._build_messages(
+                prompt, grade_level, subject, context, conversation_history, user_name,
+                model=selected_model, session_id=session_id, name_placeholder=True
+            )
             
-            messages.append({"role": "user", "content": user_message})
+            # Model çağrısı (A/B test varsa seçilen modeli kullan).
+            # Paylaşılan current_model'i değiştirmek eşzamanlı isteklerde
+            # yarış durumuna yol açacağından model parametre olarak geçilir.
+            response = await self._call_model_coalesced(
+                messages,
+                model=selected_model,
+                provider=selected_provider
+            )
             
-            # Model çağrısı (A/B test varsa seçilen modeli kullan)
-            if variant_id and selected_provider:
-                # Geçici olarak modeli değiştir
-                original_model = self.current_model
-                original_provider = self.current_provider
-                self.current_model = selected_model
-                self.current_provider = selected_provider
-                
-                try:
-                    response = self._call_model_with_fallback(messages)
-                finally:
-                    # Orijinal modele geri dön
-                    self.current_model = original_model
-                    self.current_provider = original_provider
-            else:
-                response = self._call_model_with_fallback(messages)
+            # Yanıt
+            ai_response = self._personalize(response.content, user_name)
+            total_time = time.perf_counter() - started_at
             
             # Metadata
             metadata = {
-                "model_used": getattr(response, 'model', self.current_model),
+                "model_used": response.model,
+                "provider": response.provider,
                 "grade_level": grade_level,
                 "subject": subject,
                 "timestamp": datetime.utcnow().isoformat(),
-                "tokens_used": getattr(response.usage, 'total_tokens', None) if hasattr(response, 'usage') and response.usage else None
+                **self._token_usage(messages, ai_response, response),
+                "queue_wait": round(response.queue_wait, 4),
+                "generation_time": round(response.generation_time, 4),
+                # Streaming olmayan yanıtta ilk token tam yanıtla gelir
+                "time_to_first_token": round(total_time, 4),
+                "total_time": round(total_time, 4)
             }
             
-            # Yanıt
-            ai_response = response.choices[0].message.content
-            
-            # Auto-learning için etkileşim verisini kaydet
-            try:
-                import asyncio
-                interaction_data = {
-                    "user_id": user_name,  # Geçici olarak user_name kullanıyoruz
-                    "grade_level": grade_level,
-                    "subject": subject,
-                    "question": prompt,
-                    "ai_response": ai_response,
-                    "model_used": getattr(response, 'model', self.current_model),
-                    "response_time": 1.0,  # Gerçek response time hesaplanabilir
-                    "confidence_score": 0.9  # Model confidence score'u alınabilir
-                }
-                
-                # Asenkron olarak kaydet (bloklamamak için)
-                asyncio.create_task(
-                    auto_learning_service.collect_learning_data(interaction_data)
-                )
-            except Exception as e:
-                logger.warning(f"Auto-learning veri kaydı başarısız: {e}")
+            self._record_interaction(
+                prompt=prompt,
+                ai_response=ai_response,
+                grade_level=grade_level,
+                subject=subject,
+                user_name=user_name,
+                experiment_id=experiment_id,
+                variant_id=variant_id,
+                metadata=metadata
+            )
             
-            # A/B test olayını kaydet
-            if experiment_id and variant_id:
-                try:
-                    ab_event_data = {
-                        "user_id": user_name or "anonymous",
-                        "experiment_id": experiment_id,
-                        "variant_id": variant_id,
-                        "event_type": "ai_interaction",
-                        "metrics": {
-                            "response_time": 1.0,  # Gerçek süre hesaplanabilir
-                            "model": metadata["model_used"],
-                            "grade_level": grade_level,
-                            "subject": subject
-                        }
-                    }
-                    
-                    asyncio.create_task(
-                        ab_test_service.track_event(ab_event_data)
-                    )
-                except Exception as e:
-                    logger.warning(f"A/B test olay kaydı başarısız: {e}")
+            if cache_lookup:
+                await self._store_in_cache(cache_lookup, ai_response, metadata, user_name)
             
             # Yanıtı döndür (emoji temizleme yapma)
             return ai_response, metadata
@@ -252,6 +221,338 @@ class AIService:
                 "fallback": True
             }
     
+    async def stream_ai_response(
+        self,
+        prompt: str,
+        grade_level: int,
+        subject: str,
+        context: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None,
+        user_name: Optional[str] = None,
+        experiment_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        AI yanıtını sağlayıcıdan geldiği anda token parçaları halinde üret
+        
+        Olaylar:
+            {"type": "token", "content": "..."}
+            {"type": "done", "response": "<tam yanıt>", "metadata": {...}}
+        """
+        started_at = time.perf_counter()
+        first_token_at = None
+        chunks: List[str] = []
+        route: Dict = {}
+        messages: List[Dict] = []
+        error = None
+        
+        try:
+            cache_lookup = await self._lookup_cache(
+                prompt, grade_level, subject, context, conversation_history, experiment_id
+            )
+            if cache_lookup and cache_lookup.hit:
+                yield {"type": "token", "content": cache_lookup.response}
+                yield {
+                    "type": "done",
+                    "response": cache_lookup.response,
+                    "metadata": {
+                        **cache_lookup.metadata,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "streamed": True,
+                        "time_to_first_token": round(time.perf_counter() - started_at, 4)
+                    }
+                }
+                return
+            
+            variant_id, selected_model, selected_provider = await self._select_variant(
+                experiment_id, user_name
+            )
+            
+            messages = await self._build_messages(
+                prompt, grade_level, subject, context, conversation_history, user_name,
+                model=selected_model, session_id=session_id
+            )
+            
+            async for chunk in self._stream_model_with_fallback(
+                messages,
+                model=selected_model,
+                provider=selected_provider,
+                route=route
+            ):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunks.append(chunk)
+                yield {"type": "token", "content": chunk}
+        
+        except Exception as e:
+            logger.error(f"AI streaming hatası: {e}")
+            error = str(e)
+            variant_id = None
+            cache_lookup = None
+            # Hiç token gönderilmediyse öğrenciye fallback yanıtı ver
+            if not chunks:
+                fallback = self._get_fallback_response(grade_level, subject)
+                first_token_at = time.perf_counter()
+                chunks.append(fallback)
+                yield {"type": "token", "content": fallback}
+        
+        finished_at = time.perf_counter()
+        ai_response = "".join(chunks)
+        time_to_first_token = (first_token_at or finished_at) - started_at
+        
+        metadata = {
+            "model_used": route.get("model", self.current_model),
+            "provider": route.get("provider", self.current_provider),
+            "grade_level": grade_level,
+            "subject": subject,
+            "timestamp": datetime.utcnow().isoformat(),
+            "streamed": True,
+            "queue_wait": round(route.get("queue_wait", 0.0), 4),
+            "generation_time": round(route.get("generation_time", 0.0), 4),
+            "time_to_first_token": round(time_to_first_token, 4),
+            "total_time": round(finished_at - started_at, 4)
+        }
+        if error:
+            metadata.update({"error": error, "fallback": True})
+        else:
+            metadata.update(self._token_usage(messages, ai_response, model=metadata["model_used"]))
+            self._record_interaction(
+                prompt=prompt,
+                ai_response=ai_response,
+                grade_level=grade_level,
+                subject=subject,
+                user_name=user_name,
+                experiment_id=experiment_id,
+                variant_id=variant_id,
+                metadata=metadata
+            )
+            if cache_lookup:
+                await self._store_in_cache(cache_lookup, ai_response, metadata, user_name)
+        
+        yield {"type": "done", "response": ai_response, "metadata": metadata}
+    
+    async def _lookup_cache(
+        self,
+        prompt: str,
+        grade_level: int,
+        subject: str,
+        context: Optional[str],
+        conversation_history: Optional[List[Dict]],
+        experiment_id: Optional[str]
+    ):
+        """Önbelleğe uygun istekler için arama yap; uygun değilse None döndür"""
+        if not settings.AI_RESPONSE_CACHE_ENABLED:
+            return None
+        
+        # Konuşma geçmişi, ek bağlam veya A/B testi yanıtı isteğe özel yapar
+        if conversation_history or context or experiment_id:
+            ai_response_cache.record_bypass()
+            return None
+        
+        try:
+            return await ai_response_cache.get(prompt, grade_level, subject)
+        except Exception as e:
+            logger.warning(f"AI yanıt önbelleği okunamadı: {e}")
+            return None
+    
+    async def _store_in_cache(self, cache_lookup, ai_response: str, metadata: Dict, user_name: Optional[str]):
+        """Başka öğrencilerle paylaşılabilir yanıtı önbelleğe al"""
+        if metadata.get("provider") == "fallback" or not ai_response:
+            return
+        # Öğrenciye adıyla hitap eden yanıtlar başkasına gösterilmemeli
+        if user_name and user_name.lower() in ai_response.lower():
+            return
+        
+        try:
+            await ai_response_cache.set(cache_lookup, ai_response, metadata)
+        except Exception as e:
+            logger.warning(f"AI yanıt önbelleğine yazılamadı: {e}")
+    
+    async def _select_variant(
+        self,
+        experiment_id: Optional[str],
+        user_name: Optional[str]
+    ) -> Tuple[Optional[str], str, str]:
+        """A/B test varyantına göre (variant_id, model, provider) seç"""
+        variant_id = None
+        selected_model = self.current_model
+        selected_provider = self.current_provider
+        
+        if experiment_id and user_name:  # A/B test aktifse
+            try:
+                # Varyant ata
+                variant_id = await ab_test_service.assign_variant(user_name, experiment_id)
+                
+                # Varyanta göre model seç
+                if variant_id and variant_id != "control":
+                    # A/B test modelini kullan
+                    variant_models = {
+                        "variant_a": ("deepseek-chat", "deepseek"),
+                        "variant_b": ("deepseek-reasoner", "deepseek"),
+                        "variant_c": ("gpt-3.5-turbo", "openai")
+                    }
+                    
+                    if variant_id in variant_models:
+                        selected_model, selected_provider = variant_models[variant_id]
+                        logger.info(f"A/B test variant seçildi: {variant_id} -> {selected_model}")
+            
+            except Exception as e:
+                logger.warning(f"A/B test varyant seçimi başarısız: {e}")
+        
+        return variant_id, selected_model, selected_provider
+    
+    async def _build_messages(
+        self,
+        prompt: str,
+        grade_level: int,
+        subject: str,
+        context: Optional[str] = None,
+        conversation_history: Optional[List[Dict]] = None,
+        user_name: Optional[str] = None,
+        model: Optional[str] = None,
+        session_id: Optional[str] = None,
+        name_placeholder: bool = False
+    ) -> List[Dict]:
+        """Sistem promptu, konuşma geçmişi ve kullanıcı mesajından istek oluştur"""
+        # Sistem promptu oluştur
+        system_prompt = self._create_system_prompt(grade_level, subject, user_name, name_placeholder)
+        
+        # Mesajları hazırla
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        # Kullanıcı mesajı
+        user_message = prompt
+        if context:
+            user_message = f"Bağlam: {context}\n\nSoru: {prompt}"
+        
+        # Konuşma geçmişi varsa modelin token bütçesine sığdır
+        if conversation_history:
+            model = model or self.current_model
+            reserved = (
+                token_counter.count_tokens(system_prompt, model)
+                + token_counter.count_tokens(user_message, model)
+                + self.model_config.get("max_tokens", 800)
+            )
+            history = await history_manager.fit(
+                conversation_history,
+                model,
+                history_manager.budget_for(model, reserved),
+                session_id=session_id
+            )
+            if history.summary:
+                # Özet ayrı mesajda tutulur, sistem prompt'u öneki değişmez
+                messages.append({
+                    "role": "system",
+                    "content": f"Önceki konuşmanın özeti:\n{history.summary}"
+                })
+            messages.extend(history.messages)
+        
+        messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    def _token_usage(
+        self,
+        messages: List[Dict],
+        content: str,
+        response: Optional[LLMResponse] = None,
+        model: Optional[str] = None
+    ) -> Dict:
+        """Sağlayıcının bildirdiği token kullanımı; yoksa tokenizer ile tahmin"""
+        if response is not None and response.total_tokens is not None:
+            return {
+                "prompt_tokens": response.prompt_tokens,
+                "completion_tokens": response.completion_tokens,
+                "tokens_used": response.total_tokens,
+                "tokens_estimated": False
+            }
+        # Streaming ve Hugging Face yanıtları kullanım bilgisi döndürmez
+        if response is not None:
+            model = response.model
+        model = model or self.current_model
+        prompt_tokens = token_counter.count_message_tokens(messages, model)
+        completion_tokens = token_counter.count_tokens(content, model)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_used": prompt_tokens + completion_tokens,
+            "tokens_estimated": True
+        }
+    
+    def _record_interaction(
+        self,
+        prompt: str,
+        ai_response: str,
+        grade_level: int,
+        subject: str,
+        user_name: Optional[str],
+        experiment_id: Optional[str],
+        variant_id: Optional[str],
+        metadata: Dict
+    ):
+        """Gecikme metriklerini işle, auto-learning ve A/B test kayıtlarını arka planda başlat"""
+        model_used = metadata["model_used"]
+        timings = {
+            "provider": metadata["provider"],
+            "response_time": metadata["total_time"],
+            "queue_wait": metadata.get("queue_wait", 0.0),
+            "generation_time": metadata.get("generation_time"),
+            "time_to_first_token": metadata["time_to_first_token"],
+            "prompt_tokens": metadata.get("prompt_tokens"),
+            "completion_tokens": metadata.get("completion_tokens"),
+        }
+        
+        ai_metrics.observe(
+            metadata["provider"],
+            model_used,
+            queue_wait=timings["queue_wait"],
+            time_to_first_token=timings["time_to_first_token"],
+            total_time=timings["response_time"],
+            generation_time=timings["generation_time"],
+            prompt_tokens=timings["prompt_tokens"],
+            completion_tokens=timings["completion_tokens"]
+        )
+        
+        # Auto-learning için etkileşim verisini kaydet
+        try:
+            interaction_data = {
+                "user_id": user_name,  # Geçici olarak user_name kullanıyoruz
+                "grade_level": grade_level,
+                "subject": subject,
+                "question": prompt,
+                "ai_response": ai_response,
+                "model_used": model_used,
+                **timings
+            }
+            
+            # Asenkron olarak kaydet (bloklamamak için)
+            asyncio.create_task(
+                auto_learning_service.collect_learning_data(interaction_data)
+            )
+        except Exception as e:
+            logger.warning(f"Auto-learning veri kaydı başarısız: {e}")
+        
+        # A/B test olayını kaydet
+        if experiment_id and variant_id:
+            try:
+                ab_event_data = {
+                    "user_id": user_name or "anonymous",
+                    "experiment_id": experiment_id,
+                    "variant_id": variant_id,
+                    "event_type": "ai_interaction",
+                    "metrics": {
+                        **timings,
+                        "model": model_used,
+                        "grade_level": grade_level,
+                        "subject": subject
+                    }
+                }
+                
+                asyncio.create_task(
+                    ab_test_service.track_event(ab_event_data)
+                )
+            except Exception as e:
+                logger.warning(f"A/B test olay kaydı başarısız: {e}")
+    
     def _clean_emoji_from_response(self, text: str) -> str:
         """AI yanıtından emojileri temizle ve daha doğal hale getir"""
         import re
@@ -293,8 +594,45 @@ class AIService:
         
         return text.strip()
     
-    def _create_system_prompt(self, grade_level: int, subject: str, user_name: Optional[str] = None) -> str:
-        """MEB müfredatına uygun sistem prompt'u oluştur"""
+    def _create_system_prompt(
+        self,
+        grade_level: int,
+        subject: str,
+        user_name: Optional[str] = None,
+        name_placeholder: bool = False
+    ) -> str:
+        """
+        MEB müfredatına uygun sistem prompt'u oluştur
+
+        name_placeholder=True ise ad prompt'a girmez; model adın yerine
+        STUDENT_NAME_PLACEHOLDER yazar ve yanıt _personalize ile her öğrenci
+        için doldurulur. Böylece aynı soruyu soran öğrencilerin istekleri
+        özdeş olur ve tek upstream çağrısında birleşebilir.
+        """
+        # (sınıf, ders) başına bir kez derlenen sabit önek; öğrenci adı sona eklenir
+        base_prompt = prompt_templates.get_or_compile(
+            ("tutor", grade_level, subject),
+            lambda: self._compile_system_prompt(grade_level, subject)
+        )
+        
+        if not user_name:
+            user_info = "Öğrencinin adı belirtilmemiş"
+        elif name_placeholder:
+            user_info = (
+                "Öğrenciye adıyla hitap edeceksen adın yerine tam olarak "
+                f"{STUDENT_NAME_PLACEHOLDER} yaz"
+            )
+        else:
+            user_info = f"Öğrencinin adı: {user_name}"
+        
+        return f"""{base_prompt}
+
+{user_info}
+
+Şimdi öğrencinin sorularını yanıtla ve dersini anlat!"""
+    
+    def _compile_system_prompt(self, grade_level: int, subject: str) -> str:
+        """Öğrenciden bağımsız sistem prompt gövdesi"""
         
         grade_names = {
             1: "1. Sınıf", 2: "2. Sınıf", 3: "3. Sınıf", 4: "4. Sınıf",
@@ -304,11 +642,7 @@ class AIService:
         
         grade_name = grade_names.get(grade_level, f"{grade_level}. Sınıf")
         
-        user_info = f"Öğrencinin adı: {user_name}" if user_name else "Öğrencinin adı belirtilmemiş"
-        
-        system_prompt = f"""Sen Türkiye'nin en iyi yapay zeka öğretmenisin. {grade_name} {subject} dersinde uzmanlaşmışsın.
-
-{user_info}
+        return f"""Sen Türkiye'nin en iyi yapay zeka öğretmenisin. {grade_name} {subject} dersinde uzmanlaşmışsın.
 
 GÖREVİN:
 - MEB müfredatına tam uyumlu öğretim yap
@@ -372,126 +706,366 @@ YAPMA:
 - Uzun ve karmaşık açıklamalar yapma
 - Öğrenciyi küçümseme
 - Konudan sapma
-- Hazır cevaplar verme, düşünmeye yönlendir
-
-Şimdi öğrencinin sorularını yanıtla ve dersini anlat!"""
-        
-        return system_prompt
+- Hazır cevaplar verme, düşünmeye yönlendir"""
     
-    def _call_model_with_fallback(self, messages: List[Dict]) -> any:
-        """Model çağrısı yap ve gerekirse fallback kullan"""
+    @staticmethod
+    def _personalize(content: str, user_name: Optional[str]) -> str:
+        """Paylaşılan yanıttaki ad yer tutucusunu bu öğrencinin adıyla doldur"""
+        if STUDENT_NAME_PLACEHOLDER not in content:
+            return content
+        return content.replace(STUDENT_NAME_PLACEHOLDER, user_name or "")
+    
+    async def _call_model_coalesced(
+        self,
+        messages: List[Dict],
+        model: Optional[str] = None,
+        provider: Optional[str] = None
+    ) -> LLMResponse:
+        """
+        Özdeş istekleri (aynı mesajlar, model ve sıcaklık aralığı) tek
+        upstream çağrısında birleştir (single-flight)
+        """
+        if not settings.AI_REQUEST_COALESCING_ENABLED:
+            return await self._call_model_with_fallback(messages, model, provider)
         
-        # DeepSeek öncelikli olarak kullan
-        if self.deepseek_client and self.current_provider == "deepseek":
-            try:
-                logger.info(f"DeepSeek model çağrısı: {self.current_model}")
-                response = self.deepseek_client.chat.completions.create(
-                    model=self.current_model,
-                    messages=messages,
-                    temperature=self.model_config.get("temperature", 0.7),
-                    max_tokens=self.model_config.get("max_tokens", 800),
-                    stream=False
-                )
-                logger.info("DeepSeek yanıtı başarılı")
-                return response
-            except Exception as e:
-                logger.error(f"DeepSeek hatası: {e}")
-                # Hugging Face'e geç
-                if self.model_config.get("fallback_enabled", True):
-                    return self._call_huggingface_model(messages)
-                else:
-                    raise e
+        model = model or self.current_model
+        provider = provider or self.current_provider
+        key = self._request_fingerprint(messages, model, provider)
         
-        # OpenAI fallback
-        elif self.openai_client:
-            try:
-                logger.info(f"OpenAI model çağrısı: {self.current_model}")
-                response = self.openai_client.chat.completions.create(
-                    model=self.current_model,
-                    messages=messages,
-                    temperature=self.model_config.get("temperature", 0.7),
-                    max_tokens=self.model_config.get("max_tokens", 800),
-                    stream=False
-                )
-                logger.info("OpenAI yanıtı başarılı")
-                return response
-            except Exception as e:
-                logger.error(f"OpenAI hatası: {e}")
-                return self._call_huggingface_model(messages)
+        task = self._inflight_requests.get(key)
+        if task is None:
+            # Upstream çağrı hiçbir isteğe bağlı olmayan ayrı bir task'ta çalışır;
+            # ilk isteyen bağlantıyı kapatsa bile bekleyen diğerleri yanıt alır
+            task = asyncio.create_task(self._call_model_with_fallback(messages, model, provider))
+            self._inflight_requests[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+            self.coalescing_stats["upstream_calls"] += 1
+        else:
+            self.coalescing_stats["collapsed_calls"] += 1
+            logger.debug(f"Özdeş AI isteği birleştirildi: {key[:12]}")
         
+        return await asyncio.shield(task)
+    
+    def _request_fingerprint(self, messages: List[Dict], model: str, provider: str) -> str:
+        """Mesajlar, model ve sıcaklık aralığından istek parmak izi oluştur"""
+        temperature_bucket = round(self.model_config.get("temperature", 0.7), 1)
+        payload = json.dumps(
+            [provider, model, temperature_bucket, messages],
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _finish_inflight(self, key: str, task: asyncio.Task):
+        self._inflight_requests.pop(key, None)
+        # Tüm bekleyenler iptal edildiyse hata "never retrieved" uyarısı vermesin
+        if not task.cancelled():
+            task.exception()
+    
+    def get_coalescing_stats(self) -> Dict:
+        """Birleştirilen istek metrikleri"""
+        total = self.coalescing_stats["upstream_calls"] + self.coalescing_stats["collapsed_calls"]
+        return {
+            **self.coalescing_stats,
+            "in_flight": len(self._inflight_requests),
+            "collapse_rate": round(self.coalescing_stats["collapsed_calls"] / total, 4) if total else 0.0
+        }
+    
+    def _default_model_for(self, provider: str) -> Optional[str]:
+        """Sağlayıcının en yüksek öncelikli etkin modeli"""
+        candidates = [
+            m for m in self.model_config["models"].values()
+            if m["enabled"] and m["name"] and m.get("provider", "openai") == provider
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda m: m["priority"])["name"]
+    
+    def _build_route(self, model: str, provider: str) -> List[Tuple[str, str]]:
+        """
+        Fallback zincirini (provider, model) sırası olarak oluştur.
+        Devresi açık sağlayıcılar atlanır, p95'i yavaş olan modeller sona alınır.
+        """
+        # Birincil sağlayıcı: DeepSeek öncelikli, yoksa OpenAI
+        if provider == "deepseek" and "deepseek" in self.providers:
+            chain = [("deepseek", model)]
+        elif "openai" in self.providers:
+            chain = [("openai", model if provider == "openai" else self._default_model_for("openai"))]
         else:
             raise ValueError("Hiç kullanılabilir AI modeli yok!")
+        
+        if self.model_config.get("fallback_enabled", True):
+            # Diğer anahtarı tanımlı sağlayıcı, ardından Hugging Face
+            for name in ("deepseek", "openai"):
+                if name in self.providers and all(name != p for p, _ in chain):
+                    fallback_model = self._default_model_for(name)
+                    if fallback_model:
+                        chain.append((name, fallback_model))
+            chain.append(("huggingface", self.huggingface_model))
+        
+        available = [c for c in chain if c[1] and not self.provider_health.is_open(c[0])]
+        fast = [c for c in available if not self.provider_health.is_slow(c[1])]
+        slow = [c for c in available if c not in fast]
+        return fast + slow
     
-    def _call_huggingface_model(self, messages: List[Dict]) -> any:
-        """Hugging Face model çağrısı"""
-        logger.info(f"Hugging Face model çağrısı: {self.huggingface_model}")
+    async def _call_model_with_fallback(
+        self,
+        messages: List[Dict],
+        model: Optional[str] = None,
+        provider: Optional[str] = None
+    ) -> LLMResponse:
+        """Model çağrısı yap ve gerekirse fallback kullan"""
+        model = model or self.current_model
+        provider = provider or self.current_provider
+        temperature = self.model_config.get("temperature", 0.7)
+        max_tokens = self.model_config.get("max_tokens", 800)
+        last_error = None
         
-        try:
-            # Son kullanıcı mesajını al
-            user_message = ""
-            for message in reversed(messages):
-                if message.get("role") == "user":
-                    user_message = message.get("content", "")
-                    break
-            
-            # Hugging Face API çağrısı
-            headers = {}
-            if self.huggingface_api_key:
-                headers["Authorization"] = f"Bearer {self.huggingface_api_key}"
-            
-            # Türkçe eğitim asistanı için özel model kullanalım
-            # Alternatif modeller:
-            # - "dbmdz/bert-base-turkish-cased" (BERT tabanlı)
-            # - "ytu-ce-cosmos/turkish-gpt2-large" (GPT-2 tabanlı)
-            # - "google/gemma-2b" (Çok dilli)
-            model_url = "https://api-inference.huggingface.co/models/google/flan-t5-base"
-            
-            # Prompt'u daha iyi yapılandıralım
-            prompt = f"""Sen yardımsever bir matematik öğretmenisin. Öğrencinin sorusuna Türkçe olarak açık ve anlaşılır bir şekilde cevap ver.
-
-Öğrenci: {user_message}
-Öğretmen:"""
+        async def call(candidate_provider: str, candidate_model: str) -> LLMResponse:
+            return await self._call_candidate(
+                candidate_provider, candidate_model, messages, temperature, max_tokens
+            )
+        
+        route = self._build_route(model, provider)
+        attempted = set()
+        for index, candidate in enumerate(route):
+            if candidate in attempted:
+                continue
+            if not self.provider_health.breaker(candidate[0]).allow_request():
+                continue
+            attempted.add(candidate)
+            self.hedging.record_primary()
             
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": 250,
-                    "temperature": 0.8,
-                    "top_p": 0.9,
-                    "do_sample": True
-                }
-            }
+            delay = self.hedging.hedge_delay(self.provider_health, candidate[1], first_token=False)
+            hedge = self._hedge_target(route, index, attempted) if delay is not None else None
+            try:
+                if hedge:
+                    _, response = await self._run_hedged(candidate, hedge, delay, attempted, call)
+                    return response
+                return await call(*candidate)
+            except ProviderError as e:
+                last_error = e
+        
+        if last_error and not self.model_config.get("fallback_enabled", True):
+            raise last_error
+        return self._call_fallback_model(messages)
+    
+    async def _call_candidate(
+        self,
+        provider: str,
+        model: str,
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int
+    ) -> LLMResponse:
+        """Tek sağlayıcıyı çağır ve sağlık kaydını tut (circuit izni önceden alınmış olmalı)"""
+        started = time.perf_counter()
+        try:
+            logger.info(f"{provider} model çağrısı: {model}")
+            response = await self.providers[provider].chat(messages, model, temperature, max_tokens)
+        except ProviderError as e:
+            logger.error(f"{provider} hatası: {e}")
+            self.provider_health.record_failure(provider)
+            raise
+        except asyncio.CancelledError:
+            self.provider_health.breaker(provider).release()
+            raise
+        except Exception as e:
+            # Beklenmeyen hata da yoklama iznini tüketmeli; aksi halde circuit açık kalır
+            logger.error(f"{provider} beklenmeyen hata: {e}")
+            self.provider_health.record_failure(provider)
+            raise ProviderError(provider, str(e)) from e
+        
+        self.provider_health.record_success(provider, model, time.perf_counter() - started)
+        logger.info(f"{provider} yanıtı başarılı")
+        return response
+    
+    async def _stream_model_with_fallback(
+        self,
+        messages: List[Dict],
+        model: Optional[str] = None,
+        provider: Optional[str] = None,
+        route: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """Streaming model çağrısı; ilk token öncesi hatada fallback zincirine geç"""
+        model = model or self.current_model
+        provider = provider or self.current_provider
+        route = route if route is not None else {}
+        temperature = self.model_config.get("temperature", 0.7)
+        max_tokens = self.model_config.get("max_tokens", 800)
+        last_error = None
+        
+        async def start(candidate_provider: str, candidate_model: str):
+            return await self._start_stream(
+                candidate_provider, candidate_model, messages, temperature, max_tokens
+            )
+        
+        async def discard(opened):
+            await opened[0].aclose()
+        
+        candidates = self._build_route(model, provider)
+        attempted = set()
+        for index, candidate in enumerate(candidates):
+            if candidate in attempted:
+                continue
+            if not self.provider_health.breaker(candidate[0]).allow_request():
+                continue
+            attempted.add(candidate)
+            self.hedging.record_primary()
             
-            response = requests.post(model_url, headers=headers, json=payload)
+            # Streaming'de hedge kararı ilk token süresine göre verilir
+            delay = self.hedging.hedge_delay(self.provider_health, candidate[1], first_token=True)
+            hedge = self._hedge_target(candidates, index, attempted) if delay is not None else None
+            try:
+                if hedge:
+                    winner, opened = await self._run_hedged(
+                        candidate, hedge, delay, attempted, start, discard
+                    )
+                else:
+                    winner, opened = candidate, await start(*candidate)
+            except ProviderError as e:
+                last_error = e
+                continue
             
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    generated_text = result[0].get("generated_text", "")
-                    # Sadece öğretmen yanıtını al
-                    if "Öğretmen:" in generated_text:
-                        answer = generated_text.split("Öğretmen:")[-1].strip()
-                    else:
-                        answer = generated_text
-                    
-                    # OpenAI formatında yanıt döndür
-                    return type('Response', (), {
-                        'choices': [type('Choice', (), {
-                            'message': type('Message', (), {
-                                'content': answer
-                            })()
-                        })()]
-                    })()
+            stream_provider, stream_model = winner
+            stream, first_chunk, started, queue_wait = opened
+            route.update({
+                "model": stream_model,
+                "provider": stream_provider,
+                "queue_wait": queue_wait
+            })
+            try:
+                yield first_chunk
+                async for chunk in stream:
+                    yield chunk
+            except ProviderError as e:
+                # Gönderilmiş token'lar geri alınamaz, akışı yarıda kes
+                logger.error(f"{stream_provider} streaming hatası: {e}")
+                self.provider_health.record_failure(stream_provider)
+                raise
+            except BaseException:
+                # İstemci ayrıldı veya iptal edildi: yoklama iznini geri ver
+                self.provider_health.breaker(stream_provider).release()
+                raise
+            finally:
+                await stream.aclose()
             
-            logger.error(f"Hugging Face API hatası: {response.status_code} - {response.text}")
-            # Fallback'e geç
-            return self._call_fallback_model(messages)
+            elapsed = time.perf_counter() - started
+            route["generation_time"] = elapsed - queue_wait
+            self.provider_health.record_success(stream_provider, stream_model, elapsed)
+            return
+        
+        if last_error and not self.model_config.get("fallback_enabled", True):
+            raise last_error
+        response = self._call_fallback_model(messages)
+        route.update({
+            "model": response.model,
+            "provider": response.provider,
+            "queue_wait": response.queue_wait,
+            "generation_time": response.generation_time
+        })
+        yield response.content
+    
+    async def _start_stream(
+        self,
+        provider: str,
+        model: str,
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[AsyncIterator[str], str, float, float]:
+        """Akışı aç ve ilk token'ı bekle; (akış, ilk parça, başlangıç zamanı, kuyruk bekleme) döner"""
+        started = time.perf_counter()
+        timings: Dict = {}
+        stream = self.providers[provider].stream(
+            messages, model, temperature, max_tokens, timings=timings
+        )
+        try:
+            logger.info(f"{provider} streaming çağrısı: {model}")
+            first_chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            self.provider_health.record_failure(provider)
+            raise ProviderError(provider, "Boş yanıt")
+        except ProviderError as e:
+            logger.error(f"{provider} streaming hatası: {e}")
+            self.provider_health.record_failure(provider)
+            raise
+        except BaseException:
+            self.provider_health.breaker(provider).release()
+            await stream.aclose()
+            raise
+        
+        self.provider_health.record_first_token(model, time.perf_counter() - started)
+        return stream, first_chunk, started, timings.get("queue_wait", 0.0)
+    
+    def _hedge_target(
+        self,
+        route: List[Tuple[str, str]],
+        index: int,
+        attempted: set
+    ) -> Optional[Tuple[str, str]]:
+        """Birincilden sonraki ilk farklı sağlayıcı (kalite farkı nedeniyle HF hariç)"""
+        primary_provider = route[index][0]
+        for candidate in route[index + 1:]:
+            if candidate[0] in (primary_provider, "huggingface") or candidate in attempted:
+                continue
+            return candidate
+        return None
+    
+    def _fire_hedge(self, hedge: Tuple[str, str]) -> bool:
+        """Bütçe ve circuit izin veriyorsa hedge isteği için izin al"""
+        if not self.hedging.has_budget():
+            return False
+        if not self.provider_health.breaker(hedge[0]).allow_request():
+            return False
+        self.hedging.record_fired()
+        return True
+    
+    async def _run_hedged(self, primary, hedge, delay: float, attempted: set, call, discard=None):
+        """
+        Birincil çağrıyı başlat; `delay` saniye içinde sonuçlanmazsa yedek
+        sağlayıcıya ikinci çağrıyı gönder. İlk başarılı sonuç kazanır,
+        diğeri iptal edilir. (kazanan aday, sonuç) döner.
+        """
+        primary_task = asyncio.create_task(call(*primary))
+        candidates = {primary_task: primary}
+        pending = {primary_task}
+        winner = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done and self._fire_hedge(hedge):
+                logger.info(
+                    f"Hedge isteği: {primary[0]} {delay:.2f}s içinde yanıt vermedi, {hedge[0]} deneniyor"
+                )
+                attempted.add(hedge)
+                hedge_task = asyncio.create_task(call(*hedge))
+                candidates[hedge_task] = hedge
+                pending.add(hedge_task)
             
-        except Exception as e:
-            logger.error(f"Hugging Face hatası: {e}")
-            return self._call_fallback_model(messages)
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if candidates[task] == hedge:
+                            self.hedging.record_win()
+                        return candidates[task], task.result()
+                    error = error or task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+            # Aynı anda biten kaybeden başarılı sonuçları serbest bırak
+            for task, candidate in candidates.items():
+                if task is winner or not task.done() or task.cancelled() or task.exception():
+                    continue
+                self.provider_health.breaker(candidate[0]).release()
+                if discard:
+                    await discard(task.result())
     
-    def _call_fallback_model(self, messages: List[Dict]) -> any:
+    def _call_fallback_model(self, messages: List[Dict]) -> LLMResponse:
         """Fallback model çağrısı"""
         logger.info("Fallback model kullanılıyor...")
         
@@ -523,15 +1097,11 @@ YAPMA:
             subject = "matematik"
         
         # Basit fallback yanıtı
-        fallback_response = type('Response', (), {
-            'choices': [type('Choice', (), {
-                'message': type('Message', (), {
-                    'content': self._get_fallback_response(grade_level, subject, user_message)
-                })()
-            })()]
-        })()
-        
-        return fallback_response
+        return LLMResponse(
+            content=self._get_fallback_response(grade_level, subject, user_message),
+            model="fallback",
+            provider="fallback"
+        )
     
     def _get_fallback_response(self, grade_level: int, subject: str, user_message: str = "") -> str:
         """Fallback yanıtı"""
@@ -699,8 +1269,32 @@ Hangi konuda sorunuz var?"""
             "providers": {
                 "openai": {"enabled": bool(self.openai_api_key)},
                 "deepseek": {"enabled": bool(self.deepseek_api_key)}
+            },
+            "provider_pools": {
+                name: provider.get_stats()
+                for name, provider in self.providers.items()
+            },
+            "response_cache": ai_response_cache.get_stats(),
+            "request_coalescing": self.get_coalescing_stats(),
+            "provider_health": self.provider_health.snapshot(),
+            "hedging": self.hedging.snapshot(),
+            "prompt_templates": prompt_templates.get_stats(),
+            "token_counter": token_counter.get_stats(),
+            "conversation_history": history_manager.get_stats(),
+            "request_metrics": ai_metrics.snapshot(),
+            "analytics_writers": {
+                "auto_learning": auto_learning_service.learning_writer.get_stats(),
+                "ab_test": ab_test_service.event_writer.get_stats()
             }
         }
+    
+    async def aclose(self):
+        """Sağlayıcı bağlantı havuzlarını kapat"""
+        for provider in self.providers.values():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning(f"{provider.name} havuzu kapatılamadı: {e}")
 
 
 # Singleton instance
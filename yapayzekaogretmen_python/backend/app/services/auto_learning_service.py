@@ -16,6 +16,7 @@ from loguru import logger
 from app.core.config import settings
 # Circular import fix - will be imported when needed
 from app.db.mongodb import get_database
+from app.services.batch_writer import BatchWriter
 
 
 class AutoLearningService:
@@ -32,6 +33,19 @@ class AutoLearningService:
         self.confidence_threshold = 0.85  # Güven eşiği
         self.learning_interval_days = 7  # Öğrenme döngüsü (gün)
         
+        # Etkileşimler tek tek değil toplu yazılır
+        self.learning_writer = BatchWriter(
+            "auto_learning",
+            lambda: self.learning_collection,
+            on_flush=self._on_learning_flush
+        )
+        
+        # Tetikleyici durumu: ilk kontrolde DB'den yüklenir, sonra artımlı güncellenir
+        self._trigger_state_loaded = False
+        self._unprocessed_count = 0
+        self._last_cycle_at: Optional[datetime] = None
+        self._cycle_running = False
+        
         logger.info("Auto-Learning Service başlatıldı")
     
     async def collect_learning_data(self, interaction: Dict) -> None:
@@ -52,6 +66,11 @@ class AutoLearningService:
                 "ai_response": interaction.get("ai_response"),
                 "user_feedback": interaction.get("feedback"),  # Beğendi/Beğenmedi
                 "response_time": interaction.get("response_time"),
+                "queue_wait": interaction.get("queue_wait"),
+                "time_to_first_token": interaction.get("time_to_first_token"),
+                "prompt_tokens": interaction.get("prompt_tokens"),
+                "completion_tokens": interaction.get("completion_tokens"),
+                "provider": interaction.get("provider"),
                 "model_used": interaction.get("model_used"),
                 "confidence_score": interaction.get("confidence_score", 0.9),
                 "topic_tags": self._extract_topics(interaction.get("question", "")),
@@ -59,13 +78,8 @@ class AutoLearningService:
                 "success_indicator": interaction.get("success", True)
             }
             
-            # Veritabanına kaydet
-            if self.learning_collection:
-                await self.learning_collection.insert_one(learning_data)
-                logger.debug(f"Öğrenme verisi kaydedildi: {learning_data['timestamp']}")
-            
-            # Otomatik öğrenme tetikleyicisini kontrol et
-            await self._check_learning_trigger()
+            # Toplu yazma tamponuna ekle; tetikleyici flush sonrası kontrol edilir
+            self.learning_writer.add(learning_data)
             
         except Exception as e:
             logger.error(f"Öğrenme verisi toplama hatası: {e}")
@@ -110,6 +124,7 @@ class AutoLearningService:
             ]
             
             results = await self.learning_collection.aggregate(pipeline).to_list(None)
+            latency_histogram = await self._latency_histogram(start_date)
             
             # Genel performans metrikleri
             performance = {
@@ -121,6 +136,7 @@ class AutoLearningService:
                     "avg_positive_feedback": np.mean([r["positive_feedback_rate"] for r in results]) if results else 0,
                     "avg_confidence": np.mean([r["avg_confidence"] for r in results]) if results else 0,
                     "avg_response_time": np.mean([r["avg_response_time"] for r in results]) if results else 0,
+                    "latency_histogram": latency_histogram,
                     "improvement_areas": []
                 }
             }
@@ -480,41 +496,100 @@ class AutoLearningService:
         
         return ", ".join(reasons) if reasons else "Standart performans"
     
-    async def _check_learning_trigger(self) -> None:
+    async def _latency_histogram(self, start_date: datetime) -> Dict:
+        """Toplam süre ve ilk token süresi için kova dağılımı (ortalama kuyruğu gizler)"""
+        boundaries = [0, 0.5, 1, 2, 4, 8, 15, 30, 60]
+        
+        def bucket_stage(field: str) -> List[Dict]:
+            return [
+                {"$match": {field: {"$type": "number"}}},
+                {"$bucket": {
+                    "groupBy": f"${field}",
+                    "boundaries": boundaries,
+                    "default": "60+",
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ]
+        
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": start_date}}},
+            {"$facet": {
+                "response_time": bucket_stage("response_time"),
+                "time_to_first_token": bucket_stage("time_to_first_token")
+            }}
+        ]
+        facets = await self.learning_collection.aggregate(pipeline).to_list(None)
+        if not facets:
+            return {}
+        return {
+            metric: {str(bucket["_id"]): bucket["count"] for bucket in buckets}
+            for metric, buckets in facets[0].items()
+        }
+    
+    async def _on_learning_flush(self, batch: List[Dict]) -> None:
+        """Toplu yazma sonrası tetikleyiciyi artımlı sayaçla kontrol et"""
+        await self._check_learning_trigger(new_records=len(batch))
+    
+    async def _check_learning_trigger(self, new_records: int = 0) -> None:
         """Otomatik öğrenme tetikleyicisini kontrol et"""
         try:
             if not self.learning_collection:
                 return
             
-            # Son öğrenme döngüsünden bu yana geçen süre
-            last_cycle = await self.db.improvement_cycles.find_one(
-                sort=[("timestamp", -1)]
-            )
+            if not self._trigger_state_loaded:
+                # Durumu bir kez DB'den yükle (yeni kayıtlar zaten sayıma dahil)
+                await self._load_trigger_state()
+            else:
+                self._unprocessed_count += new_records
             
-            should_trigger = False
+            if self._cycle_running:
+                return
             
-            if not last_cycle:
-                should_trigger = True
-            else:
-                last_cycle_date = datetime.fromisoformat(last_cycle["timestamp"])
-                days_passed = (datetime.utcnow() - last_cycle_date).days
-                
-                if days_passed >= self.learning_interval_days:
-                    should_trigger = True
+            # Son öğrenme döngüsünden bu yana geçen süre
+            should_trigger = (
+                self._last_cycle_at is None
+                or (datetime.utcnow() - self._last_cycle_at).days >= self.learning_interval_days
+            )
             
             # Yeterli veri var mı kontrol et
-            if should_trigger:
-                recent_count = await self.learning_collection.count_documents({
-                    "training_data_generated": {"$ne": True}
-                })
-                
-                if recent_count >= self.min_feedback_for_learning:
-                    # Asenkron olarak öğrenme döngüsünü başlat
-                    asyncio.create_task(self.continuous_improvement_cycle())
-                    logger.info("Otomatik öğrenme döngüsü tetiklendi")
+            if should_trigger and self._unprocessed_count >= self.min_feedback_for_learning:
+                # Asenkron olarak öğrenme döngüsünü başlat
+                self._cycle_running = True
+                asyncio.create_task(self._run_triggered_cycle())
+                logger.info("Otomatik öğrenme döngüsü tetiklendi")
         
         except Exception as e:
             logger.error(f"Öğrenme tetikleyici kontrolü hatası: {e}")
+    
+    async def _load_trigger_state(self) -> None:
+        """Son döngü zamanını ve işlenmemiş kayıt sayısını DB'den oku"""
+        last_cycle = await self.db.improvement_cycles.find_one(
+            sort=[("timestamp", -1)]
+        )
+        self._last_cycle_at = (
+            datetime.fromisoformat(last_cycle["timestamp"]) if last_cycle else None
+        )
+        self._unprocessed_count = await self.learning_collection.count_documents({
+            "training_data_generated": {"$ne": True}
+        })
+        self._trigger_state_loaded = True
+    
+    async def _run_triggered_cycle(self) -> None:
+        try:
+            await self.continuous_improvement_cycle()
+        finally:
+            # Döngü kayıtları işaretledi; sayacı yeniden senkronize et.
+            # Başarısız döngü de aralık dolana kadar tekrar tetiklenmez.
+            try:
+                await self._load_trigger_state()
+            except Exception as e:
+                logger.error(f"Öğrenme tetikleyici durumu yüklenemedi: {e}")
+            self._last_cycle_at = datetime.utcnow()
+            self._cycle_running = False
+    
+    async def aclose(self) -> None:
+        """Bekleyen etkileşim kayıtlarını yaz"""
+        await self.learning_writer.aclose()
 
 
 # Singleton instance
@@ -0,0 +1,136 @@
+"""
+Toplu Yazma Tamponu - Micro-batching
+------------------------------------
+AI yanıt yolundaki analitik kayıtlarını (auto-learning, A/B test olayları)
+süreç içi sınırlı bir tamponda biriktirir ve boyut ya da süre dolduğunda
+tek bir `insert_many` ile MongoDB'ye yazar. Kapanışta tampon boşaltılır.
+"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+class BatchWriter:
+    """Boyut veya süre tetiklemeli, sınırlı kapasiteli toplu yazıcı"""
+
+    def __init__(
+        self,
+        name: str,
+        collection_getter: Callable[[], object],
+        flush_size: int = settings.ANALYTICS_BATCH_SIZE,
+        flush_interval: float = settings.ANALYTICS_FLUSH_INTERVAL,
+        max_buffer: int = settings.ANALYTICS_BUFFER_MAX,
+        on_flush: Optional[Callable[[List[Dict]], Awaitable[None]]] = None,
+    ):
+        self.name = name
+        self._collection_getter = collection_getter
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._on_flush = on_flush
+
+        self._buffer: Deque[Dict] = deque()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._timer_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._drained = False  # aclose tamamlandı; artık kimse tamponu boşaltmayacak
+
+        self.stats = {
+            "buffered": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "failed": 0,
+        }
+
+    def add(self, document: Dict):
+        """Kaydı tampona ekle; tampon doluysa en eski kayıt atılır"""
+        if self._drained:
+            # Kapanıştan sonra gelen kayıt sessizce tamponda kalmasın
+            self.stats["dropped"] += 1
+            logger.warning(f"{self.name} kapandıktan sonra kayıt geldi, atlandı")
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self.stats["dropped"] += 1
+        self._buffer.append(document)
+        self.stats["buffered"] += 1
+
+        if self._closed:
+            return
+        self._ensure_timer()
+        if len(self._buffer) >= self.flush_size:
+            self._schedule_flush()
+
+    async def flush(self):
+        """Tampondaki kayıtları tek seferde yaz"""
+        # Yazma sırasında gelen kayıtlar da aynı döngüde yazılır
+        while self._buffer:
+            batch = list(self._buffer)
+            self._buffer.clear()
+            await self._write(batch)
+
+    async def aclose(self):
+        """Zamanlayıcıyı durdur ve kalan kayıtları yaz"""
+        self._closed = True
+        if self._timer_task:
+            self._timer_task.cancel()
+            self._timer_task = None
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        await self.flush()
+        self._drained = True
+        logger.info(f"{self.name} yazma tamponu boşaltıldı ({self.stats['written']} kayıt)")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "pending": len(self._buffer),
+            "flush_size": self.flush_size,
+            "flush_interval": self.flush_interval,
+        }
+
+    # ------------------------------------------------------------------
+    # İç yardımcılar
+    # ------------------------------------------------------------------
+    def _ensure_timer(self):
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._timer_loop())
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def _timer_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.flush_interval)
+            if self._buffer:
+                self._schedule_flush()
+
+    async def _write(self, batch: List[Dict]):
+        collection = self._collection_getter()
+        if collection is None:
+            # Veritabanı bağlantısı yok; kayıtlar atılır
+            self.stats["dropped"] += len(batch)
+            logger.warning(f"{self.name}: veritabanı bağlantısı yok, {len(batch)} kayıt atlandı")
+            return
+        try:
+            await collection.insert_many(batch, ordered=False)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            logger.debug(f"{self.name}: {len(batch)} kayıt toplu yazıldı")
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.error(f"{self.name} toplu yazma hatası: {e}")
+            return
+
+        if self._on_flush:
+            try:
+                await self._on_flush(batch)
+            except Exception as e:
+                logger.error(f"{self.name} flush sonrası işlem hatası: {e}")
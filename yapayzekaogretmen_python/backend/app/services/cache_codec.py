@@ -0,0 +1,206 @@
+"""
+Cache Codec - Kompakt İkili Serileştirme
+----------------------------------------
+Redis'e yazılan değerler tek baytlık tip etiketiyle başlar:
+
+    0x01 JSON      0x02 msgpack      0x03 UTF-8 metin      0x04 pickle
+
+Etiketin en yüksek biti (0x80) zstd sıkıştırmasını belirtir. Tamsayı ve
+ondalık sayılar etiketsiz yazılır; böylece INCRBY ile artırılabilirler.
+Etiketsiz eski (JSON metni / pickle-hex) kayıtlar okunmaya devam eder.
+"""
+
+import json
+import pickle
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+TAG_JSON = 0x01
+TAG_MSGPACK = 0x02
+TAG_TEXT = 0x03
+TAG_PICKLE = 0x04
+FLAG_ZSTD = 0x80
+
+
+class CacheCodec:
+    """Yapılandırılmış değerler için temel codec (etiket + encode/decode)"""
+
+    name = "base"
+    tag = 0
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+_MSGPACK_SCALARS = _JSON_SCALARS + (bytes,)
+
+
+def _check_round_trip(value: Any, scalars: tuple, key_types: tuple):
+    """
+    Codec'ten aynı tiple geri dönmeyecek değerlerde TypeError (çağıran
+    pickle'a düşer). Tuple da reddedilir: JSON ve msgpack onu listeye çevirir.
+    """
+    kind = type(value)
+    if kind in scalars:
+        return
+    if kind is dict:
+        for key, item in value.items():
+            if type(key) not in key_types:
+                raise TypeError(f"Desteklenmeyen anahtar tipi: {type(key).__name__}")
+            _check_round_trip(item, scalars, key_types)
+        return
+    if kind is list:
+        for item in value:
+            _check_round_trip(item, scalars, key_types)
+        return
+    raise TypeError(f"Codec'e uygun değil: {kind.__name__}")
+
+
+class JsonCodec(CacheCodec):
+    """
+    orjson varsa onu, yoksa standart json modülünü kullanır
+
+    orjson datetime, UUID ve numpy tiplerini sessizce metne, tuple'ları
+    listeye çevirir; bu değerler okunurken farklı tiple döneceği için
+    kodlamadan önce reddedilir ve pickle etiketiyle yazılır.
+    """
+
+    name = "json"
+    tag = TAG_JSON
+
+    def encode(self, value: Any) -> bytes:
+        _check_round_trip(value, _JSON_SCALARS, (str,))
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(value)
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """Kompakt ikili format; JsonCodec ile aynı tip denetimini uygular (bytes ve int anahtar da geçer)"""
+
+    name = "msgpack"
+    tag = TAG_MSGPACK
+
+    def encode(self, value: Any) -> bytes:
+        _check_round_trip(value, _MSGPACK_SCALARS, (str, int))
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class PickleCodec(CacheCodec):
+    """Diğer codec'lerin kodlayamadığı nesneler için son çare (hex yerine ikili)"""
+
+    name = "pickle"
+    tag = TAG_PICKLE
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+CODECS: Dict[str, CacheCodec] = {"json": JsonCodec(), "pickle": PickleCodec()}
+if MSGPACK_AVAILABLE:
+    CODECS["msgpack"] = MsgpackCodec()
+
+
+class ValueSerializer:
+    """Tip etiketli serileştirici; eşik üstü yükleri zstd ile sıkıştırır"""
+
+    def __init__(
+        self,
+        codec: str = "msgpack",
+        compression_threshold: Optional[int] = 1024,
+        compression_level: int = 3,
+    ):
+        if codec not in CODECS:
+            logger.warning(f"Cache codec '{codec}' kullanılamıyor, json kullanılacak")
+            codec = "json"
+        self.codec = CODECS[codec]
+        self.compression_threshold = compression_threshold if ZSTD_AVAILABLE else None
+        if self.compression_threshold is not None:
+            self._compressor = zstandard.ZstdCompressor(level=compression_level)
+        self._decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+        self._by_tag = {c.tag: c for c in CODECS.values()}
+
+    def dumps(self, value: Any) -> bytes:
+        # Sayılar etiketsiz: INCRBY/INCRBYFLOAT ile uyumlu
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value).encode("ascii")
+
+        if isinstance(value, str):
+            tag, payload = TAG_TEXT, value.encode("utf-8")
+        else:
+            try:
+                tag, payload = self.codec.tag, self.codec.encode(value)
+            except (TypeError, ValueError, OverflowError):
+                # datetime, ObjectId vb. için pickle
+                tag, payload = TAG_PICKLE, CODECS["pickle"].encode(value)
+
+        if self.compression_threshold is not None and len(payload) > self.compression_threshold:
+            compressed = self._compressor.compress(payload)
+            if len(compressed) < len(payload):
+                return bytes([tag | FLAG_ZSTD]) + compressed
+        return bytes([tag]) + payload
+
+    def loads(self, data: Optional[bytes]) -> Any:
+        if not data:
+            return None
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        tag = data[0]
+        base_tag = tag & ~FLAG_ZSTD
+        if base_tag not in (TAG_JSON, TAG_MSGPACK, TAG_TEXT, TAG_PICKLE):
+            return self._loads_untagged(data)
+
+        payload = data[1:]
+        if tag & FLAG_ZSTD:
+            payload = self._decompressor.decompress(payload)
+        if base_tag == TAG_TEXT:
+            return payload.decode("utf-8")
+        return self._by_tag[base_tag].decode(payload)
+
+    @staticmethod
+    def _loads_untagged(data: bytes) -> Any:
+        """Sayılar ve codec öncesi yazılmış kayıtlar"""
+        text = data.decode("utf-8", errors="replace")
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+        try:
+            return pickle.loads(bytes.fromhex(text))
+        except Exception:
+            return text
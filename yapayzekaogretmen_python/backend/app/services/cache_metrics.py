@@ -0,0 +1,146 @@
+"""
+Cache Metrikleri - Namespace Bazlı Gözlemlenebilirlik
+-----------------------------------------------------
+CacheService işlemleri için namespace başına hit/miss/hata sayaçları,
+serileştirilmiş bayt miktarı ve get/set gecikme histogramları tutar.
+Örneklenen key erişimlerinden boyut ve sıklığa göre en büyük/en sık
+key'ler çıkarılır. Çıktı JSON (admin) veya Prometheus metin formatındadır.
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from app.services.ai_metrics import Histogram
+
+# Saniye cinsinden (Redis işlemleri milisaniye mertebesinde)
+CACHE_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+COUNTERS = ("hits", "misses", "errors", "sets", "deletes", "bytes_read", "bytes_written")
+
+
+class CacheMetrics:
+    """Namespace başına sayaçlar, histogramlar ve örneklenmiş top key tablosu"""
+
+    def __init__(self, key_sample_rate: float = 0.1, top_keys_capacity: int = 2000):
+        self.key_sample_rate = key_sample_rate
+        self.top_keys_capacity = top_keys_capacity
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[str, Dict[str, Histogram]] = {}
+        # (namespace, key) -> [örneklenmiş erişim sayısı, son bilinen boyut]
+        self._keys: Dict[Tuple[str, str], List[int]] = {}
+
+    def _namespace(self, namespace: str) -> Dict[str, int]:
+        if namespace not in self._counters:
+            self._counters[namespace] = dict.fromkeys(COUNTERS, 0)
+            self._latency[namespace] = {
+                "get": Histogram(CACHE_LATENCY_BUCKETS),
+                "set": Histogram(CACHE_LATENCY_BUCKETS),
+            }
+        return self._counters[namespace]
+
+    def record_get(self, namespace: str, key: str, size: int, latency: Optional[float] = None):
+        """size=0 miss demektir; toplu okumalarda gecikme bir kez observe_latency ile yazılır"""
+        counters = self._namespace(namespace)
+        counters["hits" if size else "misses"] += 1
+        counters["bytes_read"] += size
+        if latency is not None:
+            self._latency[namespace]["get"].observe(latency)
+        if size:
+            self._sample_key(namespace, key, size)
+
+    def record_set(self, namespace: str, key: str, size: int, latency: Optional[float] = None):
+        counters = self._namespace(namespace)
+        counters["sets"] += 1
+        counters["bytes_written"] += size
+        if latency is not None:
+            self._latency[namespace]["set"].observe(latency)
+        self._sample_key(namespace, key, size)
+
+    def observe_latency(self, namespace: str, op: str, latency: float):
+        self._namespace(namespace)
+        self._latency[namespace][op].observe(latency)
+
+    def record_delete(self, namespace: str, count: int = 1):
+        self._namespace(namespace)["deletes"] += count
+
+    def record_error(self, namespace: str):
+        self._namespace(namespace)["errors"] += 1
+
+    def hit_ratio(self, namespace: str) -> float:
+        counters = self._counters.get(namespace, {})
+        total = counters.get("hits", 0) + counters.get("misses", 0)
+        return round(counters.get("hits", 0) / total, 4) if total else 0.0
+
+    def _sample_key(self, namespace: str, key: str, size: int):
+        if random.random() >= self.key_sample_rate:
+            return
+        entry = self._keys.get((namespace, key))
+        if entry is not None:
+            entry[0] += 1
+            entry[1] = size
+            return
+        if len(self._keys) >= self.top_keys_capacity:
+            self._decay()
+        self._keys[(namespace, key)] = [1, size]
+
+    def _decay(self):
+        """Tablo dolunca sayıları yarıla, sıfırlananları at (amortize O(1))"""
+        for item in list(self._keys):
+            entry = self._keys[item]
+            entry[0] //= 2
+            if entry[0] == 0:
+                del self._keys[item]
+        # Hepsi sık erişilen key'lerse en az erişilen yarıyı at
+        if len(self._keys) >= self.top_keys_capacity:
+            ranked = sorted(self._keys.items(), key=lambda item: item[1][0])
+            for item, _ in ranked[: len(ranked) // 2]:
+                del self._keys[item]
+
+    def top_keys(self, limit: int = 20) -> Dict[str, List[Dict]]:
+        def rows(sort_index: int) -> List[Dict]:
+            ranked = sorted(self._keys.items(), key=lambda item: item[1][sort_index], reverse=True)
+            return [
+                {"namespace": namespace, "key": key, "sampled_hits": count, "size_bytes": size}
+                for (namespace, key), (count, size) in ranked[:limit]
+            ]
+
+        return {"by_frequency": rows(0), "by_size": rows(1), "sample_rate": self.key_sample_rate}
+
+    def snapshot(self) -> Dict:
+        return {
+            namespace: {
+                **counters,
+                "hit_ratio": self.hit_ratio(namespace),
+                "latency": {op: histogram.snapshot() for op, histogram in self._latency[namespace].items()},
+            }
+            for namespace, counters in self._counters.items()
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus metin formatı (text/plain; version=0.0.4)"""
+        lines = []
+        for counter in COUNTERS:
+            name = f"cache_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            for namespace, counters in self._counters.items():
+                lines.append(f'{name}{{namespace="{namespace}"}} {counters[counter]}')
+
+        for op in ("get", "set"):
+            name = f"cache_{op}_latency_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for namespace, histograms in self._latency.items():
+                histogram = histograms[op]
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{namespace="{namespace}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{namespace="{namespace}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{namespace="{namespace}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{namespace="{namespace}"}} {histogram.count}')
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        self._counters.clear()
+        self._latency.clear()
+        self._keys.clear()
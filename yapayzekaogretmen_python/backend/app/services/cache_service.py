@@ -5,27 +5,115 @@ Yüksek performanslı önbellekleme sistemi.
 """
 
 import json
-import pickle
 from typing import Any, Optional, Union, List, Dict
 from datetime import timedelta
 import hashlib
+import inspect
 import asyncio
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
 import redis.asyncio as redis
 from redis.exceptions import RedisError
 from loguru import logger
 
 from app.core.config import settings
+from app.services.cache_codec import ValueSerializer
+from app.services.cache_metrics import CacheMetrics
+from app.services.memory_cache import create_memory_backend, gcra_handler, release_lock_handler
+
+
+class LocalCache:
+    """
+    Süreç içi L1 katmanı: namespace başına boyut sınırlı LRU + TTL.
+    Değerler serialize edilmiş halde tutulur; çağıranın değiştirdiği
+    nesneler önbelleği bozmaz.
+    """
+    
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._stores: Dict[str, "OrderedDict[str, tuple]"] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+    
+    def _stats(self, namespace: str) -> Dict[str, int]:
+        if namespace not in self.stats:
+            self.stats[namespace] = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        return self.stats[namespace]
+    
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        store = self._stores.get(namespace)
+        entry = store.get(key) if store else None
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del store[key]
+            self._stats(namespace)["misses"] += 1
+            return None
+        store.move_to_end(key)
+        self._stats(namespace)["hits"] += 1
+        return entry[1]
+    
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[int] = None):
+        # Pub/sub mesajı kaçsa bile L1 en fazla self.ttl kadar bayat kalır
+        ttl = min(ttl, self.ttl) if ttl and ttl > 0 else self.ttl
+        store = self._stores.setdefault(namespace, OrderedDict())
+        store[key] = (time.monotonic() + ttl, value)
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+            self._stats(namespace)["evictions"] += 1
+    
+    def invalidate(self, namespace: str, keys: Optional[List[str]] = None):
+        """Anahtarları (veya keys=None ise tüm namespace'i) düşür"""
+        store = self._stores.get(namespace)
+        if not store:
+            return
+        if keys is None:
+            self._stats(namespace)["invalidations"] += len(store)
+            store.clear()
+            return
+        for key in keys:
+            if store.pop(key, None) is not None:
+                self._stats(namespace)["invalidations"] += 1
+    
+    def get_stats(self) -> Dict:
+        return {
+            namespace: {**stats, "entries": len(self._stores.get(namespace, {}))}
+            for namespace, stats in self.stats.items()
+        }
 
 
 class CacheService:
     """Redis tabanlı cache servisi"""
     
+    INVALIDATION_CHANNEL = "cache:invalidate"
+    TAG_NAMESPACE = "tags"
+    # Tag sürümlerinin L1'de tutulduğu iç namespace
+    L1_TAG_NAMESPACE = "__tags__"
+    UNLINK_BATCH_SIZE = 500
+    
+    # Kilidi yalnızca sahibi (token) bırakabilir
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+    
     def __init__(self):
         self.redis_url = getattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
         self.default_ttl = getattr(settings, 'CACHE_TTL', 300)  # 5 dakika
         self.client: Optional[redis.Redis] = None
         self.is_connected = False
+        self.backend = "none"  # redis, memory veya none
+        self.serializer = ValueSerializer(
+            settings.CACHE_CODEC,
+            settings.CACHE_COMPRESSION_THRESHOLD,
+            settings.CACHE_COMPRESSION_LEVEL,
+        )
         
         # Cache namespace'leri
         self.namespaces = {
@@ -34,84 +122,237 @@ class CacheService:
             "ai": "ai:",
             "session": "session:",
             "temp": "temp:",
-            "analytics": "analytics:"
+            "analytics": "analytics:",
+            "tags": "tag:"
         }
         
+        # L1 süreç içi katman (yalnızca sık okunan, seyrek değişen namespace'ler)
+        self.l1_namespaces = set(settings.CACHE_L1_NAMESPACES) if settings.CACHE_L1_ENABLED else set()
+        self.l1 = LocalCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_TTL)
+        self.metrics = CacheMetrics(
+            settings.CACHE_METRICS_KEY_SAMPLE_RATE,
+            settings.CACHE_METRICS_TOP_KEYS_CAPACITY,
+        )
+        
+        # Diğer worker'lardan gelen invalidation mesajları
+        self.instance_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        
+        # Kayıtlı Lua script'leri (EVALSHA, NOSCRIPT'te otomatik yükleme)
+        self._scripts: Dict[str, Any] = {}
+        
         logger.info("Cache Service başlatıldı")
     
     async def connect(self):
-        """Redis'e bağlan"""
+        """
+        Redis'e bağlan. Ulaşılamazsa cache devre dışı kalır (okumalar ıskalar)
+        ve bağlantı arka planda yeniden denenir; Redis kapsayıcısı worker'lardan
+        geç hazır olabilir. Varsayılan CACHE_BACKEND=auto yalnızca tek
+        worker'da (WEB_CONCURRENCY=1) bellek içi backend'e geçer: çok worker'da
+        süreç içi kopya rate limit, kilit ve invalidation'ı worker'lar arasında
+        bölerdi. redis ise worker sayısından bağımsız olarak hep yeniden dener;
+        memory ise Redis hiç denenmez.
+        """
+        if settings.CACHE_BACKEND == "memory":
+            self.use_memory_backend()
+            return
+        
+        if await self._connect_redis():
+            return
+        
+        if settings.CACHE_BACKEND == "auto" and settings.WEB_CONCURRENCY <= 1:
+            self.use_memory_backend()
+            return
+        
+        logger.warning("Redis'e ulaşılamadı; cache devre dışı, arka planda yeniden denenecek")
+        self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+    
+    async def _connect_redis(self) -> bool:
         try:
-            self.client = redis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
+            # Değerler ikili codec ile yazıldığı için yanıtlar bytes olarak alınır
+            client = redis.from_url(self.redis_url, decode_responses=False)
             
             # Bağlantı testi
-            await self.client.ping()
-            self.is_connected = True
-            logger.info("Redis bağlantısı başarılı")
-            
+            await client.ping()
         except Exception as e:
             logger.error(f"Redis bağlantı hatası: {e}")
+            self.client = None
             self.is_connected = False
+            return False
+        
+        self.client = client
+        self.is_connected = True
+        self.backend = "redis"
+        logger.info("Redis bağlantısı başarılı")
+        
+        if self.l1_namespaces:
+            self._invalidation_task = asyncio.create_task(self._listen_invalidations())
+        return True
+    
+    async def _reconnect_loop(self):
+        """Redis gelene kadar üstel geri çekilmeyle yeniden bağlan"""
+        delay = settings.CACHE_RECONNECT_INTERVAL
+        while not self.is_connected:
+            await asyncio.sleep(delay)
+            if await self._connect_redis():
+                return
+            delay = min(delay * 2, settings.CACHE_RECONNECT_MAX_INTERVAL)
+    
+    def use_memory_backend(self):
+        """Tek süreçli bellek içi backend'e geç (tek sunucu kurulumları ve testler)"""
+        self.client = create_memory_backend(
+            max_keys=settings.CACHE_MAX_SIZE,
+            sweep_interval=settings.CACHE_MEMORY_SWEEP_INTERVAL,
+            scripts={
+                self.RELEASE_LOCK_SCRIPT: release_lock_handler,
+                RateLimiter.GCRA_SCRIPT: gcra_handler,
+            },
+        )
+        self._scripts.clear()
+        # Veri zaten süreç içinde; L1 katmanı yalnızca kopya üretirdi
+        self.l1_namespaces = set()
+        self.is_connected = True
+        self.backend = "memory"
+        logger.warning("Cache bellek içi backend ile çalışıyor (Redis yok)")
     
     async def disconnect(self):
         """Redis bağlantısını kapat"""
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            self._invalidation_task = None
         if self.client:
             await self.client.close()
             self.is_connected = False
-            logger.info("Redis bağlantısı kapatıldı")
+            logger.info(f"Cache bağlantısı kapatıldı ({self.backend})")
     
     def _make_key(self, namespace: str, key: str) -> str:
         """Cache key oluştur"""
-        prefix = self.namespaces.get(namespace, "")
+        # Tanımsız namespace'ler de kendi önekini alır; aksi halde
+        # clear_namespace tüm keyspace'e dokunurdu
+        prefix = self.namespaces.get(namespace, f"{namespace}:")
         return f"{prefix}{key}"
     
-    def _serialize(self, value: Any) -> str:
-        """Değeri serialize et"""
-        if isinstance(value, (dict, list)):
-            return json.dumps(value)
-        elif isinstance(value, (str, int, float, bool)):
-            return str(value)
-        else:
-            # Kompleks objeler için pickle kullan
-            return pickle.dumps(value).hex()
+    # ------------------------------------------------------------------
+    # L1 katmanı ve worker'lar arası invalidation
+    # ------------------------------------------------------------------
+    def _uses_l1(self, namespace: str) -> bool:
+        return namespace in self.l1_namespaces
     
-    def _deserialize(self, value: str, data_type: Optional[str] = None) -> Any:
-        """Değeri deserialize et"""
-        if not value:
-            return None
-        
-        if data_type == "json":
-            return json.loads(value)
-        elif data_type == "pickle":
-            return pickle.loads(bytes.fromhex(value))
-        else:
-            # Otomatik tip tespiti
+    async def _invalidate(self, namespace: str, keys: Optional[List[str]] = None):
+        """L1'den düşür ve diğer worker'lara bildir (keys=None: tüm namespace)"""
+        if not self._uses_l1(namespace):
+            return
+        await self._broadcast_invalidation(namespace, keys)
+    
+    async def _broadcast_invalidation(self, namespace: str, keys: Optional[List[str]]):
+        self.l1.invalidate(namespace, keys)
+        try:
+            await self.client.publish(
+                self.INVALIDATION_CHANNEL,
+                json.dumps({"origin": self.instance_id, "namespace": namespace, "keys": keys})
+            )
+        except Exception as e:
+            logger.warning(f"Cache invalidation yayını başarısız: {e}")
+    
+    async def _listen_invalidations(self):
+        """Diğer worker'ların yazdığı anahtarları L1'den düşür"""
+        while self.is_connected:
+            pubsub = self.client.pubsub()
             try:
-                return json.loads(value)
-            except:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") != self.instance_id:
+                        self.l1.invalidate(payload["namespace"], payload.get("keys"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Mesaj kaçmış olabilir: L1'i tamamen boşalt, sonra yeniden abone ol
+                logger.warning(f"Cache invalidation dinleyicisi hatası: {e}")
+                for namespace in self.l1_namespaces:
+                    self.l1.invalidate(namespace)
+                await asyncio.sleep(1)
+            finally:
                 try:
-                    return pickle.loads(bytes.fromhex(value))
-                except:
-                    return value
+                    await pubsub.close()
+                except Exception:
+                    pass
+    
+    async def get_memory_info(self) -> Dict:
+        """Redis bellek kullanımı (Redis boyutlandırması için)"""
+        if not self.is_connected:
+            return {}
+        try:
+            info = await self.client.info("memory")
+            return {
+                "used_memory": info.get("used_memory"),
+                "used_memory_peak": info.get("used_memory_peak"),
+                "maxmemory": info.get("maxmemory"),
+                "maxmemory_policy": info.get("maxmemory_policy"),
+            }
+        except Exception as e:
+            logger.error(f"Cache memory info hatası: {e}")
+            return {}
+    
+    def get_metrics(self, top_keys: int = 20) -> Dict:
+        """Namespace bazlı sayaçlar, gecikme histogramları ve top key'ler"""
+        return {
+            "backend": self.backend,
+            "namespaces": self.metrics.snapshot(),
+            "top_keys": self.metrics.top_keys(top_keys),
+            "tiers": self.get_tier_stats(),
+        }
+    
+    def get_tier_stats(self) -> Dict:
+        """Katman başına hit/miss/eviction sayaçları"""
+        return {
+            "l1": self.l1.get_stats(),
+            "l2": {
+                namespace: {"hits": stats["hits"], "misses": stats["misses"]}
+                for namespace, stats in self.metrics.snapshot().items()
+            },
+            "l1_namespaces": sorted(self.l1_namespaces),
+        }
+    
+    def _serialize(self, value: Any) -> bytes:
+        """Değeri tip etiketli ikili formata çevir (bkz. cache_codec)"""
+        return self.serializer.dumps(value)
+    
+    def _deserialize(self, value: Optional[bytes]) -> Any:
+        """Değeri çöz; codec öncesi yazılmış kayıtlar da okunur"""
+        return self.serializer.loads(value)
     
     async def get(self, key: str, namespace: str = "temp") -> Optional[Any]:
         """Cache'den değer al"""
         if not self.is_connected:
             return None
         
+        use_l1 = self._uses_l1(namespace)
+        if use_l1:
+            local = self.l1.get(namespace, key)
+            if local is not None:
+                return self._deserialize(local)
+        
         try:
             full_key = self._make_key(namespace, key)
+            started = time.perf_counter()
             value = await self.client.get(full_key)
+            self.metrics.record_get(namespace, key, len(value) if value else 0, time.perf_counter() - started)
             
             if value:
+                if use_l1:
+                    self.l1.set(namespace, key, value)
                 return self._deserialize(value)
             return None
             
         except Exception as e:
+            self.metrics.record_error(namespace)
             logger.error(f"Cache get hatası: {e}")
             return None
     
@@ -133,14 +374,21 @@ class CacheService:
             if ttl is None:
                 ttl = self.default_ttl
             
+            started = time.perf_counter()
             if ttl > 0:
                 await self.client.setex(full_key, ttl, serialized)
             else:
                 await self.client.set(full_key, serialized)
+            self.metrics.record_set(namespace, key, len(serialized), time.perf_counter() - started)
+            
+            if self._uses_l1(namespace):
+                await self._invalidate(namespace, [key])
+                self.l1.set(namespace, key, serialized, ttl)
             
             return True
             
         except Exception as e:
+            self.metrics.record_error(namespace)
             logger.error(f"Cache set hatası: {e}")
             return False
     
@@ -152,9 +400,12 @@ class CacheService:
         try:
             full_key = self._make_key(namespace, key)
             result = await self.client.delete(full_key)
+            self.metrics.record_delete(namespace, result)
+            await self._invalidate(namespace, [key])
             return result > 0
             
         except Exception as e:
+            self.metrics.record_error(namespace)
             logger.error(f"Cache delete hatası: {e}")
             return False
     
@@ -173,76 +424,182 @@ class CacheService:
     
     async def clear_namespace(self, namespace: str) -> int:
         """Belirli bir namespace'i temizle"""
+        return await self.delete_pattern("*", namespace)
+    
+    async def delete_pattern(self, pattern: str, namespace: str = "temp") -> int:
+        """
+        Desene uyan key'leri sil. KEYS yerine artımlı SCAN ve toplu UNLINK
+        kullanılır; Redis büyük keyspace'lerde bloklanmaz, bellek arka planda
+        serbest bırakılır. Tekil kullanıcı/ders invalidation'ı için
+        invalidate_tags tercih edilmeli.
+        """
         if not self.is_connected:
             return 0
         
         try:
-            prefix = self.namespaces.get(namespace, namespace)
-            pattern = f"{prefix}*"
+            match = self._make_key(namespace, pattern)
+            deleted = 0
+            batch = []
             
-            # Tüm key'leri bul
-            keys = []
-            async for key in self.client.scan_iter(match=pattern):
-                keys.append(key)
+            async for key in self.client.scan_iter(match=match, count=self.UNLINK_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= self.UNLINK_BATCH_SIZE:
+                    deleted += await self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.client.unlink(*batch)
             
-            # Toplu silme
-            if keys:
-                return await self.client.delete(*keys)
-            return 0
+            self.metrics.record_delete(namespace, deleted)
+            await self._invalidate(namespace)
+            return deleted
             
         except Exception as e:
-            logger.error(f"Cache clear namespace hatası: {e}")
+            self.metrics.record_error(namespace)
+            logger.error(f"Cache delete_pattern hatası: {e}")
             return 0
     
+    # Tag (bağımlılık) tabanlı invalidation
+    async def get_tag_versions(self, tags: List[str]) -> Dict[str, int]:
+        """Tag'lerin güncel nesil numaraları (hiç artırılmamış tag: 0)"""
+        if not self.is_connected or not tags:
+            return {}
+        
+        versions = {}
+        missing = []
+        for tag in tags:
+            local = self.l1.get(self.L1_TAG_NAMESPACE, tag) if self.l1_namespaces else None
+            if local is not None:
+                versions[tag] = local
+            else:
+                missing.append(tag)
+        if not missing:
+            return versions
+        
+        try:
+            values = await self.client.mget([self._make_key(self.TAG_NAMESPACE, tag) for tag in missing])
+            for tag, value in zip(missing, values):
+                versions[tag] = int(value) if value else 0
+                if self.l1_namespaces:
+                    self.l1.set(self.L1_TAG_NAMESPACE, tag, versions[tag])
+            return versions
+            
+        except Exception as e:
+            logger.error(f"Cache get_tag_versions hatası: {e}")
+            return {}
+    
+    async def invalidate_tags(self, *tags: str) -> bool:
+        """
+        Tag'lerin nesil sayacını artır. Bu tag'lerle yazılmış kayıtlar bir
+        sonraki okumada geçersiz sayılır; maliyet keyspace değil tag sayısıdır.
+        """
+        if not self.is_connected or not tags:
+            return False
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(self._make_key(self.TAG_NAMESPACE, tag))
+            await pipe.execute()
+            
+            if self.l1_namespaces:
+                await self._broadcast_invalidation(self.L1_TAG_NAMESPACE, list(tags))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Cache invalidate_tags hatası: {e}")
+            return False
+    
     async def get_many(self, keys: List[str], namespace: str = "temp") -> Dict[str, Any]:
-        """Birden fazla değeri al"""
-        if not self.is_connected:
+        """
+        Birden fazla değeri tek MGET ile al. Her değer kendi tip etiketiyle
+        çözülür; bulunamayan key'ler sonuçta yer almaz.
+        """
+        if not self.is_connected or not keys:
             return {}
         
+        result = {}
+        use_l1 = self._uses_l1(namespace)
+        if use_l1:
+            missing = []
+            for key in keys:
+                local = self.l1.get(namespace, key)
+                if local is not None:
+                    result[key] = self._deserialize(local)
+                else:
+                    missing.append(key)
+            keys = missing
+            if not keys:
+                return result
+        
         try:
+            keys = list(dict.fromkeys(keys))
             full_keys = [self._make_key(namespace, key) for key in keys]
+            started = time.perf_counter()
             values = await self.client.mget(full_keys)
+            self.metrics.observe_latency(namespace, "get", time.perf_counter() - started)
             
-            result = {}
             for key, value in zip(keys, values):
+                self.metrics.record_get(namespace, key, len(value) if value else 0)
                 if value:
+                    if use_l1:
+                        self.l1.set(namespace, key, value)
                     result[key] = self._deserialize(value)
             
             return result
             
         except Exception as e:
+            self.metrics.record_error(namespace)
             logger.error(f"Cache get_many hatası: {e}")
-            return {}
+            return result
     
     async def set_many(
         self, 
         data: Dict[str, Any], 
-        ttl: Optional[int] = None,
+        ttl: Optional[Union[int, Dict[str, int]]] = None,
         namespace: str = "temp"
     ) -> bool:
-        """Birden fazla değeri kaydet"""
+        """
+        Birden fazla değeri tek round-trip'te kaydet (transaction'sız pipeline).
+        ttl tek bir değer ya da key başına TTL sözlüğü olabilir.
+        """
         if not self.is_connected:
             return False
+        if not data:
+            return True
         
         try:
-            pipe = self.client.pipeline()
+            pipe = self.client.pipeline(transaction=False)
+            serialized_values = {}
             
             for key, value in data.items():
                 full_key = self._make_key(namespace, key)
                 serialized = self._serialize(value)
+                serialized_values[key] = serialized
                 
-                if ttl is None:
-                    ttl = self.default_ttl
+                key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+                if key_ttl is None:
+                    key_ttl = self.default_ttl
                 
-                if ttl > 0:
-                    pipe.setex(full_key, ttl, serialized)
+                if key_ttl > 0:
+                    pipe.setex(full_key, key_ttl, serialized)
                 else:
                     pipe.set(full_key, serialized)
             
+            started = time.perf_counter()
             await pipe.execute()
+            self.metrics.observe_latency(namespace, "set", time.perf_counter() - started)
+            for key, serialized in serialized_values.items():
+                self.metrics.record_set(namespace, key, len(serialized))
+            
+            if self._uses_l1(namespace):
+                await self._invalidate(namespace, list(data.keys()))
+                for key, serialized in serialized_values.items():
+                    key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+                    self.l1.set(namespace, key, serialized, key_ttl)
             return True
             
         except Exception as e:
+            self.metrics.record_error(namespace)
             logger.error(f"Cache set_many hatası: {e}")
             return False
     
@@ -253,9 +610,12 @@ class CacheService:
         
         try:
             full_key = self._make_key(namespace, key)
-            return await self.client.incrby(full_key, amount)
+            result = await self.client.incrby(full_key, amount)
+            await self._invalidate(namespace, [key])
+            return result
             
         except Exception as e:
+            self.metrics.record_error(namespace)
             logger.error(f"Cache increment hatası: {e}")
             return None
     
@@ -280,7 +640,9 @@ class CacheService:
         
         try:
             full_key = self._make_key(namespace, key)
-            return await self.client.expire(full_key, ttl)
+            result = await self.client.expire(full_key, ttl)
+            await self._invalidate(namespace, [key])
+            return result
             
         except Exception as e:
             logger.error(f"Cache expire hatası: {e}")
@@ -343,6 +705,52 @@ class CacheService:
         except Exception as e:
             logger.error(f"Cache smembers hatası: {e}")
             return set()
+    
+    # Lua scripts
+    async def run_script(self, name: str, source: str, keys: List[str], args: List[Any]) -> Optional[Any]:
+        """Sunucu tarafı atomik script çalıştır (tek round-trip)"""
+        if not self.is_connected:
+            return None
+        
+        try:
+            script = self._scripts.get(name)
+            if script is None:
+                script = self._scripts[name] = self.client.register_script(source)
+            return await script(keys=keys, args=args)
+            
+        except Exception as e:
+            logger.error(f"Cache script hatası ({name}): {e}")
+            return None
+    
+    # Distributed lock
+    async def acquire_lock(self, key: str, ttl: int = 10, namespace: str = "temp") -> Optional[str]:
+        """Kilidi almayı dene; başarılıysa bırakma için token döner"""
+        if not self.is_connected:
+            return None
+        
+        try:
+            token = uuid.uuid4().hex
+            full_key = self._make_key(namespace, f"lock:{key}")
+            if await self.client.set(full_key, token, nx=True, ex=ttl):
+                return token
+            return None
+            
+        except Exception as e:
+            logger.error(f"Cache acquire_lock hatası: {e}")
+            return None
+    
+    async def release_lock(self, key: str, token: str, namespace: str = "temp") -> bool:
+        """Kilidi yalnızca hâlâ bu token'a aitse bırak"""
+        if not self.is_connected:
+            return False
+        
+        try:
+            full_key = self._make_key(namespace, f"lock:{key}")
+            return bool(await self.run_script("release_lock", self.RELEASE_LOCK_SCRIPT, [full_key], [token]))
+            
+        except Exception as e:
+            logger.error(f"Cache release_lock hatası: {e}")
+            return False
 
 
 # Global cache instance
@@ -350,15 +758,139 @@ cache = CacheService()
 
 
 # Decorator for caching
+# Aynı anahtar için süreç içinde devam eden hesaplamalar (single-flight)
+_inflight: Dict[str, asyncio.Future] = {}
+_refresh_tasks: set = set()
+
+
+def _envelope(value: Any, ttl: int, compute_time: float, tags: Optional[Dict[str, int]] = None) -> Dict:
+    """Değeri mantıksal bitiş zamanı, hesaplama süresi ve tag nesilleriyle sar"""
+    return {
+        "__cached__": 1,
+        "v": value,
+        "exp": time.time() + ttl if ttl > 0 else None,
+        "delta": compute_time,
+        "tags": tags or {},
+    }
+
+
+def _is_envelope(entry: Any) -> bool:
+    return isinstance(entry, dict) and entry.get("__cached__") == 1
+
+
+def _needs_refresh(entry: Dict, beta: float) -> bool:
+    """
+    Süresi dolmuş mu ya da olasılıksal erken yenileme (XFetch) zamanı mı?
+    Bitişe yaklaştıkça ve hesaplama pahalılaştıkça yenileme olasılığı artar.
+    """
+    expires_at = entry.get("exp")
+    if expires_at is None:
+        return False
+    now = time.time()
+    if now >= expires_at:
+        return True
+    if beta <= 0:
+        return False
+    return now - entry.get("delta", 0) * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def _resolve_tags(func, templates: List[str], args, kwargs) -> List[str]:
+    """"user:{user_id}" gibi şablonları çağrı argümanlarıyla doldur"""
+    bound = inspect.signature(func).bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    return [template.format(**bound.arguments) for template in templates]
+
+
+async def _tags_changed(entry: Dict) -> bool:
+    tags = entry.get("tags")
+    if not tags:
+        return False
+    current = await cache.get_tag_versions(list(tags))
+    return any(current.get(tag, 0) != version for tag, version in tags.items())
+
+
+def _mark_retrieved(future: asyncio.Future):
+    # Bekleyen yoksa "exception was never retrieved" uyarısını önle
+    if not future.cancelled():
+        future.exception()
+
+
+async def _single_flight(flight_key: str, compute):
+    """Aynı anahtar için eşzamanlı çağrılar tek bir hesaplamayı paylaşır"""
+    future = _inflight.get(flight_key)
+    if future is not None:
+        return await asyncio.shield(future)
+    
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(_mark_retrieved)
+    _inflight[flight_key] = future
+    try:
+        result = await compute()
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _inflight.pop(flight_key, None)
+
+
+def _schedule_refresh(flight_key: str, compute):
+    """Bayat/erken yenilenecek değeri arka planda yeniden hesapla"""
+    if flight_key in _inflight:
+        return
+    
+    async def refresh():
+        try:
+            await _single_flight(flight_key, compute)
+        except Exception as e:
+            logger.warning(f"Cache arka plan yenileme hatası ({flight_key}): {e}")
+    
+    task = asyncio.create_task(refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _wait_for_fresh(cache_key: str, namespace: str, timeout: float) -> Optional[Dict]:
+    """Başka worker kilidi tutarken onun yazacağı taze değeri bekle"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await cache.get(cache_key, namespace)
+        if _is_envelope(entry) and not _needs_refresh(entry, 0):
+            return entry
+    return None
+
+
 def cached(
     namespace: str = "temp",
     ttl: Optional[int] = None,
     key_prefix: str = "",
-    key_builder: Optional[callable] = None
+    key_builder: Optional[callable] = None,
+    stale_ttl: Optional[int] = None,
+    beta: Optional[float] = None,
+    cache_none: bool = False,
+    negative_ttl: Optional[int] = None,
+    distributed_lock: bool = False,
+    lock_ttl: Optional[int] = None,
+    tags: Optional[List[str]] = None
 ):
     """
     Cache decorator
     
+    Stampede koruması:
+    - Aynı anahtar için süreç içinde tek hesaplama (single-flight),
+      distributed_lock=True ise worker'lar arası Redis kilidi
+    - Süresi dolan değer stale_ttl boyunca sunulur, arka planda yenilenir
+    - beta > 0 ise bitişten önce olasılıksal erken yenileme
+    - cache_none=True ise None sonuçlar negative_ttl kadar saklanır
+    
+    tags: "user:{user_id}" gibi şablonlar; cache.invalidate_tags("user:42")
+    bu tag'le yazılmış tüm kayıtları geçersiz kılar.
+    
     Kullanım:
     ```python
     @cached(namespace="user", ttl=3600)
@@ -367,6 +899,11 @@ def cached(
         return user_data
     ```
     """
+    stale_ttl = settings.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+    beta = settings.CACHE_EARLY_EXPIRATION_BETA if beta is None else beta
+    negative_ttl = settings.CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+    lock_ttl = settings.CACHE_LOCK_TTL if lock_ttl is None else lock_ttl
+    
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -384,20 +921,62 @@ def cached(
             if len(cache_key) > 100:
                 cache_key = hashlib.md5(cache_key.encode()).hexdigest()
             
-            # Cache'den kontrol et
-            cached_value = await cache.get(cache_key, namespace)
-            if cached_value is not None:
-                logger.debug(f"Cache hit: {cache_key}")
-                return cached_value
+            flight_key = f"{namespace}:{cache_key}"
             
-            # Fonksiyonu çalıştır
-            result = await func(*args, **kwargs)
+            async def compute_and_store():
+                # Nesiller hesaplamadan önce okunur: hesaplama sırasında gelen
+                # invalidation kaydı geçersiz bırakır
+                tag_versions = None
+                if tags:
+                    tag_names = _resolve_tags(func, tags, args, kwargs)
+                    tag_versions = await cache.get_tag_versions(tag_names)
+                    tag_versions = {tag: tag_versions.get(tag, 0) for tag in tag_names}
+                
+                started = time.monotonic()
+                result = await func(*args, **kwargs)
+                compute_time = time.monotonic() - started
+                
+                if result is None and not cache_none:
+                    return result
+                
+                entry_ttl = negative_ttl if result is None else (cache.default_ttl if ttl is None else ttl)
+                redis_ttl = entry_ttl + stale_ttl if entry_ttl > 0 else 0
+                await cache.set(cache_key, _envelope(result, entry_ttl, compute_time, tag_versions), redis_ttl, namespace)
+                logger.debug(f"Cache set: {cache_key}")
+                return result
+            
+            async def load(background: bool = False):
+                if not (distributed_lock and cache.is_connected):
+                    return await compute_and_store()
+                
+                token = await cache.acquire_lock(cache_key, lock_ttl, namespace)
+                if token is None:
+                    # Başka bir worker hesaplıyor
+                    if background:
+                        return None
+                    entry = await _wait_for_fresh(cache_key, namespace, lock_ttl)
+                    if entry is not None:
+                        return entry["v"]
+                try:
+                    return await compute_and_store()
+                finally:
+                    if token:
+                        await cache.release_lock(cache_key, token, namespace)
             
-            # Cache'e kaydet
-            await cache.set(cache_key, result, ttl, namespace)
-            logger.debug(f"Cache set: {cache_key}")
+            # Cache'den kontrol et
+            entry = await cache.get(cache_key, namespace)
+            if entry is not None:
+                if not _is_envelope(entry):
+                    # Zarf öncesi yazılmış kayıt
+                    return entry
+                
+                if not await _tags_changed(entry):
+                    if _needs_refresh(entry, beta):
+                        _schedule_refresh(flight_key, lambda: load(background=True))
+                    logger.debug(f"Cache hit: {cache_key}")
+                    return entry["v"]
             
-            return result
+            return await _single_flight(flight_key, load)
         
         return wrapper
     return decorator
@@ -405,47 +984,83 @@ def cached(
 
 # Cache invalidation helper
 class CacheInvalidator:
-    """Cache invalidation yardımcısı"""
+    """Cache invalidation yardımcısı (tag nesilleri; keyspace taranmaz)"""
     
     @staticmethod
     async def invalidate_user_cache(user_id: str):
         """Kullanıcı cache'ini temizle"""
-        patterns = [
-            f"user:{user_id}",
-            f"user:{user_id}:*",
-            f"session:{user_id}:*"
-        ]
-        
-        for pattern in patterns:
-            await cache.delete(pattern, "user")
+        await cache.invalidate_tags(f"user:{user_id}")
+        await cache.delete(user_id, "user")
+        await cache.delete(f"user_progress:{user_id}", "user")
     
     @staticmethod
     async def invalidate_lesson_cache(lesson_id: str):
         """Ders cache'ini temizle"""
-        patterns = [
-            f"lesson:{lesson_id}",
-            f"lesson:{lesson_id}:*"
-        ]
-        
-        for pattern in patterns:
-            await cache.delete(pattern, "lesson")
+        await cache.invalidate_tags(f"lesson:{lesson_id}")
+        await cache.delete(lesson_id, "lesson")
     
     @staticmethod
     async def invalidate_ai_cache(user_id: Optional[str] = None):
         """AI cache'ini temizle"""
         if user_id:
-            await cache.delete(f"ai:{user_id}:*", "ai")
+            await cache.invalidate_tags(f"ai:{user_id}")
         else:
             await cache.clear_namespace("ai")
 
 
 # Rate limiter using Redis
 class RateLimiter:
-    """Redis tabanlı rate limiter"""
+    """
+    Redis tabanlı GCRA rate limiter.
+    
+    Karar tek bir atomik Lua script'iyle verilir (GET/SET yarışı yok, tek
+    round-trip). local_lease > 0 ise her süreç Redis'ten bir seferde birkaç
+    istek hakkı kiralar ve bunları sync_interval boyunca yerelde harcar;
+    böylece çoğu istek Redis'e hiç gitmez. Kullanılmayan kiralık haklar
+    süre dolunca kaybolur, yani limit en fazla lease kadar erken dolabilir.
+    """
+    
+    # Döner: {verilen, kalan, retry_after_ms}
+    GCRA_SCRIPT = """
+    local emission = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local requested = tonumber(ARGV[3])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then
+        tat = now
+    end
+    local available = math.floor((window - (tat - now)) / emission)
+    local granted = math.min(requested, available)
+    if granted <= 0 then
+        return {0, 0, math.ceil(tat + emission - window - now)}
+    end
+    local new_tat = tat + emission * granted
+    redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+    return {granted, available - granted, 0}
+    """
     
-    def __init__(self, max_requests: int = 100, window_seconds: int = 60):
+    MAX_LOCAL_BUCKETS = 10000
+    
+    def __init__(
+        self,
+        max_requests: int = 100,
+        window_seconds: int = 60,
+        local_lease: int = 0,
+        sync_interval: float = 1.0,
+        name: str = "default"
+    ):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        self.name = name
+        # Küçük limitlerde kiralama doğruluğu bozmasın
+        self.local_lease = max(1, min(local_lease, max_requests // 10)) if local_lease > 0 else 0
+        self.sync_interval = sync_interval
+        self._emission_ms = window_seconds * 1000 / max_requests
+        # identifier -> [kalan yerel hak, son kullanma (monotonic), son bilinen kalan]
+        self._local: Dict[str, list] = {}
+        self.stats = {"allowed": 0, "denied": 0, "local_hits": 0, "redis_calls": 0}
     
     async def check_rate_limit(self, identifier: str) -> tuple[bool, int]:
         """
@@ -454,17 +1069,65 @@ class RateLimiter:
         Returns:
             (allowed, remaining_requests)
         """
-        key = f"rate_limit:{identifier}"
+        allowed, remaining, _ = await self.acquire(identifier)
+        return allowed, remaining
+    
+    async def acquire(self, identifier: str) -> tuple[bool, int, float]:
+        """
+        Bir istek hakkı al
+        
+        Returns:
+            (allowed, remaining_requests, retry_after_seconds)
+        """
+        now = time.monotonic()
         
-        current = await cache.get(key, "temp")
-        if current is None:
-            await cache.set(key, 1, self.window_seconds, "temp")
-            return True, self.max_requests - 1
+        bucket = self._local.get(identifier)
+        if bucket and bucket[0] > 0 and bucket[1] > now:
+            bucket[0] -= 1
+            self.stats["local_hits"] += 1
+            self.stats["allowed"] += 1
+            return True, bucket[2] + bucket[0], 0.0
         
-        current = int(current)
-        if current >= self.max_requests:
-            ttl = await cache.get_ttl(key, "temp")
-            return False, 0
+        if not cache.is_connected:
+            # Redis yoksa isteği engelleme
+            return True, self.max_requests, 0.0
         
-        new_count = await cache.increment(key, 1, "temp")
-        return True, self.max_requests - new_count
+        requested = self.local_lease or 1
+        self.stats["redis_calls"] += 1
+        result = await cache.run_script(
+            "rate_limit_gcra",
+            self.GCRA_SCRIPT,
+            keys=[cache._make_key("temp", f"rate_limit:{self.name}:{identifier}")],
+            args=[self._emission_ms, self.window_seconds * 1000, requested]
+        )
+        if result is None:
+            return True, self.max_requests, 0.0
+        
+        granted, remaining, retry_after_ms = (int(value) for value in result)
+        if granted <= 0:
+            self._local.pop(identifier, None)
+            self.stats["denied"] += 1
+            return False, 0, max(retry_after_ms, 0) / 1000
+        
+        if self.local_lease:
+            self._store_lease(identifier, granted - 1, remaining, now)
+        self.stats["allowed"] += 1
+        return True, remaining + granted - 1, 0.0
+    
+    def _store_lease(self, identifier: str, tokens: int, remaining: int, now: float):
+        if len(self._local) >= self.MAX_LOCAL_BUCKETS:
+            for key in [k for k, bucket in self._local.items() if bucket[1] <= now]:
+                del self._local[key]
+            if len(self._local) >= self.MAX_LOCAL_BUCKETS:
+                self._local.clear()
+        self._local[identifier] = [tokens, now + self.sync_interval, remaining]
+    
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "name": self.name,
+            "max_requests": self.max_requests,
+            "window_seconds": self.window_seconds,
+            "local_lease": self.local_lease,
+            "local_buckets": len(self._local),
+        }
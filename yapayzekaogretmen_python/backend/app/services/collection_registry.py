@@ -0,0 +1,150 @@
+"""
+Koleksiyon Kaydı - (Sınıf, Ders) İndeksi
+----------------------------------------
+Vektör koleksiyonlarını bellekte (sınıf, ders) anahtarıyla indeksler;
+sorgu yönlendirmesi her istekte Chroma'yı listeleyip FAISS klasörünü
+taramak yerine O(1) sözlük erişimidir. Kayıt ingest ve silme işlemlerinde
+anında güncellenir. Başka worker'ların yaptığı değişiklikler için
+belirli aralıklarla (veya bilinmeyen bir koleksiyon istendiğinde, en fazla
+birkaç saniyede bir) tam tarama ile yenilenir.
+
+Süreç genelinde paylaşılır; VectorDBService örnekleri aynı kaydı kullanır.
+Her koleksiyon için bir sürüm (yayımlanmış Chroma neslinin fiziksel adı,
+FAISS klasörünün mtime'ı) tutulur; önbellekteki vektör deposunun sürümü
+kayıttakinden farklıysa koleksiyon yeniden kurulmuş demektir ve yeniden
+yüklenir. Chroma okuyucuları fiziksel ada kayıt üzerinden ulaşır.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+# grade_<sınıf>_<ders>[_<8 hane hash>]
+COLLECTION_NAME_PATTERN = re.compile(r"^grade_(\d+)_(.+?)(?:_[0-9a-f]{8})?$")
+
+
+def _key(grade: int, subject: str) -> Tuple[int, str]:
+    return int(grade), str(subject).strip().lower()
+
+
+def parse_collection_name(name: str) -> Optional[Tuple[int, str]]:
+    """Koleksiyon adından (sınıf, ders); müfredat adı değilse None"""
+    match = COLLECTION_NAME_PATTERN.match(name)
+    if not match:
+        return None
+    return _key(match.group(1), match.group(2))
+
+
+class CollectionRegistry:
+    """Koleksiyon adı -> tip ve (sınıf, ders) -> koleksiyon adları"""
+
+    def __init__(self, refresh_interval: float = 300.0, min_forced_interval: float = 5.0):
+        self.refresh_interval = refresh_interval
+        self.min_forced_interval = min_forced_interval
+        self._lock = threading.Lock()
+        self._kinds: Dict[str, str] = {}
+        self._versions: Dict[str, Any] = {}
+        self._keys: Dict[str, Tuple[int, str]] = {}
+        self._by_key: Dict[Tuple[int, str], List[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._forced_at: Optional[float] = None
+        self.forced_refreshes = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def claim_forced_refresh(self) -> bool:
+        """
+        Bilinmeyen ad için zamanından önce tam tarama izni. Son taramadan bu
+        yana min_forced_interval geçmediyse reddedilir; geçersiz ad içeren
+        istekler her seferinde O(N) tarama yaptıramaz.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last = max(self._loaded_at or 0.0, self._forced_at or 0.0)
+            if last and now - last < self.min_forced_interval:
+                return False
+            self._forced_at = now
+            self.forced_refreshes += 1
+            return True
+
+    def replace(self, collections: Iterable[Tuple]):
+        """Tam tarama sonucuyla kaydı yeniden kur: (ad, tip[, sürüm]) demetleri"""
+        kinds: Dict[str, str] = {}
+        versions: Dict[str, Any] = {}
+        keys: Dict[str, Tuple[int, str]] = {}
+        by_key: Dict[Tuple[int, str], List[str]] = {}
+        for name, kind, *version in collections:
+            kinds[name] = kind
+            versions[name] = version[0] if version else None
+            key = self._keys.get(name) or parse_collection_name(name)
+            if key:
+                keys[name] = key
+                by_key.setdefault(key, []).append(name)
+        with self._lock:
+            self._kinds, self._versions, self._keys, self._by_key = kinds, versions, keys, by_key
+            self._loaded_at = time.monotonic()
+
+    def register(
+        self,
+        name: str,
+        kind: str,
+        grade: Optional[int] = None,
+        subject: Optional[str] = None,
+        version: Any = None
+    ):
+        """Ingest sonrası; sınıf/ders verilmezse addan çözülür"""
+        key = _key(grade, subject) if grade is not None and subject else parse_collection_name(name)
+        with self._lock:
+            self._remove(name)
+            self._kinds[name] = kind
+            self._versions[name] = version
+            if key:
+                self._keys[name] = key
+                self._by_key.setdefault(key, []).append(name)
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._remove(name)
+
+    def _remove(self, name: str):
+        self._kinds.pop(name, None)
+        self._versions.pop(name, None)
+        key = self._keys.pop(name, None)
+        if key and name in self._by_key.get(key, ()):
+            self._by_key[key].remove(name)
+            if not self._by_key[key]:
+                del self._by_key[key]
+
+    def find(self, grade: int, subject: str) -> List[str]:
+        return list(self._by_key.get(_key(grade, subject), ()))
+
+    def kind(self, name: str) -> Optional[str]:
+        return self._kinds.get(name)
+
+    def version(self, name: str) -> Any:
+        return self._versions.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._kinds)
+
+    def get_stats(self) -> Dict:
+        return {
+            "collections": len(self._kinds),
+            "grade_subjects": len(self._by_key),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "forced_refreshes": self.forced_refreshes,
+        }
+
+
+collection_registry = CollectionRegistry(
+    settings.COLLECTION_REGISTRY_REFRESH_INTERVAL,
+    settings.COLLECTION_REGISTRY_MIN_FORCED_REFRESH_INTERVAL
+)
@@ -9,14 +9,11 @@ from datetime import datetime
 from enum import Enum
 import asyncio
 import base64
-import io
 import re
 from pathlib import Path
 from dataclasses import dataclass, field
 import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
 import cv2
-import pytesseract
 
 from loguru import logger
 
@@ -24,6 +21,8 @@ from app.core.config import settings
 from app.db.mongodb import get_database
 from app.services.cache_service import cache
 from app.services.ai_service import ai_service
+from app.workers import cpu_tasks
+from app.services.executor_service import executor
 
 
 class ImageType(str, Enum):
@@ -262,61 +261,20 @@ class ComputerVisionService:
         return analysis
     
     async def _preprocess_image(self, image_data: bytes) -> np.ndarray:
-        """Görüntü ön işleme"""
-        # PIL Image olarak aç
-        image = Image.open(io.BytesIO(image_data))
-        
-        # RGB'ye dönüştür
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Boyutlandır
-        image.thumbnail(self.image_processing["max_size"], Image.Resampling.LANCZOS)
-        
-        # Kontrast ve parlaklık ayarla
-        enhancer_contrast = ImageEnhance.Contrast(image)
-        image = enhancer_contrast.enhance(self.image_processing["enhance_contrast"])
-        
-        enhancer_brightness = ImageEnhance.Brightness(image)
-        image = enhancer_brightness.enhance(self.image_processing["enhance_brightness"])
-        
-        # Numpy array'e dönüştür
-        img_array = np.array(image)
-        
-        # OpenCV işlemleri
-        # Gri tonlama
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        
-        # Gürültü azaltma
-        denoised = cv2.fastNlMeansDenoising(
-            gray,
-            None,
-            self.image_processing["denoise_strength"],
-            7,
-            21
-        )
-        
-        # Adaptif threshold (el yazısı için)
-        thresh = cv2.adaptiveThreshold(
-            denoised,
-            255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY,
-            11,
-            2
-        )
-        
-        return thresh
+        """Görüntü ön işleme (denoise CPU'ya bağlı; 'ocr' süreç havuzunda)"""
+        return await executor.run("ocr", cpu_tasks.preprocess_image, image_data, self.image_processing)
     
     async def _extract_text(self, image: np.ndarray) -> str:
         """OCR ile metin çıkarma"""
         try:
-            # Tesseract OCR
+            # Tesseract OCR ('ocr' süreç havuzunda)
             custom_config = f'--oem {self.ocr_config["oem"]} --psm {self.ocr_config["psm"]}'
-            text = pytesseract.image_to_string(
+            text = await executor.run(
+                "ocr",
+                cpu_tasks.ocr_image,
                 image,
-                lang=self.ocr_config["language"],
-                config=custom_config
+                self.ocr_config["language"],
+                custom_config
             )
             
             # Temizle
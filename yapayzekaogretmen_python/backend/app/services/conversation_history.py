@@ -0,0 +1,171 @@
+"""
+Konuşma Geçmişi Yönetimi - Token Bütçeli Kırpma
+-----------------------------------------------
+Sabit "son 6 mesaj" yerine geçmişi modelin token bütçesine göre kırpar.
+Bütçeye sığmayan eski mesajlar oturum başına saklanan, artımlı güncellenen
+bir özete eklenir; uzun ders oturumlarında istek boyutu sabit kalır.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services import token_counter
+from app.services.cache_service import cache
+
+# Model bağlam pencereleri (token)
+MODEL_CONTEXT_WINDOWS = {
+    "deepseek-chat": 64000,
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+ROLE_LABELS = {"user": "Öğrenci", "human": "Öğrenci", "assistant": "Öğretmen"}
+
+
+@dataclass
+class TrimmedHistory:
+    """Bütçeye sığan mesajlar ve dışarıda kalanların özeti"""
+    messages: List[Dict]
+    summary: Optional[str] = None
+    dropped: int = 0
+    tokens: int = 0
+
+
+class ConversationHistoryManager:
+    """Geçmişi token bütçesine sığdırır, kalanı oturum özetine ekler"""
+
+    def __init__(
+        self,
+        max_history_tokens: int = settings.AI_HISTORY_MAX_TOKENS,
+        summary_max_tokens: int = settings.AI_HISTORY_SUMMARY_MAX_TOKENS,
+        summary_ttl: int = settings.AI_HISTORY_SUMMARY_TTL,
+    ):
+        self.max_history_tokens = max_history_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_ttl = summary_ttl
+        self.stats = {"trimmed_requests": 0, "dropped_messages": 0, "truncated_messages": 0}
+
+    def budget_for(self, model: str, reserved_tokens: int) -> int:
+        """Sistem prompt'u, soru ve yanıt payı düşüldükten sonra geçmiş için kalan bütçe"""
+        window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        return max(0, min(self.max_history_tokens, window - reserved_tokens))
+
+    async def fit(
+        self,
+        history: Optional[List[Dict]],
+        model: str,
+        budget: int,
+        session_id: Optional[str] = None,
+    ) -> TrimmedHistory:
+        """En yeni mesajdan geriye doğru bütçe dolana kadar mesaj al"""
+        if not history:
+            return TrimmedHistory(messages=[])
+
+        kept: List[Dict] = []
+        used = 0
+        for message in reversed(history):
+            tokens = token_counter.count_tokens(message.get("content", ""), model) \
+                + token_counter.MESSAGE_OVERHEAD_TOKENS
+            if used + tokens > budget:
+                # En yeni mesaj tek başına bütçeyi aşıyorsa (yapıştırılmış ödev metni) kısalt
+                if not kept and budget > token_counter.MESSAGE_OVERHEAD_TOKENS:
+                    kept.append(self._truncate(message, model, budget - token_counter.MESSAGE_OVERHEAD_TOKENS))
+                    used = budget
+                    self.stats["truncated_messages"] += 1
+                break
+            kept.append(message)
+            used += tokens
+        kept.reverse()
+
+        dropped = history[:len(history) - len(kept)]
+        if not dropped:
+            return TrimmedHistory(messages=kept, tokens=used)
+
+        self.stats["trimmed_requests"] += 1
+        self.stats["dropped_messages"] += len(dropped)
+        summary = await self._summarize(dropped, model, session_id)
+        return TrimmedHistory(messages=kept, summary=summary, dropped=len(dropped), tokens=used)
+
+    # ------------------------------------------------------------------
+    # Özet
+    # ------------------------------------------------------------------
+    async def _summarize(self, dropped: List[Dict], model: str, session_id: Optional[str]) -> str:
+        """Dışarıda kalan mesajları özete ekle; oturum varsa yalnızca yenileri işle"""
+        if not session_id:
+            return "\n".join(self._bounded_lines([self._summary_line(m) for m in dropped], model))
+
+        key = f"history_summary:{session_id}"
+        state = None
+        try:
+            state = await cache.get(key, namespace="session")
+        except Exception as e:
+            logger.warning(f"Oturum özeti okunamadı: {e}")
+
+        lines: List[str] = []
+        start = 0
+        if isinstance(state, dict) and state.get("summarized", 0) <= len(dropped):
+            lines = state.get("lines", [])
+            start = state["summarized"]
+
+        lines = lines + [self._summary_line(m) for m in dropped[start:]]
+        lines = self._bounded_lines(lines, model)
+
+        if start < len(dropped):
+            try:
+                await cache.set(
+                    key,
+                    {"summarized": len(dropped), "lines": lines},
+                    ttl=self.summary_ttl,
+                    namespace="session"
+                )
+            except Exception as e:
+                logger.warning(f"Oturum özeti kaydedilemedi: {e}")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _summary_line(message: Dict) -> str:
+        """Mesajın ilk cümlesinden kısa özet satırı"""
+        content = re.sub(r"\s+", " ", message.get("content", "")).strip()
+        first_sentence = re.split(r"(?<=[.!?])\s", content, maxsplit=1)[0]
+        if len(first_sentence) > 160:
+            first_sentence = first_sentence[:157] + "..."
+        label = ROLE_LABELS.get(message.get("role"), message.get("role", ""))
+        return f"- {label}: {first_sentence}"
+
+    def _bounded_lines(self, lines: List[str], model: str) -> List[str]:
+        """Özet bütçesini aşarsa en eski satırları at"""
+        total = sum(token_counter.count_tokens(line, model) for line in lines)
+        while lines and total > self.summary_max_tokens:
+            total -= token_counter.count_tokens(lines[0], model)
+            lines = lines[1:]
+        return lines
+
+    @staticmethod
+    def _truncate(message: Dict, model: str, max_tokens: int) -> Dict:
+        """Mesajın başını token bütçesine sığacak kadar koru"""
+        content = message.get("content", "")
+        # Token/karakter oranıyla tahmin et, sonra sığana kadar küçült
+        ratio = max_tokens / max(1, token_counter.count_tokens(content, model))
+        cut = int(len(content) * ratio)
+        while cut > 0 and token_counter.count_tokens(content[:cut], model) > max_tokens:
+            cut = int(cut * 0.9)
+        return {**message, "content": content[:cut] + " [...]"}
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "max_history_tokens": self.max_history_tokens,
+            "summary_max_tokens": self.summary_max_tokens,
+        }
+
+
+# Global instance
+history_manager = ConversationHistoryManager()
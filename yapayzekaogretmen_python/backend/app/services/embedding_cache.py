@@ -0,0 +1,150 @@
+"""
+Embedding Önbelleği - İçerik Hash'i ile Tekilleştirme
+-----------------------------------------------------
+Doküman parçalarının embedding'lerini (model adı, metnin SHA-256'sı)
+anahtarıyla kalıcı olarak saklar. Vektörler float16 olarak SQLite'a yazılır
+(float32'nin yarısı). CachedEmbeddings, LangChain embedding modelini sarar:
+embed_documents önce önbelleğe bakar, yalnızca eksik parçaları tekilleştirip
+yapılandırılabilir boyutta batch'ler halinde modele gönderir. Böylece
+güncellenen bir MEB PDF'i yeniden işlendiğinde sadece değişen parçalar
+vektörleştirilir.
+
+Sorgular (embed_query) her seferinde farklı olduğu için önbelleğe alınmaz.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from loguru import logger
+
+SQLITE_MAX_VARIABLES = 900  # IN (...) sorgusu başına parametre (SQLite limiti 999)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_name_of(embeddings: Embeddings) -> str:
+    """Önbellek anahtarı için modelin adı (sağlayıcı sınıfı + model)"""
+    name = getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None)
+    return f"{type(embeddings).__name__}:{name}" if name else type(embeddings).__name__
+
+
+class EmbeddingStore:
+    """(model, sha256) -> float16 vektör; thread-safe SQLite deposu"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, hash))"
+            )
+            self._conn.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        hashes = list(hashes)
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(hashes), SQLITE_MAX_VARIABLES):
+                chunk = hashes[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    [model, *chunk]
+                )
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float16)
+        return found
+
+    def set_many(self, model: str, vectors: Dict[str, np.ndarray]):
+        rows = [
+            (model, digest, int(vector.shape[0]), vector.astype(np.float16).tobytes())
+            for digest, vector in vectors.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def count(self, model: str = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings sarmalayıcısı: önbellek + tekilleştirme + batch"""
+
+    def __init__(self, base: Embeddings, store: EmbeddingStore, batch_size: int = 64):
+        self.base = base
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.model = model_name_of(base)
+        self.stats = {"hits": 0, "misses": 0, "batches": 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [content_hash(text) for text in texts]
+        vectors = self.store.get_many(self.model, set(hashes))
+        self.stats["hits"] += sum(1 for digest in hashes if digest in vectors)
+
+        # Eksikleri tekilleştir (aynı parça birden fazla geçebilir)
+        missing: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors:
+                missing.setdefault(digest, text)
+        self.stats["misses"] += len(missing)
+
+        if missing:
+            computed = self._embed_missing(missing)
+            self.store.set_many(self.model, computed)
+            vectors.update(computed)
+
+        # Önbellekten gelenlerle tutarlı olsun diye hepsi float16 hassasiyetinde döner
+        return [vectors[digest].astype(np.float32).tolist() for digest in hashes]
+
+    def _embed_missing(self, missing: Dict[str, str]) -> Dict[str, np.ndarray]:
+        digests = list(missing)
+        computed: Dict[str, np.ndarray] = {}
+        for start in range(0, len(digests), self.batch_size):
+            batch = digests[start:start + self.batch_size]
+            embedded = self.base.embed_documents([missing[digest] for digest in batch])
+            self.stats["batches"] += 1
+            for digest, vector in zip(batch, embedded):
+                computed[digest] = np.asarray(vector, dtype=np.float16)
+        logger.info(f"{len(digests)} parça vektörleştirildi ({self.model})")
+        return computed
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "model": self.model,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "batch_size": self.batch_size,
+        }
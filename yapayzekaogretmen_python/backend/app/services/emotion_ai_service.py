@@ -23,6 +23,7 @@ from app.services.cache_service import cache
 from app.services.ai_service import ai_service
 from app.services.notification_service import notification_service
 from app.services.gamification_service import gamification_service
+from app.services.executor_service import executor
 
 
 class EmotionType(str, Enum):
@@ -206,16 +207,11 @@ class EmotionAIService:
     ) -> EmotionAnalysis:
         """Yüz ifadesi analizi"""
         try:
-            # Görüntüyü numpy array'e dönüştür
-            nparr = np.frombuffer(image_data, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Yüz tespiti
+            # Yüz tespiti ('vision' thread havuzunda; OpenCV GIL'i bırakır)
             if self.face_cascade is not None:
-                faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+                face_count = await executor.run("vision", self._count_faces, image_data)
                 
-                if len(faces) == 0:
+                if face_count == 0:
                     return self._create_default_analysis("face")
             
             # AI ile duygu analizi
@@ -253,6 +249,13 @@ class EmotionAIService:
             logger.error(f"Facial emotion analysis hatası: {e}")
             return self._create_default_analysis("face")
     
+    def _count_faces(self, image_data: bytes) -> int:
+        """Görüntüyü çöz ve yüzleri say (senkron; executor içinde çalışır)"""
+        nparr = np.frombuffer(image_data, np.uint8)
+        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return len(self.face_cascade.detectMultiScale(gray, 1.1, 4))
+    
     async def analyze_text_emotion(
         self,
         text: str,
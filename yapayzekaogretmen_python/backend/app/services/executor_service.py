@@ -0,0 +1,207 @@
+"""
+Yönetilen Executor - Engelleyici İşler için Paylaşılan Havuzlar
+---------------------------------------------------------------
+OCR, görüntü işleme, PDF ayrıştırma ve vektör araması gibi senkron ağır
+işleri event loop dışında çalıştırır. Her iş yükünün adlandırılmış, boyutu
+sınırlı bir havuzu vardır: CPU'ya bağlı işler süreç havuzunda (GIL'i
+paylaşmaz), engelleyici I/O ve GIL'i bırakan native kod thread havuzunda
+çalışır. Havuz dolduğunda çağıranlar sırada bekler; kuyruk derinliği,
+bekleme ve çalışma süreleri havuz başına ölçülür.
+
+Süreç havuzuna gönderilen fonksiyon ve argümanlar pickle edilebilir
+olmalıdır (modül seviyesinde fonksiyonlar, bkz. app.workers.cpu_tasks).
+Spawn edilen worker'lar yalnızca app.workers paketini import eder.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.ai_metrics import Histogram
+from app.workers.timing import timed_call
+
+# Saniye cinsinden (kuyruk beklemesi ve iş süresi)
+EXECUTOR_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DEFAULT_POOL = {"kind": "thread", "workers": 4, "max_queue": 64}
+
+
+class PoolSaturatedError(RuntimeError):
+    """Havuzda yer beklerken zaman aşımı"""
+
+
+class ManagedPool:
+    """Tek bir adlandırılmış havuz: tembel oluşturulan executor, sınır ve metrikler"""
+
+    def __init__(self, name: str, kind: str, workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Geçersiz havuz tipi: {kind}")
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+        self.in_flight = 0  # havuza gönderilmiş, bitmemiş işler
+        self.waiting = 0  # havuzda yer bekleyen çağıranlar
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "restarts": 0}
+        self.queue_wait = Histogram(EXECUTOR_BUCKETS)
+        self.run_time = Histogram(EXECUTOR_BUCKETS)
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_executor(self) -> Executor:
+        # Farklı thread'lerdeki event loop'lar iki havuz kurmasın
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    context = multiprocessing.get_context(settings.EXECUTOR_PROCESS_START_METHOD)
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix=f"pool-{self.name}"
+                    )
+                logger.info(f"Executor havuzu oluşturuldu: {self.name} ({self.kind}, {self.workers} worker)")
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        return self._slots
+
+    def _begin(self):
+        with self._lock:
+            self.in_flight += 1
+            self.stats["submitted"] += 1
+
+    def _finish(self, submitted_at: float, outcome: Optional[Tuple[float, float, Any]], failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.stats["failed" if failed else "completed"] += 1
+            if outcome is not None:
+                started, finished, _ = outcome
+                self.queue_wait.observe(max(0.0, started - submitted_at))
+                self.run_time.observe(max(0.0, finished - started))
+
+    def _handle_broken(self, error: BaseException):
+        """Çöken süreç havuzunu bir sonraki işte yeniden oluşturmak üzere bırak"""
+        if isinstance(error, BrokenProcessPool):
+            logger.error(f"Süreç havuzu çöktü, yeniden oluşturulacak: {self.name}")
+            with self._lock:
+                broken, self._executor = self._executor, None
+                self.stats["restarts"] += 1
+            if broken is not None:
+                broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func: Callable, args: tuple, kwargs: dict, timeout: Optional[float]) -> Any:
+        slots = self._get_slots()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise PoolSaturatedError(f"'{self.name}' havuzu dolu ({self.capacity} iş)")
+        finally:
+            self.waiting -= 1
+
+        try:
+            submitted_at = time.time()
+            future = self._get_executor().submit(timed_call, func, args, kwargs)
+            self._begin()
+            outcome = None
+            try:
+                outcome = await asyncio.wrap_future(future)
+                return outcome[2]
+            except BaseException as e:
+                self._handle_broken(e)
+                raise
+            finally:
+                self._finish(submitted_at, outcome, failed=outcome is None)
+        finally:
+            slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        # FIFO havuzda ilk `workers` iş çalışır, kalanı kuyruktadır
+        running = min(self.in_flight, self.workers)
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "running": running,
+            "queued": self.in_flight - running,
+            "waiting": self.waiting,
+            "queue_depth": self.in_flight - running + self.waiting,
+            **self.stats,
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+    def shutdown(self, wait: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class ManagedExecutor:
+    """
+    Adlandırılmış havuzlar üzerinden engelleyici işleri çalıştırır
+
+    Kullanım:
+    ```python
+    text = await executor.run("ocr", cpu_tasks.ocr_image, image, "tur", config)
+    docs = await executor.run("vector", vector_service.search_similar_documents, name, query)
+    ```
+    """
+
+    def __init__(self, pools: Optional[Dict[str, Dict[str, Any]]] = None, queue_timeout: Optional[float] = None):
+        self._config = pools if pools is not None else settings.EXECUTOR_POOLS
+        self.queue_timeout = queue_timeout if queue_timeout is not None else settings.EXECUTOR_QUEUE_TIMEOUT
+        self._pools: Dict[str, ManagedPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, name: str) -> ManagedPool:
+        pool = self._pools.get(name)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(name)
+                if pool is None:
+                    config = self._config.get(name)
+                    if config is None:
+                        logger.warning(f"Tanımsız executor havuzu '{name}', varsayılan thread havuzu kullanılıyor")
+                        config = DEFAULT_POOL
+                    pool = ManagedPool(
+                        name,
+                        kind=config.get("kind", "thread"),
+                        workers=config.get("workers", DEFAULT_POOL["workers"]),
+                        max_queue=config.get("max_queue", DEFAULT_POOL["max_queue"]),
+                    )
+                    self._pools[name] = pool
+        return pool
+
+    async def run(self, pool: str, func: Callable, *args, **kwargs) -> Any:
+        """func(*args, **kwargs) çağrısını havuzda çalıştır ve sonucunu bekle"""
+        return await self.pool(pool).run(func, args, kwargs, self.queue_timeout)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.get_stats() for name, pool in self._pools.items()}
+
+    def shutdown(self, wait: bool = False):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+        logger.info("Executor havuzları kapatıldı")
+
+
+# Global executor
+executor = ManagedExecutor()
@@ -526,11 +526,18 @@ class GamificationService:
             .limit(limit)\
             .to_list(limit)
         
-        # Kullanıcı bilgilerini ekle
+        # Kullanıcı bilgilerini toplu al (satır başına sorgu yok)
+        user_ids = [entry["user_id"] for entry in leaderboard]
+        users = {
+            user["_id"]: user
+            async for user in self.db.users.find(
+                {"_id": {"$in": user_ids}},
+                {"username": 1, "avatar_url": 1}
+            )
+        }
         results = []
         for idx, entry in enumerate(leaderboard):
-            # Kullanıcı bilgisi
-            user = await self.db.users.find_one({"_id": entry["user_id"]})
+            user = users.get(entry["user_id"])
             
             results.append({
                 "rank": offset + idx + 1,
@@ -541,7 +548,8 @@ class GamificationService:
                 "points": entry.get(sort_field, 0),
                 "total_points": entry.get("total_points", 0),
                 "achievements": len(entry.get("achievements", [])),
-                "badges": await self._get_user_badges(entry["user_id"])
+                # Yüklü başarılardan hesaplanır; ayrı önbellek canlı sayıyla çelişirdi
+                "badges": self._featured_badges(entry.get("achievements", []))
             })
         
         total = await self.db.gamification_profiles.count_documents(query)
@@ -588,9 +596,10 @@ class GamificationService:
     async def _get_user_badges(self, user_id: str) -> List[str]:
         """Kullanıcının rozetlerini getir (öne çıkan)"""
         profile = await self._get_or_create_profile(user_id)
-        achievements = profile.get("achievements", [])
-        
-        # En nadir 3 rozeti göster
+        return self._featured_badges(profile.get("achievements", [])) if profile else []
+    
+    def _featured_badges(self, achievements: List[str]) -> List[str]:
+        """En nadir 3 rozet"""
         badges = []
         rarity_order = [
             BadgeRarity.LEGENDARY,
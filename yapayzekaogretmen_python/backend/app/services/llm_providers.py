@@ -0,0 +1,338 @@
+"""
+LLM Sağlayıcı Katmanı - Async Bağlantı Havuzu
+---------------------------------------------
+DeepSeek, OpenAI ve Hugging Face için tamamen asenkron sağlayıcı katmanı.
+Her sağlayıcı kendi keep-alive HTTP havuzunu ve eşzamanlılık limitini kullanır.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+from loguru import logger
+
+from app.core.config import settings
+
+
+class ProviderError(Exception):
+    """Sağlayıcı çağrısı başarısız oldu"""
+
+    def __init__(self, provider: str, message: str):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+
+
+@dataclass
+class LLMResponse:
+    """Sağlayıcıdan bağımsız model yanıtı"""
+    content: str
+    model: str
+    provider: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    queue_wait: float = 0.0  # Eşzamanlılık limitinde bekleme (saniye)
+    generation_time: float = 0.0  # Sağlayıcı çağrısı süresi (saniye)
+    extra: Dict = field(default_factory=dict)
+
+
+def build_http_client(**overrides) -> httpx.AsyncClient:
+    """Keep-alive bağlantı havuzlu async HTTP client oluştur"""
+    options = {
+        "limits": httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            settings.LLM_REQUEST_TIMEOUT,
+            connect=settings.LLM_CONNECT_TIMEOUT,
+        ),
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+class LLMProvider:
+    """Sağlayıcı temel sınıfı (eşzamanlılık limiti + havuz yönetimi)"""
+
+    name = "base"
+
+    def __init__(self, max_concurrency: int, http_client: Optional[httpx.AsyncClient] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.http_client = http_client or build_http_client()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Event loop'a bağlanması için ilk kullanımda oluştur
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 800,
+    ) -> LLMResponse:
+        """
+        Eşzamanlılık limiti altında sohbet tamamlama isteği gönder
+
+        Sağlayıcı tarafındaki her hata (yanıt ayrıştırma dahil) ProviderError
+        olarak yükselir; circuit breaker yalnızca bunu başarısızlık sayar.
+        """
+        queued_at = time.perf_counter()
+        async with self.semaphore:
+            started = time.perf_counter()
+            self.in_flight += 1
+            try:
+                response = await self._chat(messages, model, temperature, max_tokens)
+            except ProviderError:
+                raise
+            except Exception as e:
+                raise ProviderError(self.name, f"{type(e).__name__}: {e}") from e
+            finally:
+                self.in_flight -= 1
+        response.queue_wait = started - queued_at
+        response.generation_time = time.perf_counter() - started
+        return response
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 800,
+        timings: Optional[Dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Eşzamanlılık limiti altında yanıtı token parçaları halinde üret.
+        `timings` verilirse kuyruk bekleme süresi ("queue_wait") yazılır.
+        """
+        queued_at = time.perf_counter()
+        async with self.semaphore:
+            if timings is not None:
+                timings["queue_wait"] = time.perf_counter() - queued_at
+            self.in_flight += 1
+            try:
+                async for chunk in self._stream(messages, model, temperature, max_tokens):
+                    yield chunk
+            except ProviderError:
+                raise
+            except Exception as e:
+                raise ProviderError(self.name, f"{type(e).__name__}: {e}") from e
+            finally:
+                self.in_flight -= 1
+
+    async def _chat(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> LLMResponse:
+        raise NotImplementedError
+
+    async def _stream(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> AsyncIterator[str]:
+        # Streaming desteklemeyen sağlayıcılar yanıtı tek parça olarak döner
+        response = await self._chat(messages, model, temperature, max_tokens)
+        if response.content:
+            yield response.content
+
+    def get_stats(self) -> Dict:
+        return {
+            "provider": self.name,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+        }
+
+    async def aclose(self):
+        """Havuzdaki bağlantıları kapat"""
+        await self.http_client.aclose()
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """OpenAI uyumlu API'ler (OpenAI, DeepSeek) için async sağlayıcı"""
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        max_concurrency: int,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        super().__init__(max_concurrency, http_client)
+        self.name = name
+        # Yeniden deneme fallback zinciri tarafından yönetilir
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=0,
+        )
+
+    async def _chat(self, messages, model, temperature, max_tokens) -> LLMResponse:
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=False
+            )
+        except Exception as e:
+            raise ProviderError(self.name, str(e)) from e
+
+        usage = response.usage
+        return LLMResponse(
+            content=response.choices[0].message.content or "",
+            model=response.model or model,
+            provider=self.name,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            total_tokens=getattr(usage, "total_tokens", None),
+        )
+
+    async def _stream(self, messages, model, temperature, max_tokens) -> AsyncIterator[str]:
+        try:
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if delta:
+                    yield delta
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(self.name, str(e)) from e
+
+
+class HuggingFaceProvider(LLMProvider):
+    """Hugging Face Inference API için async sağlayıcı"""
+
+    name = "huggingface"
+
+    # Türkçe eğitim asistanı için özel model kullanalım
+    # Alternatif modeller:
+    # - "dbmdz/bert-base-turkish-cased" (BERT tabanlı)
+    # - "ytu-ce-cosmos/turkish-gpt2-large" (GPT-2 tabanlı)
+    # - "google/gemma-2b" (Çok dilli)
+    model_url = "https://api-inference.huggingface.co/models/google/flan-t5-base"
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int,
+        model_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        super().__init__(max_concurrency, http_client)
+        self.api_key = api_key
+        if model_url:
+            self.model_url = model_url
+
+    @staticmethod
+    def build_prompt(messages: List[Dict]) -> str:
+        """Son kullanıcı mesajından öğretmen prompt'u oluştur"""
+        user_message = ""
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                user_message = message.get("content", "")
+                break
+
+        return f"""Sen yardımsever bir matematik öğretmenisin. Öğrencinin sorusuna Türkçe olarak açık ve anlaşılır bir şekilde cevap ver.
+
+Öğrenci: {user_message}
+Öğretmen:"""
+
+    async def _chat(self, messages, model, temperature, max_tokens) -> LLMResponse:
+        headers = {}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        payload = {
+            "inputs": self.build_prompt(messages),
+            "parameters": {
+                "max_new_tokens": 250,
+                "temperature": 0.8,
+                "top_p": 0.9,
+                "do_sample": True
+            }
+        }
+
+        try:
+            response = await self.http_client.post(self.model_url, headers=headers, json=payload)
+        except httpx.HTTPError as e:
+            raise ProviderError(self.name, str(e)) from e
+
+        if response.status_code != 200:
+            raise ProviderError(self.name, f"{response.status_code} - {response.text}")
+
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise ProviderError(self.name, f"Geçersiz JSON yanıtı: {e}") from e
+        if not isinstance(result, list) or not result or not isinstance(result[0], dict):
+            raise ProviderError(self.name, "Boş yanıt")
+
+        generated_text = result[0].get("generated_text") or ""
+        # Sadece öğretmen yanıtını al
+        if "Öğretmen:" in generated_text:
+            answer = generated_text.split("Öğretmen:")[-1].strip()
+        else:
+            answer = generated_text
+
+        return LLMResponse(content=answer, model=model, provider=self.name)
+
+
+def create_default_providers(
+    openai_api_key: str,
+    deepseek_api_key: str,
+    huggingface_api_key: str = "",
+) -> Dict[str, LLMProvider]:
+    """Ayarlara göre sağlayıcıları oluştur (anahtarı olmayanlar atlanır)"""
+    providers: Dict[str, LLMProvider] = {}
+
+    if deepseek_api_key:
+        providers["deepseek"] = OpenAICompatibleProvider(
+            name="deepseek",
+            api_key=deepseek_api_key,
+            base_url=settings.DEEPSEEK_BASE_URL,
+            max_concurrency=settings.DEEPSEEK_MAX_CONCURRENCY,
+        )
+
+    if openai_api_key:
+        providers["openai"] = OpenAICompatibleProvider(
+            name="openai",
+            api_key=openai_api_key,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+        )
+
+    # HF ücretsiz modeller için anahtar gerektirmez
+    providers["huggingface"] = HuggingFaceProvider(
+        api_key=huggingface_api_key,
+        max_concurrency=settings.HUGGINGFACE_MAX_CONCURRENCY,
+    )
+
+    logger.info(f"LLM sağlayıcıları hazır: {', '.join(providers)}")
+    return providers
@@ -0,0 +1,204 @@
+"""
+Event Loop İzleyici - Gecikme ve Yavaş Callback Tespiti
+-------------------------------------------------------
+İki bileşenden oluşur:
+
+1. Gecikme örnekleyici: loop üzerinde periyodik uyuyan bir görev; uyanma
+   gecikmesi (planlanan - gerçekleşen) histograma yazılır.
+2. Bekçi thread'i: loop'a sürekli call_soon_threadsafe ile "ping" atar.
+   Ping eşik süresi içinde işlenmezse loop bir callback'te takılı demektir;
+   loop thread'inin stack'i örneklenir ve blok bitince en sık görülen stack
+   ile birlikte loglanır.
+
+Sonuçlar /system/health üzerinden raporlanır.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.ai_metrics import Histogram
+
+# Saniye cinsinden
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+MAX_STACK_SAMPLES = 50  # blok başına
+
+
+class LoopMonitor:
+    """asyncio event loop'u için gecikme histogramı ve yavaş callback kaydı"""
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        slow_threshold: float = 0.1,
+        max_events: int = 20,
+        stack_depth: int = 15
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.stack_depth = stack_depth
+
+        self.lag = Histogram(LOOP_LAG_BUCKETS)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_count = 0
+        self.slow_events: deque = deque(maxlen=max_events)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Çalışan loop üzerinde örnekleyiciyi ve bekçi thread'ini başlat"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample_lag())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event loop izleyici başlatıldı (aralık={self.interval}s, "
+            f"yavaş callback eşiği={self.slow_threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    # ------------------------------------------------------------------
+    # Gecikme örnekleme
+    # ------------------------------------------------------------------
+    async def _sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record_lag(loop.time() - started - self.interval)
+
+    def record_lag(self, lag: float):
+        lag = max(0.0, lag)
+        self.lag.observe(lag)
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+    # ------------------------------------------------------------------
+    # Yavaş callback tespiti (bekçi thread'i)
+    # ------------------------------------------------------------------
+    def _watch(self):
+        poll = self.slow_threshold / 2
+        while not self._stop.is_set():
+            ack = threading.Event()
+            sent = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(ack.set)
+            except RuntimeError:
+                return  # loop kapandı
+
+            samples: List[tuple] = []
+            while not ack.wait(poll):
+                if self._stop.is_set():
+                    return
+                if time.monotonic() - sent >= self.slow_threshold and len(samples) < MAX_STACK_SAMPLES:
+                    stack = self._sample_stack()
+                    if stack:
+                        samples.append(stack)
+
+            blocked = time.monotonic() - sent
+            if blocked >= self.slow_threshold:
+                self._record_slow(blocked, samples)
+            self._stop.wait(poll)
+
+    def _sample_stack(self) -> tuple:
+        """Loop thread'inin o anki stack'i (en içteki çerçeveler)"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ()
+        return tuple(
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame, limit=self.stack_depth)
+        )
+
+    def _record_slow(self, duration: float, samples: List[tuple]):
+        # Blok boyunca en sık görülen stack, takılan kodu gösterir
+        stack = list(Counter(samples).most_common(1)[0][0]) if samples else []
+        event = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration * 1000, 1),
+            "stack_samples": len(samples),
+            "stack": stack,
+        }
+        with self._lock:
+            self.slow_count += 1
+            self.slow_events.append(event)
+        logger.warning(
+            f"Event loop {event['duration_ms']:.0f} ms bloklandı"
+            + ("\n" + "\n".join(stack) if stack else " (stack örneklenemedi)")
+        )
+
+    # ------------------------------------------------------------------
+    # Raporlama
+    # ------------------------------------------------------------------
+    def get_stats(self) -> Dict:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+
+        with self._lock:
+            recent = list(self.slow_events)
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "lag": {
+                "last_ms": ms(self.last_lag),
+                "max_ms": ms(self.max_lag),
+                "p50_ms": ms(self.lag.quantile(0.5)),
+                "p99_ms": ms(self.lag.quantile(0.99)),
+                "histogram": self.lag.snapshot(),
+            },
+            "slow_callbacks": {
+                "threshold_ms": ms(self.slow_threshold),
+                "count": self.slow_count,
+                "recent": recent,
+            },
+        }
+
+    def reset(self):
+        with self._lock:
+            self.lag = Histogram(LOOP_LAG_BUCKETS)
+            self.last_lag = self.max_lag = 0.0
+            self.slow_count = 0
+            self.slow_events.clear()
+
+
+# Global izleyici
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL,
+    slow_threshold=settings.LOOP_SLOW_CALLBACK_THRESHOLD,
+    max_events=settings.LOOP_SLOW_CALLBACK_HISTORY,
+)
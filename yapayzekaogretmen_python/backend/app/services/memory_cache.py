@@ -0,0 +1,305 @@
+"""
+Bellek İçi Cache Backend'i
+--------------------------
+Redis erişilemediğinde (tek sunuculu kurulumlar, testler) CacheService'in
+kullandığı redis.asyncio komutlarının bellek içi karşılığı. String, liste
+ve set değerleri, TTL, INCRBY, SCAN/UNLINK, pipeline ve CacheService'in Lua
+script'lerinin Python eşdeğerlerini destekler. Süresi dolan key'ler hem
+erişimde hem de arka plandaki süpürücü tarafından temizlenir.
+
+Tek event loop üzerinde çalıştığı için her komut (ve script) atomiktir.
+"""
+
+import asyncio
+import fnmatch
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+def _key(key: Any) -> str:
+    return key.decode("utf-8") if isinstance(key, bytes) else str(key)
+
+
+def _value(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+class MemoryPipeline:
+    """Komutları biriktirip execute() ile sırayla çalıştırır"""
+
+    def __init__(self, client: "MemoryRedis"):
+        self._client = client
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+class MemoryScript:
+    """register_script karşılığı; kaynak metne eşlenmiş Python handler'ı çağırır"""
+
+    def __init__(self, client: "MemoryRedis", handler: Callable):
+        self._client = client
+        self._handler = handler
+
+    async def __call__(self, keys: List[str] = (), args: List[Any] = ()):
+        return self._handler(self._client, list(keys), list(args))
+
+
+class MemoryRedis:
+    """CacheService'in kullandığı redis.asyncio.Redis alt kümesi"""
+
+    def __init__(self, max_keys: int = 10000, sweep_interval: float = 30.0):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        # key -> değer (bytes | list | set); ekleme sırası tahliye sırasıdır
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._script_handlers: Dict[str, Callable] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats = {"expired": 0, "evicted": 0}
+
+    # ------------------------------------------------------------------
+    # Yaşam döngüsü
+    # ------------------------------------------------------------------
+    def start_sweeper(self):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Süresi dolmuş tüm key'leri sil"""
+        now = time.monotonic()
+        expired = [key for key, expires_at in self._expires.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.stats["expired"] += len(expired)
+        return len(expired)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    # ------------------------------------------------------------------
+    # İç yardımcılar
+    # ------------------------------------------------------------------
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expired"] += 1
+            return False
+        return key in self._data
+
+    def _remove(self, key: str) -> bool:
+        self._expires.pop(key, None)
+        return self._data.pop(key, None) is not None
+
+    def _store(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if ttl is not None:
+            self._expires[key] = time.monotonic() + ttl
+        else:
+            self._expires.pop(key, None)
+        while len(self._data) > self.max_keys:
+            oldest, _ = self._data.popitem(last=False)
+            self._expires.pop(oldest, None)
+            self.stats["evicted"] += 1
+
+    def _typed(self, key: str, kind: type, create: bool = False):
+        if not self._alive(key):
+            if not create:
+                return None
+            self._store(key, kind())
+        value = self._data[key]
+        if not isinstance(value, kind):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    # ------------------------------------------------------------------
+    # String komutları
+    # ------------------------------------------------------------------
+    async def get(self, key) -> Optional[bytes]:
+        key = _key(key)
+        return self._typed(key, bytes)
+
+    async def mget(self, keys) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key, value, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False):
+        key = _key(key)
+        if nx and self._alive(key):
+            return None
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        self._store(key, _value(value), ttl)
+        return True
+
+    async def setex(self, key, ttl: int, value) -> bool:
+        return await self.set(key, value, ex=ttl)
+
+    async def incrby(self, key, amount: int = 1) -> int:
+        key = _key(key)
+        current = self._typed(key, bytes)
+        result = int(current or 0) + amount
+        encoded = str(result).encode("ascii")
+        if current is None:
+            self._store(key, encoded)
+        else:
+            # Redis gibi mevcut TTL korunur
+            self._data[key] = encoded
+        return result
+
+    async def incr(self, key, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    # ------------------------------------------------------------------
+    # Key komutları
+    # ------------------------------------------------------------------
+    async def delete(self, *keys) -> int:
+        return sum(1 for key in keys if self._alive(_key(key)) and self._remove(_key(key)))
+
+    async def unlink(self, *keys) -> int:
+        return await self.delete(*keys)
+
+    async def exists(self, *keys) -> int:
+        return sum(1 for key in keys if self._alive(_key(key)))
+
+    async def expire(self, key, ttl: int) -> bool:
+        key = _key(key)
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.monotonic() + ttl
+        return True
+
+    async def ttl(self, key) -> int:
+        key = _key(key)
+        if not self._alive(key):
+            return -2
+        expires_at = self._expires.get(key)
+        if expires_at is None:
+            return -1
+        return max(0, math.ceil(expires_at - time.monotonic()))
+
+    async def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None):
+        for key in list(self._data):
+            if self._alive(key) and (match is None or fnmatch.fnmatchcase(key, match)):
+                yield key.encode("utf-8")
+
+    # ------------------------------------------------------------------
+    # Liste ve set komutları
+    # ------------------------------------------------------------------
+    async def lpush(self, key, *values) -> int:
+        items = self._typed(_key(key), list, create=True)
+        for value in values:
+            items.insert(0, _value(value))
+        return len(items)
+
+    async def lrange(self, key, start: int, end: int) -> List[bytes]:
+        items = self._typed(_key(key), list) or []
+        end = len(items) if end == -1 else end + 1
+        return items[start:end]
+
+    async def sadd(self, key, *values) -> int:
+        members = self._typed(_key(key), set, create=True)
+        before = len(members)
+        members.update(_value(value) for value in values)
+        return len(members) - before
+
+    async def smembers(self, key) -> set:
+        return set(self._typed(_key(key), set) or ())
+
+    # ------------------------------------------------------------------
+    # Pipeline, script, pub/sub ve bilgi
+    # ------------------------------------------------------------------
+    def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+        return MemoryPipeline(self)
+
+    def register_script_handler(self, source: str, handler: Callable):
+        """Lua kaynağını Python eşdeğerine eşle: handler(client, keys, args)"""
+        self._script_handlers[source] = handler
+
+    def register_script(self, source: str) -> MemoryScript:
+        handler = self._script_handlers.get(source)
+        if handler is None:
+            raise NotImplementedError("Bellek içi backend bu script'i desteklemiyor")
+        return MemoryScript(self, handler)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        # Tek süreç: dinleyen başka worker yok
+        return 0
+
+    async def info(self, section: Optional[str] = None) -> Dict:
+        used = sum(
+            len(value) if isinstance(value, bytes) else sum(len(item) for item in value)
+            for value in self._data.values()
+        )
+        return {
+            "used_memory": used,
+            "used_memory_peak": None,
+            "maxmemory": 0,
+            "maxmemory_policy": f"memory-backend (max_keys={self.max_keys})",
+            "keys": len(self._data),
+            **self.stats,
+        }
+
+
+# ----------------------------------------------------------------------
+# CacheService Lua script'lerinin Python karşılıkları
+# ----------------------------------------------------------------------
+def release_lock_handler(client: MemoryRedis, keys: List[str], args: List[Any]) -> int:
+    key = _key(keys[0])
+    if client._alive(key) and client._data[key] == _value(args[0]):
+        client._remove(key)
+        return 1
+    return 0
+
+
+def gcra_handler(client: MemoryRedis, keys: List[str], args: List[Any]) -> List[int]:
+    """RateLimiter.GCRA_SCRIPT ile aynı hesap (milisaniye)"""
+    key = _key(keys[0])
+    emission, window, requested = float(args[0]), float(args[1]), int(args[2])
+    now = time.time() * 1000
+    stored = client._typed(key, bytes)
+    tat = max(float(stored) if stored else now, now)
+    available = math.floor((window - (tat - now)) / emission)
+    granted = min(requested, available)
+    if granted <= 0:
+        return [0, 0, math.ceil(tat + emission - window - now)]
+    new_tat = tat + emission * granted
+    client._store(key, repr(new_tat).encode("ascii"), (new_tat - now) / 1000)
+    return [granted, available - granted, 0]
+
+
+def create_memory_backend(
+    max_keys: int,
+    sweep_interval: float,
+    scripts: Dict[str, Callable]
+) -> MemoryRedis:
+    client = MemoryRedis(max_keys=max_keys, sweep_interval=sweep_interval)
+    for source, handler in scripts.items():
+        client.register_script_handler(source, handler)
+    client.start_sweeper()
+    logger.info(f"Bellek içi cache backend'i hazır (max_keys={max_keys})")
+    return client
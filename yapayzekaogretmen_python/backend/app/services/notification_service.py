@@ -71,6 +71,8 @@ class NotificationCategory(str, Enum):
 class NotificationService:
     """Çoklu kanal bildirim servisi"""
     
+    PREFERENCES_CACHE_TTL = 300  # saniye
+    
     def __init__(self):
         self.db = get_database()
         
@@ -183,7 +185,8 @@ class NotificationService:
         data: Optional[Dict] = None,
         template_name: Optional[str] = None,
         template_data: Optional[Dict] = None,
-        scheduled_at: Optional[datetime] = None
+        scheduled_at: Optional[datetime] = None,
+        user_preferences: Optional[Dict[str, bool]] = None
     ) -> Dict[str, Any]:
         """
         Bildirim gönder
@@ -199,6 +202,7 @@ class NotificationService:
             template_name: Email template adı
             template_data: Template değişkenleri
             scheduled_at: Zamanlanmış gönderim
+            user_preferences: Önceden yüklenmiş tercihler (toplu gönderim)
         
         Returns:
             Gönderim sonucu
@@ -210,7 +214,8 @@ class NotificationService:
             notification_types = notification_type
         
         # Kullanıcı tercihlerini kontrol et
-        user_preferences = await self._get_user_preferences(user_id)
+        if user_preferences is None:
+            user_preferences = await self._get_user_preferences(user_id)
         allowed_types = [
             nt for nt in notification_types
             if user_preferences.get(nt, True)
@@ -521,6 +526,9 @@ class NotificationService:
             "details": []
         }
         
+        # Tercihler tek seferde (MGET + tek sorgu) alınır
+        preferences = await self._get_preferences_many(user_ids)
+        
         # Paralel gönderim
         tasks = []
         for user_id in user_ids:
@@ -529,6 +537,7 @@ class NotificationService:
                 title=title,
                 message=message,
                 notification_type=notification_type,
+                user_preferences=preferences.get(user_id, {}),
                 **kwargs
             )
             tasks.append(task)
@@ -626,20 +635,50 @@ class NotificationService:
             },
             upsert=True
         )
+        await cache.delete(f"notification_prefs:{user_id}", namespace="user")
         
         return True
     
     # Helper methods
     async def _get_user_preferences(self, user_id: str) -> Dict[str, bool]:
         """Kullanıcı bildirim tercihlerini al"""
+        preferences = await self._get_preferences_many([user_id])
+        return preferences.get(user_id, {})
+    
+    async def _get_preferences_many(self, user_ids: List[str]) -> Dict[str, Dict[str, bool]]:
+        """Birden fazla kullanıcının tercihleri: önbellek MGET, eksikler tek sorgu"""
         if not self.db:
             return {}
         
-        prefs = await self.db.user_preferences.find_one({"user_id": user_id})
-        if prefs:
-            return prefs.get("notifications", {})
+        keys = {user_id: f"notification_prefs:{user_id}" for user_id in user_ids}
+        cached = await cache.get_many(list(keys.values()), namespace="user")
+        result = {
+            user_id: cached[key]
+            for user_id, key in keys.items()
+            if key in cached
+        }
         
-        # Default preferences
+        missing = [user_id for user_id in keys if user_id not in result]
+        if missing:
+            stored = {
+                prefs["user_id"]: prefs.get("notifications", {})
+                async for prefs in self.db.user_preferences.find(
+                    {"user_id": {"$in": missing}},
+                    {"user_id": 1, "notifications": 1}
+                )
+            }
+            for user_id in missing:
+                result[user_id] = stored[user_id] if user_id in stored else self._default_preferences()
+            await cache.set_many(
+                {keys[user_id]: result[user_id] for user_id in missing},
+                ttl=self.PREFERENCES_CACHE_TTL,
+                namespace="user"
+            )
+        
+        return result
+    
+    @staticmethod
+    def _default_preferences() -> Dict[str, bool]:
         return {
             NotificationType.PUSH: True,
             NotificationType.EMAIL: True,
@@ -11,13 +11,6 @@ from pathlib import Path
 import hashlib
 import json
 
-# PDF işleme
-import PyPDF2
-import pdfplumber
-from pdf2image import convert_from_path, convert_from_bytes
-import pytesseract
-from PIL import Image
-
 # Metin işleme
 import re
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -25,6 +18,8 @@ from langchain.schema import Document
 
 from app.core.logger import logger
 from app.core.config import settings
+from app.workers import cpu_tasks
+from app.services.executor_service import executor
 
 
 class PDFService:
@@ -47,54 +42,20 @@ class PDFService:
         
         logger.info("PDF Service başlatıldı")
     
-    def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Any]:
-        """PDF dosyasından metin çıkar"""
+    async def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Any]:
+        """
+        PDF dosyasından metin çıkar
+
+        Ayrıştırma CPU'ya bağlı olduğu için 'pdf' süreç havuzunda çalışır;
+        havuz doluysa EXECUTOR_QUEUE_TIMEOUT kadar sırada beklenir.
+        """
         try:
-            text_content = ""
-            metadata = {
-                "file_path": pdf_path,
-                "page_count": 0,
-                "extraction_method": []
-            }
-            
-            # Önce PyPDF2 ile dene
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    metadata["page_count"] = len(pdf_reader.pages)
-                    
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        page_text = page.extract_text()
-                        if page_text.strip():
-                            text_content += f"\n--- Sayfa {page_num + 1} ---\n{page_text}"
-                            metadata["extraction_method"].append("PyPDF2")
-            except Exception as e:
-                logger.warning(f"PyPDF2 ile metin çıkarılamadı: {e}")
-            
-            # Eğer metin bulunamadıysa pdfplumber dene
-            if not text_content.strip():
-                try:
-                    with pdfplumber.open(pdf_path) as pdf:
-                        for page_num, page in enumerate(pdf.pages):
-                            page_text = page.extract_text()
-                            if page_text:
-                                text_content += f"\n--- Sayfa {page_num + 1} ---\n{page_text}"
-                                metadata["extraction_method"].append("pdfplumber")
-                except Exception as e:
-                    logger.warning(f"pdfplumber ile metin çıkarılamadı: {e}")
-            
-            # Hala metin yoksa OCR kullan
-            if not text_content.strip():
-                logger.info("PDF'den metin çıkarılamadı, OCR deneniyor...")
-                text_content = self._extract_text_with_ocr(pdf_path)
-                metadata["extraction_method"].append("OCR")
-            
-            # Metni temizle
-            text_content = self._clean_text(text_content)
+            result = await executor.run("pdf", cpu_tasks.extract_pdf_text, pdf_path)
+            text_content = result["text"]
             
             return {
                 "text": text_content,
-                "metadata": metadata,
+                "metadata": result["metadata"],
                 "success": bool(text_content.strip())
             }
             
@@ -106,37 +67,6 @@ class PDFService:
                 "success": False
             }
     
-    def _extract_text_with_ocr(self, pdf_path: str) -> str:
-        """OCR kullanarak PDF'den metin çıkar"""
-        try:
-            # PDF'i resimlere dönüştür
-            images = convert_from_path(pdf_path)
-            text_content = ""
-            
-            for i, image in enumerate(images):
-                # OCR uygula (Türkçe desteği ile)
-                text = pytesseract.image_to_string(image, lang='tur')
-                text_content += f"\n--- Sayfa {i + 1} ---\n{text}"
-            
-            return text_content
-            
-        except Exception as e:
-            logger.error(f"OCR hatası: {e}")
-            return ""
-    
-    def _clean_text(self, text: str) -> str:
-        """Metni temizle ve düzenle"""
-        # Fazla boşlukları temizle
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Sayfa numaralarını koru ama düzenle
-        text = re.sub(r'--- Sayfa (\d+) ---', r'\n\n[SAYFA \1]\n', text)
-        
-        # Başlıkları algıla ve işaretle
-        text = re.sub(r'\n([A-ZĞÜŞİÖÇ][A-ZĞÜŞİÖÇ\s]+)\n', r'\n\n## \1\n\n', text)
-        
-        return text.strip()
-    
     def split_text_into_chunks(self, text: str, metadata: Dict = None) -> List[Document]:
         """Metni anlamlı parçalara böl"""
         # Önce sayfalara göre böl
@@ -164,11 +94,11 @@ class PDFService:
         
         return documents
     
-    def process_curriculum_pdf(self, pdf_path: str, grade: int, subject: str) -> Dict[str, Any]:
+    async def process_curriculum_pdf(self, pdf_path: str, grade: int, subject: str) -> Dict[str, Any]:
         """Müfredat PDF'ini işle ve yapılandır"""
         try:
             # Metin çıkar
-            extraction_result = self.extract_text_from_pdf(pdf_path)
+            extraction_result = await self.extract_text_from_pdf(pdf_path)
             
             if not extraction_result["success"]:
                 return {
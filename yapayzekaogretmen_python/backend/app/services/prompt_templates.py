@@ -0,0 +1,49 @@
+"""
+Prompt Şablon Kaydı - Derlenmiş Sistem Prompt'ları
+--------------------------------------------------
+(sınıf, ders, kişilik) gibi anahtarlar için sistem prompt'larını bir kez
+derler ve yeniden kullanır. Öğrenciye özel bilgiler derlenmiş kısmın
+sonuna eklenir; böylece prompt öneki bayt bayt aynı kalır ve sağlayıcı
+tarafındaki prompt önbelleği (prefix caching) isabet eder.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from loguru import logger
+
+
+class PromptTemplateRegistry:
+    """Anahtar başına bir kez derlenen prompt şablonları (LRU sınırlı)"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._compiled: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.stats = {"hits": 0, "compiled": 0, "evictions": 0}
+
+    def get_or_compile(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """Derlenmiş şablonu döndür, yoksa `builder` ile derleyip sakla"""
+        if key in self._compiled:
+            self.stats["hits"] += 1
+            self._compiled.move_to_end(key)
+            return self._compiled[key]
+
+        template = builder()
+        self._compiled[key] = template
+        self.stats["compiled"] += 1
+        logger.debug(f"Prompt şablonu derlendi: {key}")
+
+        while len(self._compiled) > self.max_entries:
+            self._compiled.popitem(last=False)
+            self.stats["evictions"] += 1
+        return template
+
+    def clear(self):
+        self._compiled.clear()
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "entries": len(self._compiled)}
+
+
+# Global instance
+prompt_templates = PromptTemplateRegistry()
@@ -0,0 +1,267 @@
+"""
+Sağlayıcı Sağlık Takibi - Circuit Breaker ve Gecikme İzleme
+-----------------------------------------------------------
+Her LLM sağlayıcısı için circuit breaker (half-open yoklama ile) ve her
+model için kayan pencere p50/p95 gecikme takibi. Fallback zinciri bu
+bilgilerle kapalı veya yavaş sağlayıcıları atlar.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+class CircuitBreaker:
+    """Sağlayıcı başına closed → open → half_open durum makinesi"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejected_calls = 0
+
+    def allow_request(self) -> bool:
+        """İstek gönderilebilir mi? Açık devrede süre dolunca tek yoklama isteğine izin ver"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                logger.info(f"Circuit half-open: {self.name} yoklanıyor")
+            else:
+                self.rejected_calls += 1
+                return False
+
+        # Half-open: aynı anda yalnızca bir yoklama isteği
+        if self.probe_in_flight:
+            self.rejected_calls += 1
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self):
+        self.total_successes += 1
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit closed: {self.name} yeniden sağlıklı")
+        self.state = self.CLOSED
+        self.opened_at = None
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"Circuit open: {self.name} ({self.consecutive_failures} ardışık hata), "
+                    f"{self.recovery_timeout}s atlanacak"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Sonuçlanmadan bırakılan (iptal edilen) yoklama iznini geri ver"""
+        self.probe_in_flight = False
+
+    def snapshot(self) -> Dict:
+        retry_in = None
+        if self.state == self.OPEN and self.opened_at is not None:
+            retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "total_successes": self.total_successes,
+            "rejected_calls": self.rejected_calls,
+            "retry_in_seconds": round(retry_in, 2) if retry_in is not None else None,
+        }
+
+
+class LatencyTracker:
+    """Son N örnek üzerinden kayan pencere yüzdelik gecikme"""
+
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def snapshot(self) -> Dict:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "samples": len(self.samples),
+            "p50": round(p50, 4) if p50 is not None else None,
+            "p95": round(p95, 4) if p95 is not None else None,
+        }
+
+
+class ProviderHealthRegistry:
+    """Sağlayıcı circuit breaker'ları ve model gecikme takipçileri"""
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = settings.AI_CIRCUIT_RECOVERY_TIMEOUT,
+        latency_window: int = settings.AI_LATENCY_WINDOW,
+        slow_p95_threshold: float = settings.AI_SLOW_P95_THRESHOLD,
+        min_samples: int = settings.AI_LATENCY_MIN_SAMPLES,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.latency_window = latency_window
+        self.slow_p95_threshold = slow_p95_threshold
+        self.min_samples = min_samples
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        # Streaming çağrılarda ilk token süresi
+        self.ttfts: Dict[str, LatencyTracker] = {}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(
+                provider, self.failure_threshold, self.recovery_timeout
+            )
+        return self.breakers[provider]
+
+    def latency(self, model: str) -> LatencyTracker:
+        if model not in self.latencies:
+            self.latencies[model] = LatencyTracker(self.latency_window)
+        return self.latencies[model]
+
+    def ttft(self, model: str) -> LatencyTracker:
+        if model not in self.ttfts:
+            self.ttfts[model] = LatencyTracker(self.latency_window)
+        return self.ttfts[model]
+
+    def percentile(self, model: str, p: float, first_token: bool = False) -> Optional[float]:
+        """Yeterli örnek varsa modelin gecikme yüzdeliği"""
+        tracker = (self.ttfts if first_token else self.latencies).get(model)
+        if not tracker or len(tracker.samples) < self.min_samples:
+            return None
+        return tracker.percentile(p)
+
+    def is_open(self, provider: str) -> bool:
+        """Devre açık ve yoklama zamanı gelmemiş mi (durumu değiştirmeden)"""
+        breaker = self.breaker(provider)
+        if breaker.state == CircuitBreaker.OPEN:
+            return time.monotonic() - breaker.opened_at < breaker.recovery_timeout
+        return breaker.state == CircuitBreaker.HALF_OPEN and breaker.probe_in_flight
+
+    def is_slow(self, model: str) -> bool:
+        """Yeterli örnek varsa p95 eşiği aşıyor mu"""
+        tracker = self.latencies.get(model)
+        if not tracker or len(tracker.samples) < self.min_samples:
+            return False
+        return tracker.percentile(95) > self.slow_p95_threshold
+
+    def record_success(self, provider: str, model: str, latency: float):
+        self.breaker(provider).record_success()
+        self.latency(model).record(latency)
+
+    def record_first_token(self, model: str, latency: float):
+        self.ttft(model).record(latency)
+
+    def record_failure(self, provider: str):
+        self.breaker(provider).record_failure()
+
+    def snapshot(self) -> Dict:
+        return {
+            "circuit_breakers": {
+                name: breaker.snapshot() for name, breaker in self.breakers.items()
+            },
+            "latency": {
+                model: {**tracker.snapshot(), "slow": self.is_slow(model)}
+                for model, tracker in self.latencies.items()
+            },
+            "time_to_first_token": {
+                model: tracker.snapshot() for model, tracker in self.ttfts.items()
+            },
+            "slow_p95_threshold": self.slow_p95_threshold,
+        }
+
+
+class HedgingPolicy:
+    """
+    Hedged istek politikası: birincil model son gecikmelerinin belirli bir
+    yüzdeliğinde yanıt vermezse sıradaki sağlayıcıya ikinci istek gönderilir.
+    Ek harcama, birincil isteklerin belirli bir oranıyla sınırlıdır.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.AI_HEDGING_ENABLED,
+        percentile: float = settings.AI_HEDGE_PERCENTILE,
+        min_delay: float = settings.AI_HEDGE_MIN_DELAY,
+        budget_ratio: float = settings.AI_HEDGE_BUDGET_RATIO,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget_ratio = budget_ratio
+        self.stats = {
+            "primary_requests": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "skipped_budget": 0,
+        }
+
+    def hedge_delay(self, registry: ProviderHealthRegistry, model: str, first_token: bool) -> Optional[float]:
+        """Hedge gönderilmeden önce beklenecek süre (yeterli veri yoksa None)"""
+        if not self.enabled:
+            return None
+        value = registry.percentile(model, self.percentile, first_token=first_token)
+        if value is None:
+            return None
+        return max(self.min_delay, value)
+
+    def record_primary(self):
+        self.stats["primary_requests"] += 1
+
+    def has_budget(self) -> bool:
+        """Ek istek bütçesi yeni bir hedge'e yetiyor mu"""
+        allowed = self.budget_ratio * self.stats["primary_requests"]
+        if self.stats["hedges_fired"] + 1 > allowed:
+            self.stats["skipped_budget"] += 1
+            return False
+        return True
+
+    def record_fired(self):
+        self.stats["hedges_fired"] += 1
+
+    def record_win(self):
+        self.stats["hedges_won"] += 1
+
+    def snapshot(self) -> Dict:
+        fired = self.stats["hedges_fired"]
+        return {
+            **self.stats,
+            "win_rate": round(self.stats["hedges_won"] / fired, 4) if fired else 0.0,
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "budget_ratio": self.budget_ratio,
+        }
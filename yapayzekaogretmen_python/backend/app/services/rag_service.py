@@ -5,6 +5,8 @@ PDF tabanlı içeriklerden yapay zeka destekli ders anlatımı
 """
 
 from typing import List, Dict, Optional, Any
+import asyncio
+import hashlib
 import json
 from datetime import datetime
 
@@ -20,7 +22,11 @@ from langchain.chat_models import ChatOpenAI
 # Servisler
 from app.services.vector_db_service import VectorDBService
 from app.services.pdf_service import PDFService
-from app.services.ai_service import AIService
+from app.services.ai_service import ai_service
+from app.services.prompt_templates import prompt_templates
+from app.services import token_counter
+from app.services.executor_service import executor
+from app.services.retrieval_fusion import reciprocal_rank_fusion, truncate_to_token_budget
 
 from app.core.logger import logger
 from app.core.config import settings
@@ -32,7 +38,7 @@ class RAGService:
     def __init__(self):
         self.vector_service = VectorDBService()
         self.pdf_service = PDFService()
-        self.ai_service = AIService()
+        self.ai_service = ai_service
         
         # Konuşma geçmişi
         self.conversations = {}
@@ -43,10 +49,17 @@ class RAGService:
         logger.info("RAG Service başlatıldı")
     
     def _setup_prompts(self):
-        """Prompt şablonlarını ayarla"""
+        """Prompt şablonlarını ayarla (süreç başına bir kez derlenir)"""
+        self.lesson_prompt, self.qa_prompt, self.summary_prompt = prompt_templates.get_or_compile(
+            ("rag", "prompts"), self._compile_prompts
+        )
+    
+    @staticmethod
+    def _compile_prompts():
+        """Ders anlatımı, soru-cevap ve özet şablonlarını oluştur"""
         
         # Ders anlatım promptu
-        self.lesson_prompt = PromptTemplate(
+        lesson_prompt = PromptTemplate(
             template="""Sen MEB müfredatına uygun ders anlatan yapay zeka öğretmenisin.
             
 Aşağıdaki bağlam bilgilerini kullanarak, {grade}. sınıf {subject} dersinde {topic} konusunu anlat.
@@ -70,7 +83,7 @@ Yanıt:""",
         )
         
         # Soru-cevap promptu
-        self.qa_prompt = PromptTemplate(
+        qa_prompt = PromptTemplate(
             template="""Aşağıdaki bağlam bilgilerini kullanarak soruyu cevapla.
             
 Bağlam:
@@ -85,7 +98,7 @@ Cevap:""",
         )
         
         # Konu özeti promptu
-        self.summary_prompt = PromptTemplate(
+        summary_prompt = PromptTemplate(
             template="""Aşağıdaki ders içeriğinin {grade}. sınıf seviyesine uygun bir özetini hazırla:
             
 {content}
@@ -100,8 +113,10 @@ Cevap:""",
 Özet:""",
             input_variables=["grade", "content"]
         )
+        
+        return lesson_prompt, qa_prompt, summary_prompt
     
-    def process_curriculum_pdf(
+    async def process_curriculum_pdf(
         self, 
         pdf_path: str, 
         grade: int, 
@@ -111,19 +126,25 @@ Cevap:""",
         """Müfredat PDF'ini işle ve vektör veritabanına ekle"""
         try:
             # PDF'i işle
-            result = self.pdf_service.process_curriculum_pdf(pdf_path, grade, subject)
+            result = await self.pdf_service.process_curriculum_pdf(pdf_path, grade, subject)
             
             if not result["success"]:
                 return result
             
-            # Koleksiyon adı oluştur
+            # Koleksiyon adı oluştur (kaynak dosyaya göre kararlı: güncellenen PDF
+            # aynı koleksiyona artımlı olarak işlenir)
             if not collection_name:
-                collection_name = f"grade_{grade}_{subject}_{result['content_hash'][:8]}"
+                source_key = hashlib.sha1(result["metadata"]["source"].encode("utf-8")).hexdigest()[:8]
+                collection_name = f"grade_{grade}_{subject}_{source_key}"
             
-            # Vektör veritabanına ekle
-            success = self.vector_service.create_or_update_collection(
+            # Vektör veritabanına ekle (embedding ve yazma 'io' havuzunda)
+            success = await executor.run(
+                "io",
+                self.vector_service.create_or_update_collection,
                 collection_name=collection_name,
-                documents=result["documents"]
+                documents=result["documents"],
+                grade=grade,
+                subject=subject
             )
             
             if success:
@@ -161,12 +182,10 @@ Cevap:""",
         try:
             # Koleksiyon adını belirle
             if not collection_name:
-                collections = self.vector_service.list_collections()
-                # İlgili koleksiyonu bul
-                for col in collections:
-                    if f"grade_{grade}_{subject}" in col:
-                        collection_name = col
-                        break
+                # İlgili koleksiyonu kayıttan bul
+                collections = self.vector_service.find_collections(grade, subject)
+                if collections:
+                    collection_name = collections[0]
             
             if not collection_name:
                 return {
@@ -289,7 +308,7 @@ Cevap:""",
             # Fallback to DeepSeek
             return self._teach_with_deepseek(grade, subject, topic, context, question)
     
-    def answer_question(
+    async def answer_question(
         self,
         student_id: str,
         question: str,
@@ -307,25 +326,14 @@ Cevap:""",
             # İlgili koleksiyonları bul
             collections = []
             if grade and subject:
-                pattern = f"grade_{grade}_{subject}"
-                collections = [
-                    col for col in self.vector_service.list_collections() 
-                    if pattern in col
-                ]
+                collections = await self.vector_service.afind_collections(grade, subject)
             
             if not collections:
                 # Tüm koleksiyonlarda ara
-                collections = self.vector_service.list_collections()
+                collections = await self.vector_service.alist_collections()
             
-            # Tüm koleksiyonlardan ilgili dokümanları topla
-            all_docs = []
-            for collection in collections[:3]:  # En fazla 3 koleksiyon
-                docs = self.vector_service.search_similar_documents(
-                    collection_name=collection,
-                    query=question,
-                    k=3
-                )
-                all_docs.extend(docs)
+            # Koleksiyonlarda paralel ara, sıralamaları birleştir
+            all_docs = await self.retrieve(question, collections)
             
             # Bağlam oluştur
             context = "\n\n".join([doc.page_content for doc in all_docs])
@@ -336,7 +344,9 @@ Cevap:""",
             else:
                 full_question = question
             
-            response = self.ai_service.generate_response(
+            response = await executor.run(
+                "io",
+                self.ai_service.generate_response,
                 prompt=self.qa_prompt.format(
                     context=context,
                     question=full_question
@@ -360,6 +370,47 @@ Cevap:""",
                 "error": str(e)
             }
     
+    async def retrieve(
+        self,
+        query: str,
+        collections: List[str],
+        k: int = None,
+        max_tokens: int = None
+    ) -> List[Document]:
+        """
+        Koleksiyonlarda eşzamanlı benzerlik araması ('vector' havuzunda)
+
+        Sonuçlar Reciprocal Rank Fusion ile sıralanır, aynı içerik tekilleştirilir
+        ve bağlam token bütçesine göre kırpılır. Gecikme koleksiyon sayısıyla
+        değil en yavaş aramayla belirlenir.
+        """
+        collections = collections[:settings.RAG_MAX_COLLECTIONS]
+        results = await asyncio.gather(
+            *(
+                self.vector_service.asearch_similar_documents(
+                    collection_name=collection,
+                    query=query,
+                    k=k or settings.RAG_PER_COLLECTION_K
+                )
+                for collection in collections
+            ),
+            return_exceptions=True
+        )
+        
+        ranked_lists = []
+        for collection, result in zip(collections, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Koleksiyon araması başarısız ({collection}): {result}")
+                continue
+            ranked_lists.append(result)
+        
+        fused = [doc for doc, _ in reciprocal_rank_fusion(ranked_lists, k=settings.RAG_RRF_K)]
+        return truncate_to_token_budget(
+            fused,
+            max_tokens or settings.RAG_CONTEXT_MAX_TOKENS,
+            token_counter.count_tokens
+        )
+    
     def generate_topic_summary(
         self,
         grade: int,
@@ -371,11 +422,9 @@ Cevap:""",
         try:
             # İlgili dokümanları bul
             if not collection_name:
-                collections = self.vector_service.list_collections()
-                for col in collections:
-                    if f"grade_{grade}_{subject}" in col:
-                        collection_name = col
-                        break
+                collections = self.vector_service.find_collections(grade, subject)
+                if collections:
+                    collection_name = collections[0]
             
             if not collection_name:
                 return {
@@ -0,0 +1,55 @@
+"""
+Çoklu Koleksiyon Sonuç Birleştirme
+----------------------------------
+Farklı koleksiyonlardan (Chroma L2 mesafesi, FAISS vb.) gelen sıralı
+arama sonuçlarını Reciprocal Rank Fusion ile tek listede birleştirir.
+RRF yalnızca sıralara baktığı için koleksiyonlar arasındaki skor ölçeği
+farklarından etkilenmez. Aynı içerik birden fazla koleksiyonda çıkarsa tek
+sonuca indirilir ve skorları toplanır; liste bir token bütçesine göre
+kırpılır.
+"""
+
+import hashlib
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from langchain.schema import Document
+
+RRF_K = 60  # Cormack vd. (2009) önerisi
+
+
+def _content_key(document: Document) -> str:
+    return hashlib.sha1(" ".join(document.page_content.split()).encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[Sequence[Document]],
+    k: int = RRF_K
+) -> List[Tuple[Document, float]]:
+    """Her liste kendi içinde en iyiden kötüye sıralı; (doküman, RRF skoru) döner"""
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, document in enumerate(results, start=1):
+            key = _content_key(document)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, document)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(documents[key], round(score, 6)) for key, score in ranked]
+
+
+def truncate_to_token_budget(
+    documents: Sequence[Document],
+    max_tokens: int,
+    count_tokens: Callable[[str], int]
+) -> List[Document]:
+    """Sıralı dokümanları bütçe dolana kadar al (sığmayan atlanır, küçükler denenmeye devam eder)"""
+    selected: List[Document] = []
+    used = 0
+    for document in documents:
+        tokens = count_tokens(document.page_content)
+        if used + tokens > max_tokens:
+            continue
+        selected.append(document)
+        used += tokens
+    return selected
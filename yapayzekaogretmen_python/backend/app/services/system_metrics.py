@@ -0,0 +1,123 @@
+"""
+Sistem Metrikleri Örnekleyici
+-----------------------------
+CPU, bellek, disk ve ağ kullanımını arka planda her N saniyede bir toplar
+ve sabit boyutlu bir halka tamponda tutar. Handler'lar psutil'i istek
+başına çağırmak yerine son örneği anında okur; dashboard grafikleri için
+kısa bir zaman serisi de sunulur.
+
+psutil çağrıları 'io' executor havuzunda çalışır (disk_usage ağ dosya
+sistemlerinde bloklayabilir). CPU yüzdesi interval=None ile iki örnek
+arasındaki ortalamadır, bu yüzden hiçbir çağrı beklemez.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.executor_service import executor
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil requirements.txt'de
+    psutil = None
+
+MB = 1024 * 1024
+
+
+class SystemMetricsSampler:
+    """Host metriklerini periyodik toplayan halka tampon"""
+
+    def __init__(self, interval: float = 5.0, history: int = 120, disk_path: str = "/"):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.started_at = time.time()
+        self._samples: deque = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._process = psutil.Process(os.getpid()) if psutil else None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def uptime_hours(self) -> float:
+        return round((time.time() - self.started_at) / 3600, 2)
+
+    def start(self):
+        if psutil is None:
+            logger.warning("psutil yüklü değil, sistem metrikleri toplanmayacak")
+            return
+        if not self.running:
+            # İlk cpu_percent(None) çağrısı referans noktasıdır, 0.0 döner
+            psutil.cpu_percent(interval=None)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Sistem metrikleri örnekleyici başlatıldı (aralık={self.interval}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def sample(self) -> Dict[str, Any]:
+        """Tek örnek (senkron; executor içinde çalışır)"""
+        if psutil is None:
+            return {}
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        network = psutil.net_io_counters()
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "memory_used_mb": round(memory.used / MB, 1),
+            "disk_percent": disk.percent,
+            "network_sent_mb": round(network.bytes_sent / MB, 2),
+            "network_recv_mb": round(network.bytes_recv / MB, 2),
+            "process_rss_mb": round(self._process.memory_info().rss / MB, 1),
+        }
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Yeni örnek al ve tampona ekle"""
+        try:
+            snapshot = await executor.run("io", self.sample)
+        except Exception as e:
+            logger.error(f"Sistem metrikleri alınamadı: {e}")
+            return self.latest() or {}
+        if snapshot:
+            self._samples.append(snapshot)
+        return snapshot
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self._samples[-1] if self._samples else None
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Son örnek; örnekleyici henüz çalışmadıysa bir kez örnekler"""
+        return self.latest() or await self.refresh()
+
+    def series(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        samples = list(self._samples)
+        return samples[-limit:] if limit else samples
+
+
+# Global örnekleyici
+system_metrics = SystemMetricsSampler(
+    interval=settings.SYSTEM_METRICS_INTERVAL,
+    history=settings.SYSTEM_METRICS_HISTORY,
+    disk_path=settings.SYSTEM_METRICS_DISK_PATH,
+)
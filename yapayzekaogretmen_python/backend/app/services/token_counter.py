@@ -0,0 +1,85 @@
+"""
+Token Sayacı - Önbellekli Tokenizer
+-----------------------------------
+Model başına tiktoken encoding'ini bir kez yükler ve metin başına token
+sayısını önbellekte tutar; bağlam kırpma aynı sistem prompt'unu ve geçmiş
+mesajlarını her istekte yeniden tokenize etmez.
+"""
+
+from functools import lru_cache
+from typing import Dict, List
+
+from loguru import logger
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    logger.warning("tiktoken bulunamadı, token sayıları yaklaşık hesaplanacak")
+
+# OpenAI sohbet formatında mesaj başına ek token
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=32)
+def _encoding_name(model: str) -> str:
+    """
+    Model için encoding adı (DeepSeek gibi bilinmeyen modeller cl100k_base)
+
+    BPE dosyası yüklenemezse (ağ yok, sandbox) yaklaşık sayaca düşülür;
+    token sayımı hiçbir zaman istek akışını bozmamalı.
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return "approx"
+    try:
+        name = tiktoken.encoding_for_model(model).name
+    except KeyError:
+        name = "cl100k_base"
+    except Exception as e:
+        logger.warning(f"'{model}' için tiktoken yüklenemedi, token sayıları yaklaşık hesaplanacak: {e}")
+        return "approx"
+    return name if _get_encoding(name) is not None else "approx"
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(name: str):
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # lru_cache sayesinde encoding başına bir kez loglanır
+        logger.warning(f"tiktoken encoding '{name}' yüklenemedi, token sayıları yaklaşık hesaplanacak: {e}")
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _count(text: str, encoding_name: str) -> int:
+    if encoding_name == "approx":
+        # Türkçe metinde ortalama ~3 karakter/token
+        return max(1, len(text) // 3) if text else 0
+    return len(_get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Metnin token sayısı (önbellekli)"""
+    return _count(text or "", _encoding_name(model or "gpt-3.5-turbo"))
+
+
+def count_message_tokens(messages: List[Dict], model: str = "gpt-3.5-turbo") -> int:
+    """Sohbet mesajlarının toplam token sayısı"""
+    return sum(
+        count_tokens(message.get("content", ""), model) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def get_stats() -> Dict:
+    info = _count.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "tokenizer": "tiktoken" if TIKTOKEN_AVAILABLE else "approx",
+        "cached_texts": info.currsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
@@ -8,6 +8,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from enum import Enum
 import asyncio
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -359,7 +360,7 @@ Sadece çeviriyi döndür, açıklama yapma.
         
         # Cache kontrolü
         if use_cache:
-            cache_key = f"translation:{source_lang}:{target_lang}:{hash(text)}"
+            cache_key = self._translation_cache_key(text, source_lang, target_lang)
             cached = await cache.get(cache_key, namespace="translations")
             if cached:
                 return cached
@@ -396,16 +397,42 @@ Sadece çeviriyi döndür, açıklama yapma.
         source_lang: Optional[str] = None,
         context: Optional[str] = None
     ) -> List[str]:
-        """Toplu çeviri"""
-        translations = []
-        
-        # Paralel çeviri
-        tasks = [
-            self.translate(text, target_lang, source_lang, context)
-            for text in texts
+        """Toplu çeviri: önbellek tek MGET/pipeline, yalnızca eksikler çevrilir"""
+        sources = [source_lang or await self.detect_language(text) for text in texts]
+        keys = [
+            self._translation_cache_key(text, source, target_lang)
+            for text, source in zip(texts, sources)
         ]
         
-        translations = await asyncio.gather(*tasks)
+        cached = await cache.get_many(
+            [key for key, source in zip(keys, sources) if source != target_lang],
+            namespace="translations"
+        )
+        
+        # Eksikleri (tekrarsız) paralel çevir
+        pending = {}
+        for text, source, key in zip(texts, sources, keys):
+            if source != target_lang and not cached.get(key) and key not in pending:
+                pending[key] = (text, source)
+        
+        translated = await asyncio.gather(*(
+            self.translate(text, target_lang, source, context, use_cache=False)
+            for text, source in pending.values()
+        ))
+        fresh = {
+            key: value
+            for key, value in zip(pending, translated)
+            if value
+        }
+        if fresh:
+            await cache.set_many(fresh, ttl=86400, namespace="translations")
+        
+        translations = []
+        for text, source, key in zip(texts, sources, keys):
+            if source == target_lang:
+                translations.append(text)
+            else:
+                translations.append(cached.get(key) or fresh.get(key) or text)
         
         return translations
     
@@ -499,40 +526,59 @@ Sadece çeviriyi döndür, açıklama yapma.
         namespace: Optional[str] = None
     ) -> Dict[str, str]:
         """Çoklu çeviri anahtarlarını getir"""
-        translations = {}
+        full_keys = {
+            key: f"{namespace}.{key}" if namespace else key
+            for key in keys
+        }
+        cache_keys = {
+            key: f"trans_key:{language}:{full_key}"
+            for key, full_key in full_keys.items()
+        }
         
-        for key in keys:
-            # Namespace'li anahtar
-            full_key = f"{namespace}.{key}" if namespace else key
-            
-            # Önce cache'e bak
-            cache_key = f"trans_key:{language}:{full_key}"
-            cached = await cache.get(cache_key, namespace="translations")
-            
-            if cached:
-                translations[key] = cached
+        # Önce cache'e bak (tek MGET)
+        cached = await cache.get_many(list(cache_keys.values()), namespace="translations")
+        translations = {
+            key: cached[cache_key]
+            for key, cache_key in cache_keys.items()
+            if cached.get(cache_key)
+        }
+        
+        missing = [key for key in keys if key not in translations]
+        if not missing:
+            return translations
+        
+        # Veritabanından toplu al
+        found = await self._get_translations_by_keys(
+            [full_keys[key] for key in missing], language
+        )
+        to_cache = {}
+        fallback = []
+        for key in missing:
+            trans = found.get(full_keys[key])
+            if trans:
+                translations[key] = trans
+                to_cache[cache_keys[key]] = trans
             else:
-                # Yerel dosyadan al
-                trans = await self._get_translation_by_key(full_key, language)
-                if trans:
-                    translations[key] = trans
-                    await cache.set(cache_key, trans, ttl=3600, namespace="translations")
-                else:
-                    # Varsayılan dilde dene
-                    if language != self.default_language:
-                        trans = await self._get_translation_by_key(
-                            full_key, self.default_language
-                        )
-                        if trans:
-                            # AI ile çevir
-                            translated = await self.translate(
-                                trans, language, self.default_language
-                            )
-                            translations[key] = translated
-                        else:
-                            translations[key] = key  # Anahtar döndür
-                    else:
-                        translations[key] = key
+                fallback.append(key)
+        
+        if to_cache:
+            await cache.set_many(to_cache, ttl=3600, namespace="translations")
+        
+        # Varsayılan dilde dene, AI ile çevir
+        if fallback and language != self.default_language:
+            defaults = await self._get_translations_by_keys(
+                [full_keys[key] for key in fallback], self.default_language
+            )
+            translatable = [key for key in fallback if defaults.get(full_keys[key])]
+            translated = await self.translate_batch(
+                [defaults[full_keys[key]] for key in translatable],
+                language,
+                self.default_language
+            )
+            translations.update(zip(translatable, translated))
+        
+        for key in fallback:
+            translations.setdefault(key, key)  # Anahtar döndür
         
         return translations
     
@@ -809,6 +855,27 @@ Sadece çeviriyi döndür, açıklama yapma.
         
         return None
     
+    async def _get_translations_by_keys(
+        self,
+        keys: List[str],
+        language: str
+    ) -> Dict[str, str]:
+        """Birden fazla anahtarı tek sorguda getir"""
+        if not self.db or not keys:
+            return {}
+        
+        cursor = self.db.translations.find(
+            {"key": {"$in": keys}, "language": language},
+            {"key": 1, "value": 1}
+        )
+        return {trans["key"]: trans["value"] async for trans in cursor}
+    
+    @staticmethod
+    def _translation_cache_key(text: str, source_lang: str, target_lang: str) -> str:
+        # hash() süreç başına rastgele tohumlanır; worker'lar arası sabit anahtar
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return f"translation:{source_lang}:{target_lang}:{digest}"
+    
     def _generate_po_file(
         self,
         translations: Dict[str, str],
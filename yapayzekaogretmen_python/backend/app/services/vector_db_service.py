@@ -5,14 +5,18 @@ ChromaDB ve FAISS kullanarak dokümanların vektörleştirilmesi ve aranması
 """
 
 import os
-from typing import List, Dict, Optional, Any
+import re
+import hashlib
+import shutil
+import threading
+from typing import List, Dict, Optional, Any, Tuple
 from pathlib import Path
 import json
 import pickle
 
 # LangChain
 from langchain_community.vectorstores import Chroma, FAISS
-from langchain_community.embeddings import OpenAIEmbeddings, HuggingFaceEmbeddings
+from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.schema import Document
 
 # ChromaDB
@@ -21,6 +25,125 @@ from chromadb.config import Settings
 
 from app.core.logger import logger
 from app.core.config import settings
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingStore, content_hash
+from app.services.executor_service import executor
+from app.services.collection_registry import collection_registry
+
+
+_shared_embeddings = None
+_document_embeddings = None
+
+# Koleksiyon başına ingest kilidi (ingest executor thread'lerinde çalışır)
+_ingest_locks: Dict[str, threading.Lock] = {}
+_ingest_locks_guard = threading.Lock()
+
+# Ad -> yüklü vektör deposu; süreçteki tüm VectorDBService örnekleri paylaşır.
+# Girdiler collection_registry'deki sürümle doğrulanır.
+_collection_cache: Dict[str, Dict[str, Any]] = {}
+
+STAGING_SUFFIX = "__staging"
+UPSERT_BATCH_SIZE = 500
+
+# Chroma'da her ingest mantıksal adın yeni bir neslini kurar (<ad>__g<n>).
+# Okuyucular kayıttaki nesle gider; yeni nesil kayda yazılmadan eskisi
+# silinmez, böylece koleksiyonun hiç olmadığı ya da yarım güncellendiği
+# bir an görülmez. Eki olmayan eski koleksiyonlar 0. nesil sayılır.
+GENERATION_SEPARATOR = "__g"
+GENERATION_PATTERN = re.compile(r"^(.+)__g(\d+)$")
+
+
+def split_generation(physical_name: str) -> Tuple[str, int]:
+    """Fiziksel Chroma adından (mantıksal ad, nesil)"""
+    match = GENERATION_PATTERN.match(physical_name)
+    if not match:
+        return physical_name, 0
+    return match.group(1), int(match.group(2))
+
+
+def generation_name(collection_name: str, generation: int) -> str:
+    return f"{collection_name}{GENERATION_SEPARATOR}{generation}"
+
+
+def _create_embeddings():
+    """Embedding modelini oluştur"""
+    try:
+        if settings.OPENAI_API_KEY:
+            # OpenAI embeddings (daha iyi sonuçlar)
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings(
+                openai_api_key=settings.OPENAI_API_KEY,
+                model="text-embedding-ada-002"
+            )
+            logger.info("OpenAI embeddings kullanılıyor")
+        else:
+            # Ücretsiz alternatif: HuggingFace embeddings
+            embeddings = HuggingFaceEmbeddings(
+                model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True}
+            )
+            logger.info("HuggingFace embeddings kullanılıyor")
+    except Exception as e:
+        # Varsayılan olarak HuggingFace kullan
+        logger.warning(f"Embedding ayarı hatası: {e}. HuggingFace kullanılıyor.")
+        embeddings = HuggingFaceEmbeddings(
+            model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'normalize_embeddings': True}
+        )
+    return embeddings
+
+
+def get_embeddings():
+    """Süreç genelinde paylaşılan embedding modelini getir (ilk kullanımda yüklenir)"""
+    global _shared_embeddings
+    if _shared_embeddings is None:
+        _shared_embeddings = _create_embeddings()
+    return _shared_embeddings
+
+
+def get_document_embeddings():
+    """
+    Doküman ingest'i için önbellekli embedding modeli
+
+    Aynı model ve içerikteki parçalar yeniden vektörleştirilmez
+    (bkz. app.services.embedding_cache).
+    """
+    global _document_embeddings
+    if _document_embeddings is None:
+        if settings.EMBEDDING_CACHE_ENABLED:
+            store = EmbeddingStore(settings.BASE_DIR / "vector_db" / "embedding_cache.sqlite3")
+            _document_embeddings = CachedEmbeddings(
+                get_embeddings(), store, batch_size=settings.EMBEDDING_BATCH_SIZE
+            )
+        else:
+            _document_embeddings = get_embeddings()
+    return _document_embeddings
+
+
+def chunk_id(document: Document) -> str:
+    """Kararlı parça ID'si: (kaynak PDF, sayfa, içerik hash'i)"""
+    source = str(document.metadata.get("source", ""))
+    page = document.metadata.get("page", 0)
+    source_key = hashlib.sha1(source.encode("utf-8")).hexdigest()[:10]
+    return f"{source_key}:{page}:{content_hash(document.page_content)[:16]}"
+
+
+def with_stable_ids(documents: List[Document]) -> Dict[str, Document]:
+    """ID -> doküman (aynı sayfadaki birebir tekrarlar tek parçaya iner)"""
+    chunks: Dict[str, Document] = {}
+    for document in documents:
+        chunks.setdefault(chunk_id(document), document)
+    return chunks
+
+
+def _scalar_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Chroma yalnızca str/int/float/bool metadata kabul eder"""
+    return {
+        key: value if isinstance(value, (str, int, float, bool)) else json.dumps(value, ensure_ascii=False)
+        for key, value in metadata.items()
+        if value is not None
+    }
 
 
 class VectorDBService:
@@ -46,116 +169,294 @@ class VectorDBService:
         self.faiss_path = self.db_path / "faiss"
         self.faiss_path.mkdir(parents=True, exist_ok=True)
         
-        # Koleksiyonlar
-        self.collections = {}
+        # Koleksiyonlar (süreç genelinde ortak önbellek)
+        self.collections = _collection_cache
         
         logger.info("Vector DB Service başlatıldı")
     
     def _setup_embeddings(self):
         """Embedding modelini ayarla"""
-        try:
-            if settings.OPENAI_API_KEY:
-                # OpenAI embeddings (daha iyi sonuçlar)
-                from langchain_openai import OpenAIEmbeddings
-                self.embeddings = OpenAIEmbeddings(
-                    openai_api_key=settings.OPENAI_API_KEY,
-                    model="text-embedding-ada-002"
-                )
-                logger.info("OpenAI embeddings kullanılıyor")
-            else:
-                # Ücretsiz alternatif: HuggingFace embeddings
-                self.embeddings = HuggingFaceEmbeddings(
-                    model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-                    model_kwargs={'device': 'cpu'},
-                    encode_kwargs={'normalize_embeddings': True}
-                )
-                logger.info("HuggingFace embeddings kullanılıyor")
-        except Exception as e:
-            # Varsayılan olarak HuggingFace kullan
-            logger.warning(f"Embedding ayarı hatası: {e}. HuggingFace kullanılıyor.")
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': True}
-            )
+        self.embeddings = get_document_embeddings()
+    
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.get_stats()
+        return {"enabled": False}
     
     def create_or_update_collection(
         self, 
         collection_name: str, 
         documents: List[Document],
-        use_faiss: bool = False
+        use_faiss: bool = False,
+        incremental: bool = True,
+        grade: Optional[int] = None,
+        subject: Optional[str] = None
     ) -> bool:
-        """Koleksiyon oluştur veya güncelle"""
+        """
+        Koleksiyon oluştur veya güncelle
+
+        incremental=True (varsayılan) mevcut koleksiyonla kararlı parça
+        ID'leri üzerinden fark alır: yalnızca yeni/değişen parçalar eklenir,
+        kaldırılanlar silinir. False ise koleksiyon baştan kurulur ve hazır
+        olunca eskisinin yerine geçer. grade/subject verilirse koleksiyon
+        kayıtta bu (sınıf, ders) altında indekslenir; verilmezse addan çözülür.
+        """
         try:
-            if use_faiss:
-                return self._create_faiss_index(collection_name, documents)
-            else:
-                return self._create_chroma_collection(collection_name, documents)
+            chunks = with_stable_ids(documents)
+            key = (grade, subject)
+            with self._ingest_lock(collection_name):
+                if use_faiss:
+                    if incremental:
+                        return self._upsert_faiss_index(collection_name, chunks, key)
+                    return self._create_faiss_index(collection_name, chunks, key)
+                if incremental:
+                    return self._upsert_chroma_collection(collection_name, chunks, key)
+                return self._create_chroma_collection(collection_name, chunks, key)
         
         except Exception as e:
             logger.error(f"Koleksiyon oluşturma hatası: {e}")
             return False
     
-    def _create_chroma_collection(self, collection_name: str, documents: List[Document]) -> bool:
-        """ChromaDB koleksiyonu oluştur"""
+    def _ingest_lock(self, collection_name: str) -> threading.Lock:
+        """Aynı koleksiyona eşzamanlı iki ingest'i sıraya sok"""
+        with _ingest_locks_guard:
+            return _ingest_locks.setdefault(collection_name, threading.Lock())
+    
+    def _chroma_generations(self, collection_name: str) -> List[Tuple[int, str]]:
+        """Mantıksal ada ait fiziksel Chroma koleksiyonları: (nesil, ad), eskiden yeniye"""
+        generations = []
+        for collection in self.chroma_client.list_collections():
+            if collection.name.endswith(STAGING_SUFFIX):
+                continue
+            logical_name, generation = split_generation(collection.name)
+            if logical_name == collection_name:
+                generations.append((generation, collection.name))
+        return sorted(generations)
+    
+    def _next_generation(self, collection_name: str, generations: List[Tuple[int, str]]) -> str:
+        return generation_name(collection_name, generations[-1][0] + 1 if generations else 1)
+    
+    def _drop_chroma(self, physical_name: str):
         try:
-            # Mevcut koleksiyonu sil
+            self.chroma_client.delete_collection(physical_name)
+        except Exception as e:
+            logger.warning(f"Chroma koleksiyonu silinemedi: {physical_name}: {e}")
+    
+    def _create_chroma_collection(self, collection_name: str, chunks: Dict[str, Document], key: tuple = (None, None)) -> bool:
+        """ChromaDB koleksiyonunu baştan kur (yeni nesilde, sonra kayıtta yer değiştir)"""
+        staging_name = None
+        try:
+            generations = self._chroma_generations(collection_name)
+            physical_name = self._next_generation(collection_name, generations)
+            staging_name = f"{physical_name}{STAGING_SUFFIX}"
             try:
-                self.chroma_client.delete_collection(collection_name)
-            except:
+                self.chroma_client.delete_collection(staging_name)
+            except Exception:
                 pass
             
-            # Yeni koleksiyon oluştur
-            vectorstore = Chroma.from_documents(
-                documents=documents,
+            # Yeni nesli okuyuculardan ayrı kur
+            Chroma.from_documents(
+                documents=[
+                    Document(page_content=doc.page_content, metadata=_scalar_metadata(doc.metadata))
+                    for doc in chunks.values()
+                ],
                 embedding=self.embeddings,
-                collection_name=collection_name,
-                client=self.chroma_client,
-                persist_directory=str(self.db_path / "chroma")
+                ids=list(chunks),
+                collection_name=staging_name,
+                client=self.chroma_client
             )
             
-            # Koleksiyonu kaydet
-            self.collections[collection_name] = {
-                "type": "chroma",
-                "vectorstore": vectorstore,
-                "document_count": len(documents)
-            }
-            
-            logger.info(f"ChromaDB koleksiyonu oluşturuldu: {collection_name} ({len(documents)} doküman)")
+            self._publish_chroma(collection_name, staging_name, physical_name, generations, len(chunks), key)
+            logger.info(f"ChromaDB koleksiyonu oluşturuldu: {collection_name} ({len(chunks)} doküman)")
             return True
             
         except Exception as e:
             logger.error(f"ChromaDB hatası: {e}")
+            if staging_name:
+                self._drop_chroma(staging_name)
             return False
     
-    def _create_faiss_index(self, collection_name: str, documents: List[Document]) -> bool:
+    def _upsert_chroma_collection(self, collection_name: str, chunks: Dict[str, Document], key: tuple = (None, None)) -> bool:
+        """
+        ChromaDB koleksiyonunu artımlı güncelle
+
+        Değişmeyen parçaların vektörleri mevcut nesilden kopyalanır, yalnızca
+        yeni parçalar vektörleştirilir. Güncelleme yeni nesilde yapılır;
+        okuyucular eski ya da yeni tam sürümü görür, ikisinin karışımını değil.
+        """
+        staging_name = None
+        try:
+            generations = self._chroma_generations(collection_name)
+            current = self.chroma_client.get_collection(generations[-1][1]) if generations else None
+            existing = set(current.get(include=[])["ids"]) if current is not None else set()
+            added = [chunk_id for chunk_id in chunks if chunk_id not in existing]
+            removed = [chunk_id for chunk_id in existing if chunk_id not in chunks]
+            
+            if current is not None and not added and not removed:
+                self._activate_chroma(collection_name, len(chunks), key, generations[-1][1])
+                logger.info(f"ChromaDB koleksiyonu değişmedi: {collection_name} ({len(chunks)} doküman)")
+                return True
+            
+            physical_name = self._next_generation(collection_name, generations)
+            staging_name = f"{physical_name}{STAGING_SUFFIX}"
+            try:
+                self.chroma_client.delete_collection(staging_name)
+            except Exception:
+                pass
+            staged = self.chroma_client.create_collection(name=staging_name, embedding_function=None)
+            
+            kept = [chunk_id for chunk_id in chunks if chunk_id in existing]
+            for start in range(0, len(kept), UPSERT_BATCH_SIZE):
+                rows = current.get(
+                    ids=kept[start:start + UPSERT_BATCH_SIZE],
+                    include=["embeddings", "documents", "metadatas"]
+                )
+                staged.add(
+                    ids=rows["ids"],
+                    embeddings=rows["embeddings"],
+                    documents=rows["documents"],
+                    metadatas=rows["metadatas"]
+                )
+            
+            for start in range(0, len(added), UPSERT_BATCH_SIZE):
+                batch = [chunks[chunk_id] for chunk_id in added[start:start + UPSERT_BATCH_SIZE]]
+                staged.add(
+                    ids=added[start:start + UPSERT_BATCH_SIZE],
+                    embeddings=self.embeddings.embed_documents([doc.page_content for doc in batch]),
+                    documents=[doc.page_content for doc in batch],
+                    metadatas=[_scalar_metadata(doc.metadata) for doc in batch]
+                )
+            
+            self._publish_chroma(collection_name, staging_name, physical_name, generations, len(chunks), key)
+            logger.info(
+                f"ChromaDB koleksiyonu güncellendi: {collection_name} "
+                f"(+{len(added)} / -{len(removed)}, toplam {len(chunks)})"
+            )
+            return True
+            
+        except Exception as e:
+            logger.error(f"ChromaDB güncelleme hatası: {e}")
+            if staging_name:
+                self._drop_chroma(staging_name)
+            return False
+    
+    def _publish_chroma(
+        self,
+        collection_name: str,
+        staging_name: str,
+        physical_name: str,
+        generations: List[Tuple[int, str]],
+        document_count: int,
+        key: tuple = (None, None)
+    ):
+        """Hazır nesli yayımla: adlandır, kayıtta yer değiştir, eski nesilleri sil"""
+        # Hazırlık adı taramalarda görünmez; yeniden adlandırma tek adımdır
+        self.chroma_client.get_collection(staging_name).modify(name=physical_name)
+        self._activate_chroma(collection_name, document_count, key, physical_name)
+        # Okuyucular artık yeni nesilde; eski nesle bağlı kalan sorgular
+        # "does not exist" alıp kayıttan yeniden çözülür (bkz. _query)
+        for _, old_name in generations:
+            self._drop_chroma(old_name)
+    
+    def _activate_chroma(
+        self,
+        collection_name: str,
+        document_count: int,
+        key: tuple = (None, None),
+        physical_name: Optional[str] = None
+    ):
+        physical_name = physical_name or collection_name
+        vectorstore = Chroma(
+            client=self.chroma_client,
+            collection_name=physical_name,
+            embedding_function=self.embeddings
+        )
+        # Tek atamayla yer değiştirir; okuyucular eski ya da yeni kaydı görür
+        self.collections[collection_name] = {
+            "type": "chroma",
+            "vectorstore": vectorstore,
+            "document_count": document_count,
+            "version": physical_name
+        }
+        collection_registry.register(collection_name, "chroma", *key, version=physical_name)
+    
+    def _create_faiss_index(self, collection_name: str, chunks: Dict[str, Document], key: tuple = (None, None)) -> bool:
         """FAISS indeksi oluştur"""
         try:
             # FAISS vektör deposu oluştur
             vectorstore = FAISS.from_documents(
-                documents=documents,
-                embedding=self.embeddings
+                documents=list(chunks.values()),
+                embedding=self.embeddings,
+                ids=list(chunks)
             )
             
-            # İndeksi kaydet
-            index_path = self.faiss_path / f"{collection_name}.faiss"
-            vectorstore.save_local(str(index_path))
+            self._activate_faiss(collection_name, vectorstore, len(chunks), key)
+            logger.info(f"FAISS indeksi oluşturuldu: {collection_name} ({len(chunks)} doküman)")
+            return True
             
-            # Koleksiyonu kaydet
-            self.collections[collection_name] = {
-                "type": "faiss",
-                "vectorstore": vectorstore,
-                "document_count": len(documents),
-                "index_path": str(index_path)
-            }
+        except Exception as e:
+            logger.error(f"FAISS hatası: {e}")
+            return False
+    
+    def _upsert_faiss_index(self, collection_name: str, chunks: Dict[str, Document], key: tuple = (None, None)) -> bool:
+        """FAISS indeksini artımlı güncelle (okuyucuların kullandığı kopyaya dokunmadan)"""
+        index_path = self.faiss_path / f"{collection_name}.faiss"
+        if not index_path.exists():
+            return self._create_faiss_index(collection_name, chunks, key)
+        
+        try:
+            # Diskten bağımsız bir kopya yükle; güncelleme bitene kadar okuyucular eskisini kullanır
+            vectorstore = FAISS.load_local(str(index_path), self.embeddings)
+            existing = set(vectorstore.index_to_docstore_id.values())
+            added = [chunk_id for chunk_id in chunks if chunk_id not in existing]
+            removed = [chunk_id for chunk_id in existing if chunk_id not in chunks]
+            
+            if removed:
+                vectorstore.delete(removed)
+            if added:
+                vectorstore.add_documents([chunks[chunk_id] for chunk_id in added], ids=added)
             
-            logger.info(f"FAISS indeksi oluşturuldu: {collection_name} ({len(documents)} doküman)")
+            self._activate_faiss(collection_name, vectorstore, len(chunks), key)
+            logger.info(
+                f"FAISS indeksi güncellendi: {collection_name} "
+                f"(+{len(added)} / -{len(removed)}, toplam {len(chunks)})"
+            )
             return True
             
         except Exception as e:
-            logger.error(f"FAISS hatası: {e}")
+            logger.error(f"FAISS güncelleme hatası: {e}")
             return False
     
+    def _activate_faiss(
+        self,
+        collection_name: str,
+        vectorstore,
+        document_count: int,
+        key: tuple = (None, None)
+    ):
+        """İndeksi geçici klasöre yaz, diskte ve bellekte yer değiştir"""
+        index_path = self.faiss_path / f"{collection_name}.faiss"
+        staging_path = index_path.with_name(index_path.name + STAGING_SUFFIX)
+        retired_path = index_path.with_name(index_path.name + ".old")
+        
+        shutil.rmtree(staging_path, ignore_errors=True)
+        vectorstore.save_local(str(staging_path))
+        if index_path.exists():
+            shutil.rmtree(retired_path, ignore_errors=True)
+            os.replace(index_path, retired_path)
+        os.replace(staging_path, index_path)
+        shutil.rmtree(retired_path, ignore_errors=True)
+        version = index_path.stat().st_mtime_ns
+        
+        self.collections[collection_name] = {
+            "type": "faiss",
+            "vectorstore": vectorstore,
+            "document_count": document_count,
+            "index_path": str(index_path),
+            "version": version
+        }
+        collection_registry.register(collection_name, "faiss", *key, version=version)
+    
     def search_similar_documents(
         self, 
         collection_name: str, 
@@ -165,30 +466,25 @@ class VectorDBService:
     ) -> List[Document]:
         """Benzer dokümanları ara"""
         try:
-            if collection_name not in self.collections:
-                # Koleksiyonu yükle
-                if not self._load_collection(collection_name):
-                    logger.error(f"Koleksiyon bulunamadı: {collection_name}")
-                    return []
-            
-            collection = self.collections[collection_name]
-            vectorstore = collection["vectorstore"]
-            
-            # Arama yap
-            if filter_metadata:
-                # Metadata filtresi ile
-                results = vectorstore.similarity_search(
-                    query=query,
-                    k=k,
-                    filter=filter_metadata
-                )
-            else:
+            def search(vectorstore):
+                if filter_metadata:
+                    # Metadata filtresi ile
+                    return vectorstore.similarity_search(
+                        query=query,
+                        k=k,
+                        filter=filter_metadata
+                    )
                 # Normal arama
-                results = vectorstore.similarity_search(
+                return vectorstore.similarity_search(
                     query=query,
                     k=k
                 )
             
+            results = self._query(collection_name, search)
+            if results is None:
+                logger.error(f"Koleksiyon bulunamadı: {collection_name}")
+                return []
+            
             return results
             
         except Exception as e:
@@ -204,15 +500,13 @@ class VectorDBService:
     ) -> List[tuple]:
         """Benzerlik skoru ile doküman ara"""
         try:
-            if collection_name not in self.collections:
-                if not self._load_collection(collection_name):
-                    return []
-            
-            collection = self.collections[collection_name]
-            vectorstore = collection["vectorstore"]
-            
             # Skorlu arama
-            results = vectorstore.similarity_search_with_score(query, k=k)
+            results = self._query(
+                collection_name,
+                lambda vectorstore: vectorstore.similarity_search_with_score(query, k=k)
+            )
+            if results is None:
+                return []
             
             # Eşik değerini uygula
             filtered_results = [
@@ -226,27 +520,64 @@ class VectorDBService:
             logger.error(f"Skorlu arama hatası: {e}")
             return []
     
+    def _get_vectorstore(self, collection_name: str):
+        """Önbellekteki vektör deposu; kayıttaki sürüm değiştiyse yeniden yüklenir"""
+        entry = self.collections.get(collection_name)
+        if entry is None or entry.get("version") != collection_registry.version(collection_name):
+            if not self._load_collection(collection_name):
+                return None
+            entry = self.collections[collection_name]
+        return entry["vectorstore"]
+    
+    def _query(self, collection_name: str, fn):
+        """
+        fn(vectorstore) çalıştır; koleksiyon yoksa None
+
+        Başka bir worker yeni bir nesil yayımlayıp eskisini sildiyse önbellekteki
+        sarmalayıcı silinmiş koleksiyona bağlı kalır; bu durumda önbellek
+        girdisi atılır, kayıt (hız sınırıyla) yenilenir ve güncel nesil
+        yüklenip bir kez denenir.
+        """
+        vectorstore = self._get_vectorstore(collection_name)
+        if vectorstore is None:
+            return None
+        try:
+            return fn(vectorstore)
+        except Exception as e:
+            if "does not exist" not in str(e):
+                raise
+            logger.warning(f"Koleksiyon yeniden kurulmuş, yeniden yükleniyor: {collection_name}")
+            self.collections.pop(collection_name, None)
+            if collection_registry.claim_forced_refresh():
+                self.refresh_registry()
+            if not self._load_collection(collection_name):
+                return None
+            return fn(self.collections[collection_name]["vectorstore"])
+    
     def _load_collection(self, collection_name: str) -> bool:
-        """Koleksiyonu yükle"""
+        """Koleksiyonu yükle (tipi kayıttan; bilinmiyorsa kayıt hız sınırıyla yenilenir)"""
         try:
-            # Önce ChromaDB'de ara
-            collections = self.chroma_client.list_collections()
-            for col in collections:
-                if col.name == collection_name:
-                    vectorstore = Chroma(
-                        client=self.chroma_client,
-                        collection_name=collection_name,
-                        embedding_function=self.embeddings
-                    )
-                    self.collections[collection_name] = {
-                        "type": "chroma",
-                        "vectorstore": vectorstore
-                    }
-                    return True
+            kind = collection_registry.kind(collection_name)
+            if kind is None and collection_registry.claim_forced_refresh():
+                # Başka bir worker oluşturmuş olabilir (tarama hız sınırlı)
+                self.refresh_registry()
+                kind = collection_registry.kind(collection_name)
             
-            # FAISS'te ara
-            index_path = self.faiss_path / f"{collection_name}.faiss"
-            if index_path.exists():
+            if kind == "chroma":
+                vectorstore = Chroma(
+                    client=self.chroma_client,
+                    collection_name=collection_registry.version(collection_name) or collection_name,
+                    embedding_function=self.embeddings
+                )
+                self.collections[collection_name] = {
+                    "type": "chroma",
+                    "vectorstore": vectorstore,
+                    "version": collection_registry.version(collection_name)
+                }
+                return True
+            
+            if kind == "faiss":
+                index_path = self.faiss_path / f"{collection_name}.faiss"
                 vectorstore = FAISS.load_local(
                     str(index_path),
                     self.embeddings
@@ -254,7 +585,8 @@ class VectorDBService:
                 self.collections[collection_name] = {
                     "type": "faiss",
                     "vectorstore": vectorstore,
-                    "index_path": str(index_path)
+                    "index_path": str(index_path),
+                    "version": collection_registry.version(collection_name)
                 }
                 return True
             
@@ -283,43 +615,77 @@ class VectorDBService:
             "exists": False
         }
     
-    def list_collections(self) -> List[str]:
-        """Tüm koleksiyonları listele"""
+    def _scan_collections(self) -> List[tuple]:
+        """
+        Chroma ve FAISS'teki tüm koleksiyonlar: (ad, tip, sürüm) demetleri
+
+        Chroma'da her mantıksal ad için en yeni nesil alınır; sürüm onun
+        fiziksel adıdır. Hazırlık koleksiyonları ve eski nesiller görünmez.
+        """
         collections = []
         
         # ChromaDB koleksiyonları
         try:
-            chroma_collections = self.chroma_client.list_collections()
-            collections.extend([col.name for col in chroma_collections])
-        except:
-            pass
+            latest: Dict[str, Tuple[int, str]] = {}
+            for col in self.chroma_client.list_collections():
+                if col.name.endswith(STAGING_SUFFIX):
+                    continue
+                logical_name, generation = split_generation(col.name)
+                if logical_name not in latest or generation > latest[logical_name][0]:
+                    latest[logical_name] = (generation, col.name)
+            collections.extend([
+                (logical_name, "chroma", physical_name)
+                for logical_name, (_, physical_name) in latest.items()
+            ])
+        except Exception as e:
+            logger.warning(f"ChromaDB koleksiyonları listelenemedi: {e}")
         
         # FAISS indeksleri
         try:
             faiss_files = self.faiss_path.glob("*.faiss")
-            collections.extend([f.stem for f in faiss_files])
-        except:
-            pass
+            collections.extend([(f.stem, "faiss", f.stat().st_mtime_ns) for f in faiss_files])
+        except Exception as e:
+            logger.warning(f"FAISS indeksleri listelenemedi: {e}")
         
-        return list(set(collections))
+        return collections
+    
+    def refresh_registry(self):
+        """Koleksiyon kaydını tam taramayla yeniden kur"""
+        collection_registry.replace(self._scan_collections())
+    
+    def _ensure_registry(self):
+        if collection_registry.is_stale():
+            self.refresh_registry()
+    
+    def list_collections(self) -> List[str]:
+        """Tüm koleksiyonları listele (kayıttan)"""
+        self._ensure_registry()
+        return collection_registry.names()
+    
+    def find_collections(self, grade: int, subject: str) -> List[str]:
+        """Sınıf ve derse ait koleksiyonlar (O(1) kayıt araması)"""
+        self._ensure_registry()
+        return collection_registry.find(grade, subject)
     
     def delete_collection(self, collection_name: str) -> bool:
         """Koleksiyonu sil"""
         try:
-            # ChromaDB'den sil
+            # ChromaDB'den sil (tüm nesiller)
             try:
-                self.chroma_client.delete_collection(collection_name)
+                for _, physical_name in self._chroma_generations(collection_name):
+                    self.chroma_client.delete_collection(physical_name)
             except:
                 pass
             
-            # FAISS'ten sil
+            # FAISS'ten sil (save_local bir klasör oluşturur)
             index_path = self.faiss_path / f"{collection_name}.faiss"
             if index_path.exists():
-                index_path.unlink()
+                shutil.rmtree(index_path, ignore_errors=True)
             
-            # Önbellekten sil
+            # Önbellekten ve kayıttan sil
             if collection_name in self.collections:
                 del self.collections[collection_name]
+            collection_registry.unregister(collection_name)
             
             logger.info(f"Koleksiyon silindi: {collection_name}")
             return True
@@ -334,13 +700,53 @@ class VectorDBService:
         search_kwargs: Dict = None
     ):
         """LangChain retriever döndür"""
-        if collection_name not in self.collections:
-            self._load_collection(collection_name)
+        vectorstore = self._get_vectorstore(collection_name)
         
-        if collection_name in self.collections:
-            vectorstore = self.collections[collection_name]["vectorstore"]
-            
+        if vectorstore is not None:
             search_kwargs = search_kwargs or {"k": 5}
             return vectorstore.as_retriever(search_kwargs=search_kwargs)
         
-        return None
\ No newline at end of file
+        return None
+    
+    # ------------------------------------------------------------------
+    # Async API: Chroma/FAISS çağrıları 'vector' thread havuzunda çalışır
+    # ------------------------------------------------------------------
+    async def asearch_similar_documents(
+        self, 
+        collection_name: str, 
+        query: str, 
+        k: int = 5,
+        filter_metadata: Dict = None
+    ) -> List[Document]:
+        """search_similar_documents'ın event loop'u bloklamayan karşılığı"""
+        return await executor.run(
+            "vector", self.search_similar_documents, collection_name, query, k, filter_metadata
+        )
+    
+    async def asearch_with_score(
+        self, 
+        collection_name: str, 
+        query: str, 
+        k: int = 5,
+        score_threshold: float = 0.7
+    ) -> List[tuple]:
+        """search_with_score'un event loop'u bloklamayan karşılığı"""
+        return await executor.run(
+            "vector", self.search_with_score, collection_name, query, k, score_threshold
+        )
+    
+    async def alist_collections(self) -> List[str]:
+        if collection_registry.is_stale():
+            await executor.run("vector", self.refresh_registry)
+        return collection_registry.names()
+    
+    async def afind_collections(self, grade: int, subject: str) -> List[str]:
+        if collection_registry.is_stale():
+            await executor.run("vector", self.refresh_registry)
+        return collection_registry.find(grade, subject)
+    
+    async def aget_collection_info(self, collection_name: str) -> Dict[str, Any]:
+        return await executor.run("vector", self.get_collection_info, collection_name)
+    
+    async def adelete_collection(self, collection_name: str) -> bool:
+        return await executor.run("vector", self.delete_collection, collection_name)
@@ -337,6 +337,57 @@ class WebSocketService:
                 },
                 user_id
             )
+        
+        # Soru sorulduğunda yanıtı token token akıt
+        elif interaction_type == "ask":
+            await self._stream_ai_answer(user_id, data)
+    
+    async def _stream_ai_answer(self, user_id: str, data: dict):
+        """AI yanıtını sağlayıcıdan geldiği anda parça parça gönder"""
+        # Döngüsel import'u önlemek için burada import et
+        from app.services.ai_service import ai_service
+        
+        question = data.get("question") or data.get("message")
+        if not question:
+            return
+        
+        await self.manager.send_personal_message(
+            {
+                "type": "ai_status",
+                "status": "thinking",
+                "message": "AI düşünüyor...",
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            user_id
+        )
+        
+        async for event in ai_service.stream_ai_response(
+            prompt=question,
+            grade_level=data.get("grade_level", 5),
+            subject=data.get("subject", "genel"),
+            context=data.get("context"),
+            conversation_history=data.get("conversation_history"),
+            user_name=user_id,
+            session_id=data.get("session_id")
+        ):
+            if event["type"] == "token":
+                await self.manager.send_personal_message(
+                    {
+                        "type": "ai_stream_chunk",
+                        "chunk": event["content"]
+                    },
+                    user_id
+                )
+            else:
+                await self.manager.send_personal_message(
+                    {
+                        "type": "ai_response",
+                        "response": event["response"],
+                        "metadata": event["metadata"],
+                        "timestamp": datetime.utcnow().isoformat()
+                    },
+                    user_id
+                )
     
     async def _handle_lesson_progress(self, user_id: str, data: dict):
         """Ders ilerleme güncellemelerini işle"""
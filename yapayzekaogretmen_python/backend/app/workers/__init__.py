@@ -0,0 +1,7 @@
+"""
+Yapay Zeka Öğretmen - Workers
+-----------------------------
+Süreç havuzlarında çalışan saf fonksiyonlar. Spawn edilen worker'lar bu
+paketi import eder; app.services'in aksine burada servis singleton'ı
+oluşturan bir import yapılmamalıdır.
+"""
@@ -0,0 +1,137 @@
+"""
+Süreç Havuzu Görevleri
+----------------------
+ManagedExecutor'ın süreç havuzlarında çalışan, pickle edilebilir saf
+fonksiyonlar (görüntü ön işleme, OCR, PDF metin çıkarma). Worker süreçleri
+bu modülü import eder; servis singleton'larını veya veritabanı
+bağlantılarını yüklememek için yalnızca işleme kütüphanelerine bağımlıdır.
+"""
+
+import io
+import re
+from typing import Any, Dict
+
+import cv2
+import numpy as np
+import pdfplumber
+import PyPDF2
+import pytesseract
+from loguru import logger
+from pdf2image import convert_from_path
+from PIL import Image, ImageEnhance
+
+
+# ----------------------------------------------------------------------
+# Görüntü işleme ve OCR
+# ----------------------------------------------------------------------
+def preprocess_image(image_data: bytes, options: Dict[str, Any]) -> np.ndarray:
+    """Ödev görüntüsünü OCR için hazırla (boyutlandırma, kontrast, denoise, threshold)"""
+    # PIL Image olarak aç
+    image = Image.open(io.BytesIO(image_data))
+
+    # RGB'ye dönüştür
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    # Boyutlandır
+    image.thumbnail(options["max_size"], Image.Resampling.LANCZOS)
+
+    # Kontrast ve parlaklık ayarla
+    image = ImageEnhance.Contrast(image).enhance(options["enhance_contrast"])
+    image = ImageEnhance.Brightness(image).enhance(options["enhance_brightness"])
+
+    # Gri tonlama
+    gray = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
+
+    # Gürültü azaltma
+    denoised = cv2.fastNlMeansDenoising(gray, None, options["denoise_strength"], 7, 21)
+
+    # Adaptif threshold (el yazısı için)
+    return cv2.adaptiveThreshold(
+        denoised,
+        255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY,
+        11,
+        2
+    )
+
+
+def ocr_image(image: Any, language: str, config: str = "") -> str:
+    """Tesseract ile metin çıkar"""
+    return pytesseract.image_to_string(image, lang=language, config=config)
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+def extract_pdf_text(pdf_path: str) -> Dict[str, Any]:
+    """PDF'ten metin çıkar: PyPDF2, olmazsa pdfplumber, o da olmazsa OCR"""
+    text_content = ""
+    metadata = {
+        "file_path": pdf_path,
+        "page_count": 0,
+        "extraction_method": []
+    }
+
+    # Önce PyPDF2 ile dene
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            metadata["page_count"] = len(pdf_reader.pages)
+
+            for page_num, page in enumerate(pdf_reader.pages):
+                page_text = page.extract_text()
+                if page_text.strip():
+                    text_content += f"\n--- Sayfa {page_num + 1} ---\n{page_text}"
+                    metadata["extraction_method"].append("PyPDF2")
+    except Exception as e:
+        logger.warning(f"PyPDF2 ile metin çıkarılamadı: {e}")
+
+    # Eğer metin bulunamadıysa pdfplumber dene
+    if not text_content.strip():
+        try:
+            with pdfplumber.open(pdf_path) as pdf:
+                for page_num, page in enumerate(pdf.pages):
+                    page_text = page.extract_text()
+                    if page_text:
+                        text_content += f"\n--- Sayfa {page_num + 1} ---\n{page_text}"
+                        metadata["extraction_method"].append("pdfplumber")
+        except Exception as e:
+            logger.warning(f"pdfplumber ile metin çıkarılamadı: {e}")
+
+    # Hala metin yoksa OCR kullan
+    if not text_content.strip():
+        logger.info("PDF'den metin çıkarılamadı, OCR deneniyor...")
+        text_content = _ocr_pdf(pdf_path)
+        metadata["extraction_method"].append("OCR")
+
+    return {"text": clean_pdf_text(text_content), "metadata": metadata}
+
+
+def _ocr_pdf(pdf_path: str) -> str:
+    """OCR kullanarak PDF'den metin çıkar"""
+    try:
+        text_content = ""
+        for i, image in enumerate(convert_from_path(pdf_path)):
+            # OCR uygula (Türkçe desteği ile)
+            text = pytesseract.image_to_string(image, lang='tur')
+            text_content += f"\n--- Sayfa {i + 1} ---\n{text}"
+        return text_content
+    except Exception as e:
+        logger.error(f"OCR hatası: {e}")
+        return ""
+
+
+def clean_pdf_text(text: str) -> str:
+    """Metni temizle ve düzenle"""
+    # Fazla boşlukları temizle
+    text = re.sub(r'\s+', ' ', text)
+
+    # Sayfa numaralarını koru ama düzenle
+    text = re.sub(r'--- Sayfa (\d+) ---', r'\n\n[SAYFA \1]\n', text)
+
+    # Başlıkları algıla ve işaretle
+    text = re.sub(r'\n([A-ZĞÜŞİÖÇ][A-ZĞÜŞİÖÇ\s]+)\n', r'\n\n## \1\n\n', text)
+
+    return text.strip()
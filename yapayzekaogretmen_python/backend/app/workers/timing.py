@@ -0,0 +1,16 @@
+"""
+Worker Zamanlaması
+------------------
+Havuza gönderilen her işi saran çağrı; kuyruk bekleme ve çalışma süresi
+ölçümü için worker içindeki başlangıç/bitiş zamanını döner.
+"""
+
+import time
+from typing import Any, Callable, Tuple
+
+
+def timed_call(func: Callable, args: tuple, kwargs: dict) -> Tuple[float, float, Any]:
+    """Worker içinde çalışır; kuyrukta bekleme süresi için başlangıç/bitiş zamanını döner"""
+    started = time.time()
+    result = func(*args, **kwargs)
+    return started, time.time(), result
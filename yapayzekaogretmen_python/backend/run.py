@@ -47,6 +47,9 @@ if __name__ == "__main__":
     =================================================
     """)
     
+    # Worker'lar ayarı ortamdan okur (ör. CACHE_BACKEND=auto)
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    
     uvicorn.run(
         "app.main:app",
         host=args.host,
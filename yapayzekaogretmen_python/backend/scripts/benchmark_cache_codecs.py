@@ -0,0 +1,97 @@
+"""
+Cache Codec Benchmark
+Eski pickle-hex/JSON serileştirmesini yeni tip etiketli codec'lerle
+boyut ve encode/decode süresi açısından karşılaştırır.
+
+Kullanım:
+    cd yapayzekaogretmen_python/backend
+    ./venv/bin/python scripts/benchmark_cache_codecs.py
+"""
+
+import json
+import pickle
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+# Backend dizinini Python path'e ekle
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.cache_codec import CODECS, ValueSerializer, ZSTD_AVAILABLE
+
+
+ITERATIONS = 2000
+
+SAMPLES = {
+    "kullanıcı profili": {
+        "id": "64f1c2a9e4b0a1b2c3d4e5f6",
+        "name": "Ayşe Kara",
+        "grade": 5,
+        "xp": 1840,
+        "badges": ["ilk_ders", "hafta_serisi", "kesir_ustasi"],
+        "preferences": {"theme": "light", "notifications": True, "language": "tr"},
+    },
+    "ders içeriği": {
+        "lesson_id": "mat-5-kesirler",
+        "title": "Kesirler ve Ondalık Sayılar",
+        "sections": [
+            {"heading": f"Bölüm {i}", "body": "Kesirler bir bütünün eşit parçalarını gösterir. " * 20}
+            for i in range(8)
+        ],
+    },
+    "liderlik tablosu": [
+        {"user_id": f"user-{i}", "name": f"Öğrenci {i}", "xp": 5000 - i * 7, "rank": i + 1}
+        for i in range(100)
+    ],
+    "tarihli kayıt": {"user_id": "u1", "last_login": datetime(2024, 9, 1, 8, 30)},
+}
+
+
+def legacy_dumps(value):
+    """Codec öncesi CacheService._serialize davranışı"""
+    if isinstance(value, (dict, list)):
+        try:
+            return json.dumps(value)
+        except TypeError:
+            pass
+    return pickle.dumps(value).hex()
+
+
+def legacy_loads(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return pickle.loads(bytes.fromhex(value))
+
+
+def measure(dumps, loads, value):
+    encoded = dumps(value)
+    encode_time = timeit.timeit(lambda: dumps(value), number=ITERATIONS) / ITERATIONS
+    decode_time = timeit.timeit(lambda: loads(encoded), number=ITERATIONS) / ITERATIONS
+    return len(encoded), encode_time * 1e6, decode_time * 1e6
+
+
+def main():
+    candidates = {"legacy": (legacy_dumps, legacy_loads)}
+    for name in CODECS:
+        if name == "pickle":
+            continue
+        serializer = ValueSerializer(name, compression_threshold=None)
+        candidates[name] = (serializer.dumps, serializer.loads)
+        if ZSTD_AVAILABLE:
+            compressed = ValueSerializer(name, compression_threshold=1024)
+            candidates[f"{name}+zstd"] = (compressed.dumps, compressed.loads)
+
+    print(f"{'örnek':<20} {'codec':<14} {'bayt':>8} {'encode µs':>10} {'decode µs':>10}")
+    print("-" * 66)
+    for sample_name, value in SAMPLES.items():
+        for codec_name, (dumps, loads) in candidates.items():
+            size, encode_us, decode_us = measure(dumps, loads, value)
+            print(f"{sample_name:<20} {codec_name:<14} {size:>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
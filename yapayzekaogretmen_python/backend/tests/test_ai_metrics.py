@@ -0,0 +1,35 @@
+"""
+AI Metrics Tests
+---------------
+Latency histogram buckets and per-provider token accounting.
+"""
+from app.services.ai_metrics import AIRequestMetrics, Histogram
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.5, 1.0, 2.0))
+    for value in (0.1, 0.4, 0.9, 1.5, 5.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_0.5": 2, "le_1.0": 1, "le_2.0": 1, "le_inf": 1}
+    assert snapshot["count"] == 5
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.99) == float("inf")
+
+
+def test_request_metrics_are_grouped_by_provider_and_model():
+    metrics = AIRequestMetrics()
+    metrics.observe(
+        "deepseek", "deepseek-chat", 0.01, 0.3, 2.5,
+        prompt_tokens=100, completion_tokens=40, generation_time=2.4
+    )
+    metrics.observe("deepseek", "deepseek-chat", 0.02, 0.4, 3.0, prompt_tokens=80, completion_tokens=20)
+    metrics.observe("openai", "gpt-3.5-turbo", 0.0, 1.0, 1.0)
+
+    snapshot = metrics.snapshot()
+    deepseek = snapshot["deepseek/deepseek-chat"]
+    assert deepseek["tokens"] == {"requests": 2, "prompt_tokens": 180, "completion_tokens": 60}
+    assert deepseek["total_time"]["count"] == 2
+    assert deepseek["generation_time"]["count"] == 1
+    assert snapshot["openai/gpt-3.5-turbo"]["tokens"]["prompt_tokens"] == 0
@@ -0,0 +1,144 @@
+"""
+AI Response Cache Tests
+----------------------
+Exact and semantic lookups for the tutor answer cache.
+"""
+import time
+
+import pytest
+
+from app.services import ai_response_cache as ai_response_cache_module
+from app.services.ai_response_cache import AIResponseCache, EmbeddingModelUnavailable
+
+
+class FakeEmbeddings:
+    """Anahtar kelimeye göre sabit vektör döndüren sahte embedding modeli"""
+
+    def embed_query(self, text: str):
+        if "kesir" in text:
+            return [1.0, 0.05, 0.0]
+        return [0.0, 0.0, 1.0]
+
+
+class FlakyEmbeddings(FakeEmbeddings):
+    """İlk çağrıda geçici hata veren sahte embedding modeli"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text: str):
+        self.calls += 1
+        if self.calls == 1:
+            raise TimeoutError("embedding zaman aşımı")
+        return super().embed_query(text)
+
+
+def _cache(**kwargs) -> AIResponseCache:
+    options = {
+        "max_entries": 10,
+        "ttl_seconds": 60,
+        "similarity_threshold": 0.95,
+        "semantic_enabled": True,
+        "embeddings": FakeEmbeddings(),
+    }
+    options.update(kwargs)
+    return AIResponseCache(**options)
+
+
+@pytest.mark.asyncio
+async def test_exact_hit_uses_normalized_prompt():
+    cache = _cache(semantic_enabled=False)
+
+    lookup = await cache.get("Kesir nedir?", 5, "matematik")
+    assert not lookup.hit
+    await cache.set(lookup, "Kesir bir bütünün parçasıdır.", {"provider": "deepseek"})
+
+    lookup = await cache.get("  KESİR nedir ", 5, "Matematik")
+    assert lookup.hit
+    assert lookup.metadata["cache_hit"] == "exact"
+    assert cache.get_stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_semantic_hit_within_same_grade_and_subject():
+    cache = _cache()
+
+    lookup = await cache.get("Kesir nedir?", 5, "matematik")
+    await cache.set(lookup, "Kesir bir bütünün parçasıdır.", {"provider": "deepseek"})
+
+    similar = await cache.get("kesirler ne demek", 5, "matematik")
+    assert similar.hit
+    assert similar.metadata["cache_hit"] == "semantic"
+
+    other_grade = await cache.get("kesirler ne demek", 6, "matematik")
+    assert not other_grade.hit
+
+    unrelated = await cache.get("Fotosentez nedir?", 5, "matematik")
+    assert not unrelated.hit
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    cache = _cache(max_entries=2, semantic_enabled=False)
+
+    for question in ["bir", "iki", "üç"]:
+        lookup = await cache.get(question, 5, "matematik")
+        await cache.set(lookup, question, {})
+
+    assert cache.get_stats()["evictions"] == 1
+    assert not (await cache.get("bir", 5, "matematik")).hit
+
+    expired = _cache(ttl_seconds=-1, semantic_enabled=False)
+    lookup = await expired.get("bir", 5, "matematik")
+    await expired.set(lookup, "bir", {})
+    assert not (await expired.get("bir", 5, "matematik")).hit
+    assert expired.get_stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_embedding_error_only_pauses_semantic_lookup():
+    embeddings = FlakyEmbeddings()
+    cache = _cache(embeddings=embeddings)
+
+    assert await cache._embed("kesir nedir") is None
+    assert cache.semantic_enabled
+    # Bekleme süresince model çağrılmaz
+    assert await cache._embed("kesir nedir") is None
+    assert embeddings.calls == 1
+
+    cache._semantic_retry_at = 0.0
+    assert await cache._embed("kesir nedir") is not None
+
+
+@pytest.mark.asyncio
+async def test_model_load_failure_disables_semantic_lookup(monkeypatch):
+    cache = _cache(embeddings=None)
+
+    def fail_to_load(text):
+        raise EmbeddingModelUnavailable("model yok")
+
+    monkeypatch.setattr(cache, "_embed_sync", fail_to_load)
+
+    assert await cache._embed("kesir nedir") is None
+    assert not cache.semantic_enabled
+
+
+@pytest.mark.asyncio
+async def test_shared_hit_keeps_remaining_redis_ttl(monkeypatch):
+    cache = _cache(semantic_enabled=False, ttl_seconds=3600)
+    shared = ai_response_cache_module.cache
+
+    async def fake_get(key, namespace="temp"):
+        return {"response": "Kesir bir bütünün parçasıdır.", "metadata": {}}
+
+    async def fake_get_ttl(key, namespace="temp"):
+        return 5
+
+    monkeypatch.setattr(shared, "get", fake_get)
+    monkeypatch.setattr(shared, "get_ttl", fake_get_ttl)
+
+    lookup = await cache.get("Kesir nedir?", 5, "matematik")
+
+    assert lookup.hit
+    remaining = cache._entries[lookup.key].expires_at - time.monotonic()
+    assert 0 < remaining <= 5
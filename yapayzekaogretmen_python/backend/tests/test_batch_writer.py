@@ -0,0 +1,95 @@
+"""
+Batch Writer Tests
+-----------------
+Size/time triggered bulk writes and draining on shutdown.
+"""
+import asyncio
+
+import pytest
+
+from app.services.batch_writer import BatchWriter
+
+
+class RecordingCollection:
+    """insert_many çağrılarını kaydeden koleksiyon"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.batches.append(list(documents))
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_size_is_reached():
+    collection = RecordingCollection()
+    flushed = []
+
+    async def on_flush(batch):
+        flushed.append(len(batch))
+
+    writer = BatchWriter("test", lambda: collection, flush_size=3, flush_interval=60, on_flush=on_flush)
+    for i in range(3):
+        writer.add({"i": i})
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert collection.batches == [[{"i": 0}, {"i": 1}, {"i": 2}]]
+    assert flushed == [3]
+    await writer.aclose()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_interval_and_drains_on_close():
+    collection = RecordingCollection()
+    writer = BatchWriter("test", lambda: collection, flush_size=100, flush_interval=0.05)
+
+    writer.add({"i": 1})
+    await asyncio.sleep(0.1)
+    assert collection.batches == [[{"i": 1}]]
+
+    writer.add({"i": 2})
+    await writer.aclose()
+    assert collection.batches[-1] == [{"i": 2}]
+    assert writer.get_stats()["written"] == 2
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_bounded():
+    collection = RecordingCollection()
+    writer = BatchWriter("test", lambda: collection, flush_size=100, flush_interval=60, max_buffer=2)
+
+    for i in range(5):
+        writer.add({"i": i})
+
+    assert writer.get_stats()["dropped"] == 3
+    await writer.aclose()
+    assert collection.batches == [[{"i": 3}, {"i": 4}]]
+
+
+@pytest.mark.asyncio
+async def test_records_after_close_are_counted_as_dropped():
+    collection = RecordingCollection()
+    writer = BatchWriter("test", lambda: collection, flush_size=100, flush_interval=60)
+    writer.add({"i": 1})
+    await writer.aclose()
+
+    writer.add({"i": 2})
+
+    stats = writer.get_stats()
+    assert stats["dropped"] == 1
+    assert stats["pending"] == 0
+    assert collection.batches == [[{"i": 1}]]
+
+
+@pytest.mark.asyncio
+async def test_batch_without_database_is_counted_as_dropped():
+    writer = BatchWriter("test", lambda: None, flush_size=100, flush_interval=60)
+    writer.add({"i": 1})
+    writer.add({"i": 2})
+
+    await writer.aclose()
+
+    stats = writer.get_stats()
+    assert stats["dropped"] == 2
+    assert stats["written"] == 0
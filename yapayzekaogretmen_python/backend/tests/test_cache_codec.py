@@ -0,0 +1,97 @@
+"""
+Cache Codec Tests
+----------------
+Type-tagged serialization, compression and legacy payload decoding.
+"""
+import json
+import pickle
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.services.cache_codec import (
+    CODECS,
+    FLAG_ZSTD,
+    TAG_PICKLE,
+    TAG_TEXT,
+    ValueSerializer,
+    ZSTD_AVAILABLE,
+)
+
+
+@pytest.mark.parametrize("codec", sorted(name for name in CODECS if name != "pickle"))
+@pytest.mark.parametrize("value", [
+    {"name": "Ayşe", "xp": 120, "badges": ["ilk_ders"]},
+    [1, 2.5, None, True],
+    "Merhaba dünya",
+    42,
+    3.5,
+])
+def test_round_trip(codec, value):
+    serializer = ValueSerializer(codec, compression_threshold=None)
+    assert serializer.loads(serializer.dumps(value)) == value
+
+
+def test_numbers_are_untagged_for_incrby():
+    serializer = ValueSerializer("json")
+    assert serializer.dumps(7) == b"7"
+    assert serializer.loads(b"8") == 8
+
+
+@pytest.mark.parametrize("codec", sorted(name for name in CODECS if name != "pickle"))
+@pytest.mark.parametrize("value", [
+    {"last_login": datetime(2024, 9, 1, 8, 30)},
+    {"session": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+    {"range": (1, 5)},
+])
+def test_unsupported_types_fall_back_to_pickle(codec, value):
+    serializer = ValueSerializer(codec, compression_threshold=None)
+
+    encoded = serializer.dumps(value)
+
+    assert encoded[0] == TAG_PICKLE
+    assert serializer.loads(encoded) == value
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_large_payloads_are_compressed():
+    serializer = ValueSerializer("json", compression_threshold=64)
+    value = "Kesirler bir bütünün eşit parçalarıdır. " * 100
+
+    encoded = serializer.dumps(value)
+
+    assert encoded[0] == TAG_TEXT | FLAG_ZSTD
+    assert len(encoded) < len(value.encode("utf-8"))
+    assert serializer.loads(encoded) == value
+
+
+def test_legacy_payloads_are_still_readable():
+    serializer = ValueSerializer("json")
+    legacy_json = json.dumps({"grade": 5}).encode("utf-8")
+    legacy_pickle = pickle.dumps({1, 2}).hex().encode("ascii")
+
+    assert serializer.loads(legacy_json) == {"grade": 5}
+    assert serializer.loads(legacy_pickle) == {1, 2}
+    assert serializer.loads(b"plain text") == "plain text"
+
+
+def test_json_rejects_non_string_keys():
+    serializer = ValueSerializer("json", compression_threshold=None)
+    value = [{"grades": {5: "matematik"}}]
+
+    encoded = serializer.dumps(value)
+
+    assert encoded[0] == TAG_PICKLE
+    assert serializer.loads(encoded) == value
+
+
+def test_default_codec_round_trips_with_original_types():
+    serializer = ValueSerializer(settings.CACHE_CODEC)
+    value = {"scores": (90, 85), "tags": ["kesir"], "by_grade": {5: b"\x00"}}
+
+    decoded = serializer.loads(serializer.dumps(value))
+
+    assert decoded == value
+    assert type(decoded["scores"]) is tuple
@@ -0,0 +1,310 @@
+"""
+Cache Service Tests
+------------------
+L1 tier, @cached stampede protection, tag invalidation, bulk operations,
+rate limiting and metrics.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services import cache_service
+from app.services.cache_metrics import CacheMetrics
+from app.services.cache_service import LocalCache, cached
+
+
+def test_l1_lru_eviction_is_per_namespace():
+    l1 = LocalCache(max_entries=2, ttl=30)
+    l1.set("user", "a", "1")
+    l1.set("user", "b", "2")
+    l1.set("lesson", "x", "9")
+    assert l1.get("user", "a") == "1"  # a en yeni oldu
+
+    l1.set("user", "c", "3")
+
+    assert l1.get("user", "b") is None
+    assert l1.get("user", "a") == "1"
+    assert l1.get("lesson", "x") == "9"
+    stats = l1.get_stats()
+    assert stats["user"]["evictions"] == 1
+    assert stats["user"]["hits"] == 2
+    assert stats["user"]["misses"] == 1
+
+
+def test_l1_ttl_is_capped_and_invalidation_drops_keys():
+    l1 = LocalCache(max_entries=10, ttl=0.05)
+    l1.set("user", "a", "1", ttl=3600)
+    l1.set("user", "b", "2")
+
+    l1.invalidate("user", ["b"])
+    assert l1.get("user", "b") is None
+    assert l1.get("user", "a") == "1"
+
+    time.sleep(0.06)
+    assert l1.get("user", "a") is None
+
+    l1.set("user", "c", "3")
+    l1.invalidate("user")
+    assert l1.get("user", "c") is None
+
+
+@pytest.fixture
+def fake_cache(monkeypatch):
+    store = {}
+
+    async def fake_get(key, namespace="temp"):
+        return store.get((namespace, key))
+
+    async def fake_set(key, value, ttl=None, namespace="temp"):
+        store[(namespace, key)] = value
+        return True
+
+    async def fake_get_tag_versions(tags):
+        return {tag: store.get(("tags", tag), 0) for tag in tags}
+
+    async def fake_invalidate_tags(*tags):
+        for tag in tags:
+            store[("tags", tag)] = store.get(("tags", tag), 0) + 1
+        return True
+
+    monkeypatch.setattr(cache_service.cache, "get", fake_get)
+    monkeypatch.setattr(cache_service.cache, "set", fake_set)
+    monkeypatch.setattr(cache_service.cache, "get_tag_versions", fake_get_tag_versions)
+    monkeypatch.setattr(cache_service.cache, "invalidate_tags", fake_invalidate_tags)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_cached_single_flight_computes_once(fake_cache):
+    calls = 0
+
+    @cached(namespace="temp", ttl=60, beta=0)
+    async def leaderboard(grade):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [grade, calls]
+
+    results = await asyncio.gather(*(leaderboard(5) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result == [5, 1] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cached_serves_stale_and_refreshes_in_background(fake_cache):
+    calls = 0
+
+    @cached(namespace="temp", ttl=60, stale_ttl=60, beta=0)
+    async def dashboard():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await dashboard() == 1
+    entry = fake_cache[("temp", "dashboard")]
+    entry["exp"] = time.time() - 1  # mantıksal süre doldu
+
+    assert await dashboard() == 1  # bayat değer hemen döner
+    await asyncio.sleep(0.01)
+    assert calls == 2
+    assert await dashboard() == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_negative_caching(fake_cache):
+    calls = 0
+
+    @cached(namespace="temp", ttl=60, beta=0, cache_none=True, negative_ttl=5)
+    async def find_user(user_id):
+        nonlocal calls
+        calls += 1
+        return None
+
+    assert await find_user("missing") is None
+    assert await find_user("missing") is None
+    assert calls == 1
+    assert fake_cache[("temp", "find_user:missing")]["v"] is None
+
+
+@pytest.mark.asyncio
+async def test_tag_invalidation_only_affects_tagged_entries(fake_cache):
+    calls = {}
+
+    @cached(namespace="user", ttl=60, beta=0, tags=["user:{user_id}"])
+    async def profile(user_id, detailed=False):
+        calls[user_id] = calls.get(user_id, 0) + 1
+        return {"id": user_id, "version": calls[user_id]}
+
+    await profile("1")
+    await profile("2")
+    await cache_service.cache.invalidate_tags("user:1")
+
+    assert (await profile("1"))["version"] == 2
+    assert (await profile("2"))["version"] == 1
+    assert fake_cache[("user", "profile:1")]["tags"] == {"user:1": 1}
+
+
+class RecordingRedis:
+    """Minimal async Redis double that counts round-trips."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return RecordingPipeline(self)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    async def publish(self, channel, message):
+        return 0
+
+
+class RecordingPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    def set(self, key, value):
+        self.commands.append((key, None, value))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        for key, ttl, value in self.commands:
+            self.redis.data[key] = value
+            self.redis.ttls[key] = ttl
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_use_single_round_trip():
+    service = cache_service.CacheService()
+    service.client = RecordingRedis()
+    service.is_connected = True
+    service.l1_namespaces = set()
+
+    await service.set_many(
+        {"a": {"x": 1}, "b": "metin", "c": 3},
+        ttl={"a": 60, "b": 120},
+        namespace="translations"
+    )
+    values = await service.get_many(["a", "b", "c", "missing"], namespace="translations")
+
+    assert service.client.round_trips == 2
+    assert values == {"a": {"x": 1}, "b": "metin", "c": 3}
+    assert service.client.ttls["translations:a"] == 60
+    assert service.client.ttls["translations:c"] == service.default_ttl
+
+
+class FlakyRedis:
+    def __init__(self, failures):
+        self.failures = failures
+
+    async def ping(self):
+        if self.failures["left"]:
+            self.failures["left"] -= 1
+            raise ConnectionError("redis hazır değil")
+        return True
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_is_retried_instead_of_falling_back_to_memory(monkeypatch):
+    failures = {"left": 2}
+    monkeypatch.setattr(cache_service.redis, "from_url", lambda *a, **kw: FlakyRedis(failures))
+    monkeypatch.setattr(cache_service.settings, "CACHE_BACKEND", "auto")
+    monkeypatch.setattr(cache_service.settings, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(cache_service.settings, "CACHE_RECONNECT_INTERVAL", 0.01)
+    service = cache_service.CacheService()
+    service.l1_namespaces = set()
+
+    await service.connect()
+    assert not service.is_connected
+    assert service.backend == "none"
+
+    await asyncio.wait_for(service._reconnect_task, timeout=1)
+    assert service.is_connected
+    assert service.backend == "redis"
+    await service.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_default_backend_uses_memory_only_for_single_worker(monkeypatch):
+    monkeypatch.setattr(cache_service.redis, "from_url", lambda *a, **kw: FlakyRedis({"left": 1}))
+    monkeypatch.setattr(cache_service.settings, "WEB_CONCURRENCY", 1)
+    service = cache_service.CacheService()
+    service.l1_namespaces = set()
+
+    assert type(cache_service.settings).model_fields["CACHE_BACKEND"].default == "auto"
+    monkeypatch.setattr(cache_service.settings, "CACHE_BACKEND", "auto")
+    await service.connect()
+
+    assert service.backend == "memory"
+    assert service._reconnect_task is None
+    await service.disconnect()
+
+@pytest.mark.asyncio
+async def test_rate_limiter_leases_tokens_locally(monkeypatch):
+    calls = []
+    budget = {"left": 12}
+
+    async def fake_run_script(name, source, keys, args):
+        calls.append(args)
+        granted = min(args[2], budget["left"])
+        budget["left"] -= granted
+        if granted == 0:
+            return [0, 0, 1500]
+        return [granted, budget["left"], 0]
+
+    monkeypatch.setattr(cache_service.cache, "is_connected", True)
+    monkeypatch.setattr(cache_service.cache, "run_script", fake_run_script)
+
+    limiter = cache_service.RateLimiter(max_requests=100, window_seconds=60, local_lease=5, name="test")
+    results = [await limiter.acquire("user:1") for _ in range(13)]
+
+    assert [allowed for allowed, _, _ in results] == [True] * 12 + [False]
+    assert len(calls) == 4  # 5 + 5 + 2 hak, ardından ret
+    assert results[-1][2] == 1.5
+    assert limiter.stats["local_hits"] == 9
+
+
+def test_cache_metrics_per_namespace_and_prometheus():
+    metrics = CacheMetrics(key_sample_rate=1.0, top_keys_capacity=10)
+    metrics.record_get("user", "profile:1", 120, 0.002)
+    metrics.record_get("user", "profile:2", 0, 0.001)
+    metrics.record_set("translations", "tr:en:abc", 900, 0.003)
+    metrics.record_error("user")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["user"]["hits"] == 1
+    assert snapshot["user"]["misses"] == 1
+    assert snapshot["user"]["errors"] == 1
+    assert snapshot["user"]["hit_ratio"] == 0.5
+    assert snapshot["translations"]["bytes_written"] == 900
+
+    top = metrics.top_keys(1)
+    assert top["by_size"][0]["key"] == "tr:en:abc"
+
+    text = metrics.prometheus()
+    assert 'cache_hits_total{namespace="user"} 1' in text
+    assert 'cache_get_latency_seconds_bucket{namespace="user",le="+Inf"} 2' in text
+
+
+def test_top_keys_table_stays_bounded():
+    metrics = CacheMetrics(key_sample_rate=1.0, top_keys_capacity=50)
+    for i in range(500):
+        metrics.record_get("temp", f"key:{i}", 10)
+    for _ in range(5):
+        metrics.record_get("temp", "hot", 10)
+
+    assert len(metrics._keys) <= 50
+    assert metrics.top_keys(1)["by_frequency"][0]["key"] == "hot"
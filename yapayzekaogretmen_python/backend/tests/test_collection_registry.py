@@ -0,0 +1,89 @@
+"""
+Collection Registry Tests
+------------------------
+(grade, subject) index of vector collections and registry-backed routing.
+"""
+import pytest
+
+from app.services import vector_db_service
+from app.services.collection_registry import CollectionRegistry, collection_registry, parse_collection_name
+from app.services.vector_db_service import VectorDBService
+
+
+def test_parse_collection_name():
+    assert parse_collection_name("grade_5_matematik") == (5, "matematik")
+    assert parse_collection_name("grade_5_Matematik_1a2b3c4d") == (5, "matematik")
+    assert parse_collection_name("grade_10_fen_bilimleri_1a2b3c4d") == (10, "fen_bilimleri")
+    assert parse_collection_name("ozel_koleksiyon") is None
+
+
+def test_register_find_and_unregister():
+    registry = CollectionRegistry()
+    registry.replace([("grade_5_matematik_1a2b3c4d", "chroma"), ("notlar", "faiss")])
+
+    assert registry.find(5, "Matematik") == ["grade_5_matematik_1a2b3c4d"]
+    assert registry.kind("notlar") == "faiss"
+
+    # Addan çözülemeyen koleksiyon açık sınıf/ders ile indekslenir
+    registry.register("ozel", "chroma", grade=5, subject="matematik")
+    assert sorted(registry.find(5, "matematik")) == ["grade_5_matematik_1a2b3c4d", "ozel"]
+
+    registry.unregister("ozel")
+    assert registry.find(5, "matematik") == ["grade_5_matematik_1a2b3c4d"]
+    assert registry.kind("ozel") is None
+    assert registry.get_stats()["collections"] == 2
+
+
+def test_replace_keeps_explicit_keys_and_marks_fresh():
+    registry = CollectionRegistry(refresh_interval=60)
+    assert registry.is_stale()
+
+    registry.register("ozel", "chroma", grade=6, subject="fen")
+    registry.replace([("ozel", "chroma")])
+
+    assert not registry.is_stale()
+    assert registry.find(6, "fen") == ["ozel"]
+
+
+class CountingChromaClient:
+    def __init__(self, names):
+        self.names = names
+        self.scans = 0
+
+    def list_collections(self):
+        self.scans += 1
+        return [type("Collection", (), {"name": name, "id": f"id-{name}"})() for name in self.names]
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(collection_registry, "_loaded_at", None)
+    monkeypatch.setattr(collection_registry, "_forced_at", None)
+    monkeypatch.setattr(vector_db_service, "Chroma", lambda **kwargs: object())
+    instance = VectorDBService.__new__(VectorDBService)
+    instance.chroma_client = CountingChromaClient(["grade_5_matematik_1a2b3c4d", "grade_5_matematik__staging"])
+    instance.faiss_path = tmp_path
+    instance.embeddings = None
+    instance.collections = {}
+    return instance
+
+
+def test_queries_do_not_rescan_until_stale(service):
+    assert service.find_collections(5, "matematik") == ["grade_5_matematik_1a2b3c4d"]
+    assert service.find_collections(5, "matematik") == ["grade_5_matematik_1a2b3c4d"]
+    assert service.list_collections() == ["grade_5_matematik_1a2b3c4d"]
+    assert service.chroma_client.scans == 1
+
+    # Yüklemede tip kayıttan gelir, yeniden taranmaz
+    assert service._load_collection("grade_5_matematik_1a2b3c4d")
+    assert service.chroma_client.scans == 1
+
+    # Bilinmeyen ad, son taramadan hemen sonra yeniden taratmaz
+    assert not service._load_collection("grade_6_fen")
+    assert service.chroma_client.scans == 1
+
+    # Aralık geçince bir kez taranır; tekrarlayan istekler taramaz
+    collection_registry._loaded_at -= collection_registry.min_forced_interval
+    assert not service._load_collection("grade_6_fen")
+    assert not service._load_collection("grade_6_fen")
+    assert service.chroma_client.scans == 2
@@ -0,0 +1,71 @@
+"""
+Conversation History Tests
+-------------------------
+Token-budget trimming and incremental per-session summaries.
+"""
+import pytest
+
+from app.services import conversation_history
+from app.services.conversation_history import ConversationHistoryManager
+from app.services.token_counter import count_message_tokens
+
+
+def _history(count: int):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Mesaj {i}. Kesirler hakkında konuşuyoruz."}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fit_keeps_newest_messages_within_budget():
+    manager = ConversationHistoryManager(max_history_tokens=1000, summary_max_tokens=200)
+    history = _history(20)
+    budget = count_message_tokens(history[-4:], "gpt-4")
+
+    trimmed = await manager.fit(history, "gpt-4", budget)
+
+    assert trimmed.messages == history[-4:]
+    assert trimmed.dropped == 16
+    assert trimmed.summary.startswith("- Öğrenci: Mesaj 0.")
+
+
+@pytest.mark.asyncio
+async def test_oversized_latest_message_is_truncated():
+    manager = ConversationHistoryManager(max_history_tokens=1000, summary_max_tokens=200)
+    pasted = {"role": "user", "content": "Ödev metni. " * 2000}
+
+    trimmed = await manager.fit([pasted], "gpt-4", 100)
+
+    assert len(trimmed.messages) == 1
+    assert trimmed.messages[0]["content"].endswith("[...]")
+    assert count_message_tokens(trimmed.messages, "gpt-4") <= 110
+
+
+@pytest.mark.asyncio
+async def test_session_summary_is_updated_incrementally(monkeypatch):
+    store = {}
+
+    async def fake_get(key, namespace="temp"):
+        return store.get((namespace, key))
+
+    async def fake_set(key, value, ttl=None, namespace="temp"):
+        store[(namespace, key)] = value
+        return True
+
+    monkeypatch.setattr(conversation_history.cache, "get", fake_get)
+    monkeypatch.setattr(conversation_history.cache, "set", fake_set)
+
+    manager = ConversationHistoryManager(max_history_tokens=1000, summary_max_tokens=500)
+    history = _history(10)
+    budget = count_message_tokens(history[-2:], "gpt-4")
+
+    await manager.fit(history, "gpt-4", budget, session_id="s1")
+    state = store[("session", "history_summary:s1")]
+    assert state["summarized"] == 8
+
+    history += _history(12)[10:]
+    trimmed = await manager.fit(history, "gpt-4", budget, session_id="s1")
+    state = store[("session", "history_summary:s1")]
+    assert state["summarized"] == 10
+    assert len(trimmed.summary.splitlines()) == 10
@@ -0,0 +1,66 @@
+"""
+Embedding Cache Tests
+--------------------
+Content-hash keyed, float16 persisted document embeddings with batching.
+"""
+import numpy as np
+
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+
+class CountingEmbeddings:
+    """Metin uzunluğundan vektör üreten ve çağrıları kaydeden sahte model"""
+
+    model_name = "fake-mini"
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 0.5, 1.0 / 3] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 0.5, 0.0]
+
+
+def test_only_new_chunks_are_embedded(tmp_path):
+    base = CountingEmbeddings()
+    store = EmbeddingStore(tmp_path / "embeddings.sqlite3")
+    embeddings = CachedEmbeddings(base, store, batch_size=2)
+
+    first = embeddings.embed_documents(["kesirler", "ondalık", "kesirler", "oran"])
+    # Tekrarlanan parça bir kez, 2'lik batch'lerle gönderilir
+    assert base.batches == [["kesirler", "ondalık"], ["oran"]]
+    assert first[0] == first[2]
+    assert store.count() == 3
+
+    # Güncellenen PDF: yalnızca değişen parça yeniden vektörleştirilir
+    second = embeddings.embed_documents(["kesirler", "yüzdeler", "oran"])
+    assert base.batches[-1] == ["yüzdeler"]
+    assert second[0] == first[0]
+    assert embeddings.get_stats()["hits"] == 2
+
+
+def test_vectors_persist_as_float16_across_instances(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    computed = CachedEmbeddings(CountingEmbeddings(), EmbeddingStore(path)).embed_documents(["açı"])
+
+    base = CountingEmbeddings()
+    reloaded = CachedEmbeddings(base, EmbeddingStore(path)).embed_documents(["açı"])
+
+    assert base.batches == []
+    assert reloaded == computed
+    assert reloaded[0][2] == float(np.float16(1.0 / 3))
+
+
+def test_cache_is_scoped_per_model(tmp_path):
+    store = EmbeddingStore(tmp_path / "embeddings.sqlite3")
+    CachedEmbeddings(CountingEmbeddings(), store).embed_documents(["üçgen"])
+
+    other = CountingEmbeddings()
+    other.model_name = "fake-large"
+    CachedEmbeddings(other, store).embed_documents(["üçgen"])
+
+    assert other.batches == [["üçgen"]]
+    assert store.count("CountingEmbeddings:fake-large") == 1
@@ -0,0 +1,103 @@
+"""
+Managed Executor Tests
+---------------------
+Named thread/process pools, bounded queues and queue-depth metrics.
+"""
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.services.executor_service import ManagedExecutor, PoolSaturatedError
+
+
+@pytest.fixture
+def executor():
+    managed = ManagedExecutor(
+        pools={
+            "io": {"kind": "thread", "workers": 2, "max_queue": 4},
+            "single": {"kind": "thread", "workers": 1, "max_queue": 0},
+            "cpu": {"kind": "process", "workers": 1, "max_queue": 2},
+        },
+        queue_timeout=0.05,
+    )
+    yield managed
+    managed.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_runs_off_loop_and_records_stats(executor):
+    loop_thread = threading.get_ident()
+
+    results = await asyncio.gather(*(executor.run("io", threading.get_ident) for _ in range(5)))
+
+    assert loop_thread not in results
+    stats = executor.get_stats()["io"]
+    assert stats["kind"] == "thread"
+    assert stats["completed"] == 5
+    assert stats["queue_depth"] == 0
+    assert stats["queue_wait"]["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_after_timeout(executor):
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    first = asyncio.create_task(executor.run("single", blocking))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+    assert executor.get_stats()["single"]["running"] == 1
+    with pytest.raises(PoolSaturatedError):
+        await executor.run("single", lambda: "late")
+
+    release.set()
+    assert await first == "done"
+    stats = executor.get_stats()["single"]
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_propagate_and_are_counted(executor):
+    def broken():
+        raise ValueError("bozuk")
+
+    with pytest.raises(ValueError):
+        await executor.run("io", broken)
+
+    assert executor.get_stats()["io"]["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_pool(executor):
+    assert await executor.run("cpu", pow, 2, 10) == 1024
+    assert await executor.run("cpu", pow, 3, 3) == 27
+    assert executor.get_stats()["cpu"]["kind"] == "process"
+    assert executor.get_stats()["cpu"]["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_pool_falls_back_to_thread_pool(executor):
+    assert await executor.run("misc", sum, [1, 2, 3]) == 6
+    assert executor.get_stats()["misc"]["kind"] == "thread"
+
+
+def test_worker_package_does_not_import_services():
+    # Spawn edilen worker'lar servis singleton'larını kurmamalı
+    script = "import sys, app.workers.timing; print('app.services' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,216 @@
+"""
+LLM Provider Tests
+-----------------
+Async provider layer tests against a local stub provider.
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.llm_providers import (
+    HuggingFaceProvider,
+    OpenAICompatibleProvider,
+    ProviderError,
+)
+
+
+class StubProvider:
+    """OpenAI uyumlu yerel sahte sağlayıcı"""
+
+    def __init__(self, delay: float = 0.0, status_code: int = 200):
+        self.delay = delay
+        self.status_code = status_code
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, json={"error": {"message": "stub error"}})
+
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "Kesir, bir bütünün parçasıdır."},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 8, "total_tokens": 20}
+        })
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+
+def _messages():
+    return [{"role": "user", "content": "Kesir nedir?"}]
+
+
+@pytest.mark.asyncio
+async def test_openai_compatible_provider_returns_normalized_response():
+    stub = StubProvider()
+    provider = OpenAICompatibleProvider(
+        name="deepseek",
+        api_key="test",
+        base_url="http://stub.local/v1",
+        max_concurrency=4,
+        http_client=stub.client(),
+    )
+
+    response = await provider.chat(_messages(), "deepseek-chat")
+
+    assert response.content == "Kesir, bir bütünün parçasıdır."
+    assert response.provider == "deepseek"
+    assert response.model == "deepseek-chat"
+    assert response.total_tokens == 20
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_concurrency_limit_is_respected():
+    stub = StubProvider(delay=0.05)
+    provider = OpenAICompatibleProvider(
+        name="openai",
+        api_key="test",
+        base_url="http://stub.local/v1",
+        max_concurrency=3,
+        http_client=stub.client(),
+    )
+
+    results = await asyncio.gather(*[
+        provider.chat(_messages(), "gpt-3.5-turbo") for _ in range(20)
+    ])
+
+    assert len(results) == 20
+    assert stub.calls == 20
+    assert stub.max_in_flight <= 3
+    assert provider.in_flight == 0
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_error_is_wrapped():
+    stub = StubProvider(status_code=500)
+    provider = OpenAICompatibleProvider(
+        name="deepseek",
+        api_key="test",
+        base_url="http://stub.local/v1",
+        max_concurrency=2,
+        http_client=stub.client(),
+    )
+
+    with pytest.raises(ProviderError):
+        await provider.chat(_messages(), "deepseek-chat")
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b"<html>Service Unavailable</html>", b"[]", b'["metin"]'])
+async def test_malformed_provider_response_is_wrapped(body):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body)
+
+    provider = HuggingFaceProvider(
+        api_key="",
+        max_concurrency=2,
+        model_url="http://stub.local/models/test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    with pytest.raises(ProviderError):
+        await provider.chat(_messages(), "test")
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_huggingface_provider_extracts_teacher_answer():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[{"generated_text": "Öğrenci: Kesir nedir?\nÖğretmen: Bir bütünün parçası."}])
+
+    provider = HuggingFaceProvider(
+        api_key="",
+        max_concurrency=2,
+        model_url="http://stub.local/models/test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    response = await provider.chat(_messages(), "test")
+
+    assert response.content == "Bir bütünün parçası."
+    assert response.provider == "huggingface"
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_openai_compatible_provider_streams_tokens():
+    tokens = ["Kesir", ", bir", " bütünün", " parçasıdır."]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        assert body["stream"] is True
+        lines = []
+        for token in tokens:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            lines.append(f"data: {json.dumps(chunk)}\n\n")
+        lines.append("data: [DONE]\n\n")
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            content="".join(lines).encode()
+        )
+
+    provider = OpenAICompatibleProvider(
+        name="deepseek",
+        api_key="test",
+        base_url="http://stub.local/v1",
+        max_concurrency=2,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    received = [chunk async for chunk in provider.stream(_messages(), "deepseek-chat")]
+
+    assert received == tokens
+    assert provider.in_flight == 0
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_reports_queue_wait_and_generation_time():
+    stub = StubProvider(delay=0.05)
+    provider = OpenAICompatibleProvider(
+        name="deepseek",
+        api_key="test",
+        base_url="http://stub.local/v1",
+        max_concurrency=1,
+        http_client=stub.client(),
+    )
+
+    first, second = await asyncio.gather(
+        provider.chat(_messages(), "deepseek-chat"),
+        provider.chat(_messages(), "deepseek-chat"),
+    )
+
+    assert min(first.generation_time, second.generation_time) >= 0.05
+    # Tek slot olduğu için ikinci istek kuyrukta bekler
+    assert max(first.queue_wait, second.queue_wait) >= 0.04
+    await provider.aclose()
@@ -0,0 +1,52 @@
+"""
+Loop Monitor Tests
+-----------------
+Event-loop lag histogram and slow-callback detection with stack samples.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.loop_monitor import LoopMonitor
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_logged_with_stack():
+    monitor = LoopMonitor(interval=0.05, slow_threshold=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        _blocking_handler()
+        await asyncio.sleep(0.2)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.get_stats()
+    assert stats["slow_callbacks"]["count"] >= 1
+    event = stats["slow_callbacks"]["recent"][0]
+    assert event["duration_ms"] >= 250
+    assert any("_blocking_handler" in frame for frame in event["stack"])
+
+    assert stats["lag"]["max_ms"] >= 200
+    assert stats["lag"]["histogram"]["count"] > 0
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_has_no_slow_callbacks():
+    monitor = LoopMonitor(interval=0.02, slow_threshold=0.2)
+    monitor.start()
+    assert monitor.running
+    try:
+        await asyncio.sleep(0.15)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.get_stats()
+    assert not stats["running"]
+    assert stats["slow_callbacks"]["count"] == 0
+    assert stats["lag"]["histogram"]["count"] >= 3
@@ -0,0 +1,88 @@
+"""
+Memory Cache Backend Tests
+-------------------------
+CacheService running on the in-process backend without Redis.
+"""
+import asyncio
+
+import pytest
+
+from app.services import cache_service
+from app.services.cache_service import CacheService, RateLimiter
+
+
+@pytest.fixture
+async def memory_cache(monkeypatch):
+    service = CacheService()
+    service.use_memory_backend()
+    monkeypatch.setattr(cache_service, "cache", service)
+    yield service
+    await service.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_values_ttl_and_counters(memory_cache):
+    await memory_cache.set("profile", {"name": "Ayşe"}, ttl=60, namespace="user")
+    await memory_cache.set("forever", "kalıcı", ttl=0)
+
+    assert await memory_cache.get("profile", "user") == {"name": "Ayşe"}
+    assert 0 < await memory_cache.get_ttl("profile", "user") <= 60
+    assert await memory_cache.get_ttl("forever") is None
+
+    assert await memory_cache.increment("views") == 1
+    assert await memory_cache.increment("views", 4) == 5
+
+    assert await memory_cache.set_many({"a": 1, "b": [1, 2]}, namespace="batch")
+    assert await memory_cache.get_many(["a", "b", "c"], namespace="batch") == {"a": 1, "b": [1, 2]}
+
+
+@pytest.mark.asyncio
+async def test_expiry_and_sweeper(memory_cache):
+    await memory_cache.set("short", "x", ttl=1)
+    memory_cache.client._expires["temp:short"] -= 2  # süreyi geçmişe al
+
+    assert memory_cache.client.sweep() == 1
+    assert await memory_cache.get("short") is None
+
+
+@pytest.mark.asyncio
+async def test_lists_sets_and_namespace_clear(memory_cache):
+    await memory_cache.lpush("activities", {"action": "login"}, {"action": "quiz"}, namespace="analytics")
+    await memory_cache.sadd("online", "u1", "u2", "u1", namespace="session")
+
+    assert await memory_cache.lrange("activities", 0, 0, namespace="analytics") == [{"action": "quiz"}]
+    assert await memory_cache.smembers("online", namespace="session") == {"u1", "u2"}
+
+    await memory_cache.set("k1", 1, namespace="gamification")
+    await memory_cache.set("k2", 2, namespace="gamification")
+    assert await memory_cache.clear_namespace("gamification") == 2
+    assert await memory_cache.exists("online", namespace="session")
+
+
+@pytest.mark.asyncio
+async def test_locks_and_rate_limiter_scripts(memory_cache):
+    token = await memory_cache.acquire_lock("rebuild", ttl=5)
+    assert token
+    assert await memory_cache.acquire_lock("rebuild", ttl=5) is None
+    assert not await memory_cache.release_lock("rebuild", "someone-else")
+    assert await memory_cache.release_lock("rebuild", token)
+
+    limiter = RateLimiter(max_requests=3, window_seconds=60, name="memory-test")
+    results = [await limiter.check_rate_limit("ip:1") for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_cached_decorator_uses_memory_backend(memory_cache):
+    calls = 0
+
+    @cache_service.cached(namespace="lesson", ttl=60, beta=0)
+    async def lesson(lesson_id):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return {"id": lesson_id}
+
+    assert await lesson("mat-5") == {"id": "mat-5"}
+    assert await lesson("mat-5") == {"id": "mat-5"}
+    assert calls == 1
@@ -0,0 +1,92 @@
+"""
+Prompt Template Tests
+--------------------
+Compiled prompt reuse, byte-stable prefixes and cached token counting.
+"""
+from app.services import token_counter
+from app.services.ai_service import ai_service
+from app.services.prompt_templates import PromptTemplateRegistry
+
+
+def test_registry_compiles_each_key_once():
+    registry = PromptTemplateRegistry(max_entries=2)
+    calls = []
+
+    def builder():
+        calls.append(1)
+        return "prompt"
+
+    assert registry.get_or_compile(("tutor", 5, "matematik"), builder) == "prompt"
+    assert registry.get_or_compile(("tutor", 5, "matematik"), builder) == "prompt"
+    assert len(calls) == 1
+
+    registry.get_or_compile(("tutor", 6, "fen"), builder)
+    registry.get_or_compile(("tutor", 7, "fen"), builder)
+    stats = registry.get_stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1
+
+
+def test_tutor_prompt_prefix_is_stable_across_students():
+    first = ai_service._create_system_prompt(5, "matematik", "Ayşe")
+    second = ai_service._create_system_prompt(5, "matematik", "Mehmet")
+
+    assert first != second
+    prefix = first.split("Öğrencinin adı")[0]
+    assert len(prefix) > 500
+    assert second.startswith(prefix)
+    assert ai_service._create_system_prompt(5, "matematik", "Ayşe") == first
+
+
+def test_placeholder_prompt_is_shared_across_students():
+    first = ai_service._create_system_prompt(5, "matematik", "Ayşe", name_placeholder=True)
+    second = ai_service._create_system_prompt(5, "matematik", "Mehmet", name_placeholder=True)
+
+    assert first == second
+    assert "Ayşe" not in first
+    messages = [{"role": "system", "content": first}, {"role": "user", "content": "Kesir nedir?"}]
+    assert ai_service._request_fingerprint(messages, "deepseek-chat", "deepseek") == \
+        ai_service._request_fingerprint(list(messages), "deepseek-chat", "deepseek")
+
+    shared = "Merhaba {ogrenci_adi}, kesir bir bütünün parçasıdır."
+    assert ai_service._personalize(shared, "Mehmet") == "Merhaba Mehmet, kesir bir bütünün parçasıdır."
+
+
+def test_token_counts_are_cached():
+    text = "Kesirler bir bütünün eşit parçalarını gösterir."
+    before = token_counter.get_stats()["hits"]
+
+    first = token_counter.count_tokens(text, "gpt-4")
+    second = token_counter.count_tokens(text, "gpt-4")
+
+    assert first == second > 0
+    assert token_counter.get_stats()["hits"] > before
+    assert token_counter.count_message_tokens(
+        [{"role": "user", "content": text}], "gpt-4"
+    ) == first + token_counter.MESSAGE_OVERHEAD_TOKENS
+
+
+class OfflineTiktoken:
+    """BPE dosyasını indiremeyen tiktoken"""
+
+    @staticmethod
+    def encoding_for_model(model):
+        raise KeyError(model)
+
+    @staticmethod
+    def get_encoding(name):
+        raise ConnectionError("openaipublic.blob.core.windows.net erişilemiyor")
+
+
+def test_token_count_falls_back_when_encoding_cannot_load(monkeypatch):
+    monkeypatch.setattr(token_counter, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(token_counter, "tiktoken", OfflineTiktoken, raising=False)
+    for cached in (token_counter._encoding_name, token_counter._get_encoding):
+        cached.cache_clear()
+
+    try:
+        assert token_counter.count_tokens("Kesirler bir bütünün parçasıdır.", "deepseek-chat") == 10
+    finally:
+        for cached in (token_counter._encoding_name, token_counter._get_encoding):
+            cached.cache_clear()
@@ -0,0 +1,90 @@
+"""
+Provider Health Tests
+--------------------
+Circuit breaker state transitions and latency-aware routing inputs.
+"""
+import time
+
+from app.services.provider_health import CircuitBreaker, HedgingPolicy, ProviderHealthRegistry
+
+
+def test_circuit_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker("deepseek", failure_threshold=2, recovery_timeout=0.05)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()  # half-open probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_circuit():
+    breaker = CircuitBreaker("openai", failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_slow_model_detection_requires_min_samples():
+    registry = ProviderHealthRegistry(
+        failure_threshold=3,
+        recovery_timeout=30,
+        latency_window=50,
+        slow_p95_threshold=1.0,
+        min_samples=5,
+    )
+
+    for _ in range(4):
+        registry.record_success("deepseek", "deepseek-chat", 5.0)
+    assert not registry.is_slow("deepseek-chat")
+
+    registry.record_success("deepseek", "deepseek-chat", 5.0)
+    assert registry.is_slow("deepseek-chat")
+
+    snapshot = registry.snapshot()
+    assert snapshot["latency"]["deepseek-chat"]["p50"] == 5.0
+    assert snapshot["circuit_breakers"]["deepseek"]["state"] == "closed"
+
+
+def test_hedge_delay_uses_first_token_percentile():
+    registry = ProviderHealthRegistry(min_samples=3)
+    policy = HedgingPolicy(enabled=True, percentile=95, min_delay=0.1, budget_ratio=0.5)
+
+    assert policy.hedge_delay(registry, "deepseek-chat", first_token=True) is None
+
+    for seconds in (0.2, 0.4, 2.0):
+        registry.record_first_token("deepseek-chat", seconds)
+    assert policy.hedge_delay(registry, "deepseek-chat", first_token=True) == 2.0
+    assert policy.hedge_delay(registry, "deepseek-chat", first_token=False) is None
+
+    policy.enabled = False
+    assert policy.hedge_delay(registry, "deepseek-chat", first_token=True) is None
+
+
+def test_hedge_budget_caps_extra_requests():
+    policy = HedgingPolicy(enabled=True, percentile=95, min_delay=0.1, budget_ratio=0.1)
+
+    for _ in range(10):
+        policy.record_primary()
+    assert policy.has_budget()
+    policy.record_fired()
+    assert not policy.has_budget()
+
+    policy.record_win()
+    snapshot = policy.snapshot()
+    assert snapshot["hedges_fired"] == 1
+    assert snapshot["hedges_won"] == 1
+    assert snapshot["skipped_budget"] == 1
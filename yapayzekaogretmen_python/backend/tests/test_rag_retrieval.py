@@ -0,0 +1,65 @@
+"""
+RAG Retrieval Tests
+------------------
+Concurrent multi-collection search, reciprocal rank fusion and token budget.
+"""
+import asyncio
+import time
+
+import pytest
+from langchain.schema import Document
+
+from app.services.rag_service import RAGService
+from app.services.retrieval_fusion import reciprocal_rank_fusion, truncate_to_token_budget
+
+
+def _doc(text, collection="c1"):
+    return Document(page_content=text, metadata={"collection": collection})
+
+
+def test_rrf_interleaves_by_rank_and_merges_duplicates():
+    fused = reciprocal_rank_fusion([
+        [_doc("kesir tanımı"), _doc("pay ve payda"), _doc("ortak bölen")],
+        [_doc("kesir  tanımı", "c2"), _doc("oran orantı", "c2")],
+    ])
+    texts = [doc.page_content for doc, _ in fused]
+
+    # İki koleksiyonda da birinci olan içerik tek sonuç ve en üstte
+    assert texts[0] == "kesir tanımı"
+    assert len(texts) == 4
+    assert texts.index("pay ve payda") < texts.index("ortak bölen")
+    assert fused[0][1] == pytest.approx(2 / 61, abs=1e-6)
+
+
+def test_token_budget_skips_documents_that_do_not_fit():
+    docs = [_doc("a" * 30), _doc("b" * 90), _doc("c" * 20)]
+    selected = truncate_to_token_budget(docs, max_tokens=55, count_tokens=len)
+    assert [doc.page_content[0] for doc in selected] == ["a", "c"]
+
+
+class SlowVectorService:
+    def __init__(self):
+        self.calls = []
+
+    async def asearch_similar_documents(self, collection_name, query, k=5):
+        self.calls.append(collection_name)
+        await asyncio.sleep(0.1)
+        if collection_name == "broken":
+            raise RuntimeError("index yok")
+        return [_doc(f"{collection_name}-{i}", collection_name) for i in range(k)]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_searches_collections_concurrently():
+    service = RAGService.__new__(RAGService)
+    service.vector_service = SlowVectorService()
+
+    started = time.monotonic()
+    docs = await service.retrieve("kesirler", ["grade_5_a", "grade_5_b", "broken", "grade_5_c"], k=2)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.3
+    assert len(service.vector_service.calls) == 4
+    # Her koleksiyonun birincisi, ikincilerden önce gelir
+    assert {doc.page_content for doc in docs[:3]} == {"grade_5_a-0", "grade_5_b-0", "grade_5_c-0"}
+    assert len(docs) == 6
@@ -0,0 +1,74 @@
+"""
+System Metrics Sampler Tests
+---------------------------
+Background host sampling into a bounded ring buffer.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import system_metrics as system_metrics_module
+from app.services.system_metrics import SystemMetricsSampler
+
+
+class FakePsutil:
+    """Her çağrıda artan CPU değeri döndüren sahte psutil"""
+
+    def __init__(self):
+        self.cpu_calls = []
+
+    def cpu_percent(self, interval=None):
+        self.cpu_calls.append(interval)
+        return float(len(self.cpu_calls))
+
+    def virtual_memory(self):
+        return SimpleNamespace(percent=40.0, used=512 * 1024 * 1024)
+
+    def disk_usage(self, path):
+        return SimpleNamespace(percent=70.0)
+
+    def net_io_counters(self):
+        return SimpleNamespace(bytes_sent=2 * 1024 * 1024, bytes_recv=3 * 1024 * 1024)
+
+    def Process(self, pid):
+        return SimpleNamespace(memory_info=lambda: SimpleNamespace(rss=100 * 1024 * 1024))
+
+
+@pytest.fixture
+def fake_psutil(monkeypatch):
+    fake = FakePsutil()
+    monkeypatch.setattr(system_metrics_module, "psutil", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_snapshot_samples_once_without_blocking(fake_psutil):
+    sampler = SystemMetricsSampler(interval=60, history=3)
+
+    snapshot = await sampler.snapshot()
+
+    assert snapshot["memory_percent"] == 40.0
+    assert snapshot["disk_percent"] == 70.0
+    assert snapshot["network_recv_mb"] == 3.0
+    assert snapshot["process_rss_mb"] == 100.0
+    # CPU hiçbir zaman interval ile beklemez
+    assert fake_psutil.cpu_calls == [None]
+    # İkinci okuma tampondan gelir
+    assert await sampler.snapshot() is snapshot
+
+
+@pytest.mark.asyncio
+async def test_background_task_fills_ring_buffer(fake_psutil):
+    sampler = SystemMetricsSampler(interval=0.01, history=3)
+    sampler.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await sampler.stop()
+
+    series = sampler.series()
+    assert len(series) == 3
+    assert series[-1] == sampler.latest()
+    assert sampler.series(limit=2) == series[-2:]
+    assert series[0]["cpu_percent"] < series[-1]["cpu_percent"]
@@ -0,0 +1,169 @@
+"""
+Vector Ingest Tests
+------------------
+Stable chunk IDs and incremental Chroma upserts for curriculum collections.
+"""
+import pytest
+from langchain.schema import Document
+
+from app.services import vector_db_service
+from app.services.collection_registry import collection_registry
+from app.services.vector_db_service import VectorDBService, chunk_id, with_stable_ids
+
+
+class FakeCollection:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.id = f"id-{name}"
+        self.rows = {}
+
+    def get(self, ids=None, include=None):
+        ids = list(self.rows) if ids is None else [row_id for row_id in ids if row_id in self.rows]
+        return {
+            "ids": ids,
+            "embeddings": [self.rows[row_id][0] for row_id in ids],
+            "documents": [self.rows[row_id][1] for row_id in ids],
+            "metadatas": [self.rows[row_id][2] for row_id in ids],
+        }
+
+    def add(self, ids, embeddings, documents, metadatas):
+        for row in zip(ids, embeddings, documents, metadatas):
+            self.rows[row[0]] = row[1:]
+
+    def modify(self, name):
+        self.client.collections[name] = self.client.collections.pop(self.name)
+        self.name = name
+
+
+class FakeChromaClient:
+    def __init__(self):
+        self.collections = {}
+
+    def create_collection(self, name, embedding_function=None):
+        self.collections[name] = FakeCollection(self, name)
+        return self.collections[name]
+
+    def get_collection(self, name):
+        return self.collections[name]
+
+    def delete_collection(self, name):
+        if name not in self.collections:
+            raise ValueError(f"Collection {name} does not exist.")
+        del self.collections[name]
+
+    def list_collections(self):
+        return list(self.collections.values())
+
+
+class RecordingEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+
+def _doc(text, page=1, source="matematik_5.pdf"):
+    return Document(page_content=text, metadata={"page": page, "source": source, "extraction_method": ["PyPDF2"]})
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(collection_registry, "_loaded_at", None)
+    monkeypatch.setattr(collection_registry, "_forced_at", None)
+    monkeypatch.setattr(vector_db_service, "Chroma", lambda **kwargs: object())
+    instance = VectorDBService.__new__(VectorDBService)
+    instance.chroma_client = FakeChromaClient()
+    instance.faiss_path = tmp_path
+    instance.embeddings = RecordingEmbeddings()
+    instance.collections = {}
+    return instance
+
+
+def test_chunk_ids_are_stable_and_content_addressed():
+    assert chunk_id(_doc("Kesirler")) == chunk_id(_doc("Kesirler"))
+    assert chunk_id(_doc("Kesirler")) != chunk_id(_doc("Kesirler", page=2))
+    assert chunk_id(_doc("Kesirler")) != chunk_id(_doc("Kesirler", source="fen_5.pdf"))
+    assert chunk_id(_doc("Kesirler")) != chunk_id(_doc("Ondalık"))
+
+    assert len(with_stable_ids([_doc("Kesirler"), _doc("Kesirler"), _doc("Oran")])) == 2
+
+
+def test_incremental_ingest_only_touches_changed_chunks(service):
+    first = [_doc("Kesirler"), _doc("Ondalık sayılar"), _doc("Oran", page=2)]
+    assert service.create_or_update_collection("grade_5_matematik_x", first)
+    assert len(service.chroma_client.collections["grade_5_matematik_x__g1"].rows) == 3
+
+    service.embeddings.embedded.clear()
+    updated = [_doc("Kesirler"), _doc("Ondalık gösterim"), _doc("Yüzdeler", page=3)]
+    assert service.create_or_update_collection("grade_5_matematik_x", updated)
+
+    assert sorted(service.embeddings.embedded) == ["Ondalık gösterim", "Yüzdeler"]
+    # Güncelleme yeni nesilde yapılır; eski nesil yayından sonra silinir
+    assert list(service.chroma_client.collections) == ["grade_5_matematik_x__g2"]
+    rows = service.chroma_client.collections["grade_5_matematik_x__g2"].rows
+    assert set(rows) == set(with_stable_ids(updated))
+    assert service.collections["grade_5_matematik_x"]["document_count"] == 3
+    assert collection_registry.version("grade_5_matematik_x") == "grade_5_matematik_x__g2"
+
+    # Chroma'ya yalnızca skaler metadata gider
+    metadata = next(iter(rows.values()))[2]
+    assert metadata["extraction_method"] == '["PyPDF2"]'
+
+    # Değişiklik yoksa yeni nesil kurulmaz
+    assert service.create_or_update_collection("grade_5_matematik_x", updated)
+    assert list(service.chroma_client.collections) == ["grade_5_matematik_x__g2"]
+    collection_registry.unregister("grade_5_matematik_x")
+
+
+def test_scan_exposes_latest_generation_under_logical_name(service):
+    for name in ["grade_5_matematik_x", "grade_5_matematik_x__g3", "grade_5_matematik_x__g4__staging"]:
+        service.chroma_client.create_collection(name)
+
+    assert service._scan_collections() == [("grade_5_matematik_x", "chroma", "grade_5_matematik_x__g3")]
+
+
+class DroppedStore:
+    def similarity_search(self, query, k=5):
+        raise ValueError("Collection [grade_5_matematik_x] does not exist.")
+
+
+class LiveStore:
+    def similarity_search(self, query, k=5):
+        return [_doc(query)]
+
+
+def test_search_reloads_collection_rebuilt_elsewhere(service, monkeypatch):
+    opened = []
+
+    def open_store(**kwargs):
+        opened.append(kwargs["collection_name"])
+        return LiveStore()
+
+    monkeypatch.setattr(vector_db_service, "Chroma", open_store)
+    collection_registry.register("grade_5_matematik_x", "chroma", version="grade_5_matematik_x__g1")
+    # Başka bir worker 2. nesli yayımlayıp 1. nesli silmiş
+    service.chroma_client.create_collection("grade_5_matematik_x__g2")
+    service.collections["grade_5_matematik_x"] = {
+        "type": "chroma", "vectorstore": DroppedStore(), "version": "grade_5_matematik_x__g1"
+    }
+
+    results = service.search_similar_documents("grade_5_matematik_x", "Kesirler")
+
+    assert [doc.page_content for doc in results] == ["Kesirler"]
+    assert opened == ["grade_5_matematik_x__g2"]
+    assert isinstance(service.collections["grade_5_matematik_x"]["vectorstore"], LiveStore)
+    collection_registry.unregister("grade_5_matematik_x")
+
+
+def test_cached_store_with_outdated_version_is_reloaded(service, monkeypatch):
+    monkeypatch.setattr(vector_db_service, "Chroma", lambda **kwargs: LiveStore())
+    collection_registry.register("grade_5_matematik_x", "chroma", version="new-uuid")
+    service.collections["grade_5_matematik_x"] = {
+        "type": "chroma", "vectorstore": DroppedStore(), "version": "old-uuid"
+    }
+
+    assert service.search_similar_documents("grade_5_matematik_x", "Oran")[0].page_content == "Oran"
+    collection_registry.unregister("grade_5_matematik_x")